@@ -0,0 +1,46 @@
+"""
+Micro-benchmark of Markdown converter construction vs conversion on pages/big.md
+
+    python markdown_benchmark.py [number]
+"""
+import os
+import sys
+import codecs
+import timeit
+from markdown import Markdown
+from portal.markdown_extensions import BootstrapTableExtension
+from portal.markdown_pool import MarkdownPool
+
+EXTENSIONS = (BootstrapTableExtension, 'meta', 'fenced_code', 'codehilite', 'nl2br')
+
+
+def build():
+    return Markdown(extensions=[e() if isinstance(e, type) else e for e in EXTENSIONS])
+
+
+def main(number=200):
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pages', 'big.md')
+    with codecs.open(path, encoding='utf-8') as f:
+        source = f.read()
+
+    markdown = build()
+    pool = MarkdownPool.for_extensions(*EXTENSIONS)
+
+    def convert():
+        markdown.reset()
+        markdown.convert(source)
+
+    timings = [
+        ('construction', build),
+        ('conversion', convert),
+        ('construction + conversion', lambda: build().convert(source)),
+        ('pooled conversion', lambda: pool.convert(source)),
+    ]
+    for name, fn in timings:
+        fn()  # warm up
+        total = timeit.timeit(fn, number=number)
+        print('%-28s %8.3f ms' % (name, total * 1000.0 / number))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -3,10 +3,10 @@ def index(l):
     l.client.get("/")
 
 def addUser(l):
-    l.client.get("/system/usermanager/addUser")
+    l.client.get("/system/usermanager/addUser?name=locust&age=20")
 
 def editUser(l):
-    l.client.get("/system/usermanager/editUser")
+    l.client.get("/system/usermanager/editUser?name=locust")
 
 
 class UserBehavior(TaskSet):
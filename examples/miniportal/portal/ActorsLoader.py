@@ -2,6 +2,15 @@ import yaml
 import glob
 import os
 import imp
+import hashlib
+import threading
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+# The C loader (libyaml) is much faster when available
+YamlLoader = getattr(yaml, 'CLoader', yaml.Loader)
 
 class Actors(object):
     def __init__(self):
@@ -47,15 +56,60 @@ def {method}({params}):
 '''
 
 
+class LazyActor(object):
+    """
+    Stands for an actor method, the actor module is only imported on first call.
+    """
+    def __init__(self, loader, namespace, obj, method, specs):
+        self._loader = loader
+        self._namespace = namespace
+        self._obj = obj
+        self._lock = threading.Lock()
+        self._fn = None
+        self.__name__ = method
+        self.specs = specs
+
+    def load(self):
+        with self._lock:
+            if self._fn is None:
+                method = self.__name__
+                module = self._loader._load_actor(self._namespace, self._obj, method)
+                if not hasattr(module, method):
+                    raise Exception('file "%s" does not have method "%s"' % (module.__file__, method))
+                fn = getattr(module, method)
+                fn.specs = self.specs
+                self._fn = fn
+        return self._fn
+
+    def __call__(self, *args, **kwargs):
+        return self.load()(*args, **kwargs)
+
+
 class ActorsLoader(object):
+    """
+    Loads the actors tree from the actors specs (`*.yaml`) under path.
+
+    Parsed specs are kept in a manifest along with the mtime, size and digest of
+    every spec file, so that a start with unchanged specs only stats them. Actor
+    modules are imported lazily on first call.
+    """
+    manifest_name = '.manifest'
+
     def __init__(self, path):
         self._path = path
+        self._manifest = {}
+        self._manifest_changed = False
 
     @property
     def path(self):
         return self._path
 
+    @property
+    def manifest_path(self):
+        return os.path.join(self.path, self.manifest_name)
+
     def load_actors(self):
+        self._read_manifest()
         self.all_actors = Actors()
         for namespace in os.listdir(self.path):
             ns_actors = Actors()
@@ -75,29 +129,72 @@ class ActorsLoader(object):
 
             setattr(self.all_actors, namespace, ns_actors)
 
+        self._write_manifest()
         return self.all_actors
 
     def _load_actors(self, spec_files, namespace, obj):
         obj_actors = Actors()
         for file in spec_files:
-            with open(file) as f:
-                specs = yaml.load(f)
-                for method in specs.keys():
-                    actor = "{method}.py".format(method=method)
-                    actor_file = os.path.join(self.path, namespace, obj, actor)
-                    if not os.path.isfile(actor_file):
-                        self._generate_actor(namespace, obj, method, specs[method])
-
-                    module = self._load_actor(namespace, obj, method)
-                    if not hasattr(module, method):
-                        raise Exception('file "%s" does not have method "%s"' % (actor_file, method))
-                    fn = getattr(module, method)
-                    fn.specs = specs[method]
-                    setattr(obj_actors, method, fn)
-                    # setattr(obj_actors, method, getattr(module, method))
-                    # self.generate_route(app, namespace, obj, method, getattr(obj_actors, method))
+            specs = self._load_specs(file)
+            for method in specs.keys():
+                actor = "{method}.py".format(method=method)
+                actor_file = os.path.join(self.path, namespace, obj, actor)
+                if not os.path.isfile(actor_file):
+                    self._generate_actor(namespace, obj, method, specs[method])
+
+                setattr(obj_actors, method, LazyActor(self, namespace, obj, method, specs[method]))
+                # self.generate_route(app, namespace, obj, method, getattr(obj_actors, method))
         return obj_actors
 
+    def _load_specs(self, file):
+        entry = self._file_entry(file)
+        if 'specs' not in entry:
+            with open(file) as f:
+                entry['specs'] = yaml.load(f, Loader=YamlLoader)
+        return entry['specs']
+
+    def _file_entry(self, file):
+        """
+        Manifest entry of `file`, the digest is only computed again when the file
+        was touched, and the entry is reset when its content changed.
+        """
+        st = os.stat(file)
+        entry = self._manifest.get(file)
+        if entry is not None and (entry['mtime'], entry['size']) == (st.st_mtime, st.st_size):
+            return entry
+
+        with open(file, 'rb') as f:
+            digest = hashlib.sha1(f.read()).hexdigest()
+        if entry is None or entry['digest'] != digest:
+            entry = {'digest': digest}
+        entry.update(mtime=st.st_mtime, size=st.st_size)
+        self._manifest[file] = entry
+        self._manifest_changed = True
+        return entry
+
+    def _read_manifest(self):
+        try:
+            with open(self.manifest_path, 'rb') as f:
+                self._manifest = pickle.load(f)
+        except (IOError, EOFError, pickle.UnpicklingError):
+            self._manifest = {}
+        self._manifest_changed = False
+
+    def _write_manifest(self):
+        if not self._manifest_changed:
+            return
+        # Drop the files that are gone
+        self._manifest = dict((file, entry) for file, entry in self._manifest.items() if os.path.exists(file))
+        tmp_path = self.manifest_path + '.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(self._manifest, f, pickle.HIGHEST_PROTOCOL)
+            os.rename(tmp_path, self.manifest_path)
+        except (IOError, OSError):
+            # Read only deployment, we'll just parse the specs again next time
+            pass
+        self._manifest_changed = False
+
     def _load_actor(self, namespace, obj, method):
         module_name = "{namespace}.{obj}.{method}".format(namespace=namespace, obj=obj, method=method)
         module_path = os.path.join(self.path, namespace, obj, "%s.py" % method)
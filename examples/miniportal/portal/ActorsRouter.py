@@ -0,0 +1,108 @@
+import inspect
+from flask import request, abort
+
+
+def to_bool(value):
+    if value.lower() in ('1', 'true', 'yes', 'on'):
+        return True
+    if value.lower() in ('0', 'false', 'no', 'off'):
+        return False
+    raise ValueError(value)
+
+
+# actors.yaml parameter type -> coercion of the request value
+coercers = {
+    'int': int,
+    'float': float,
+    'bool': to_bool,
+    'string': lambda value: value,
+}
+
+
+class ActorsRouter(object):
+    """
+    Serves every actor method through a single `/<namespace>/<object>/<method>`
+    rule. The method is looked up in a dict built once from the actors tree,
+    and the request arguments are coerced according to the `parameters` of its
+    specs. Only the arguments the actor function accepts are passed, the others
+    are ignored, parameters missing from the request are left to their default
+    and a missing required one gives a 400.
+
+    The signature of an actor is read on its first call, so that lazily loaded
+    actors are only imported when they are used.
+    """
+    endpoint = 'actor'
+
+    def __init__(self, actors, fallback=None):
+        self.actors = actors
+        self.fallback = fallback
+        self.methods = {}
+        self.signatures = {}
+        for ns_name in dir(actors):
+            if ns_name.startswith("__"):
+                continue
+            ns = getattr(actors, ns_name)
+            for obj_name in dir(ns):
+                if obj_name.startswith("__"):
+                    continue
+                obj = getattr(ns, obj_name)
+                for method_name in dir(obj):
+                    if method_name.startswith("_"):
+                        continue
+                    method = getattr(obj, method_name)
+                    self.methods[(ns_name, obj_name, method_name)] = (method, self._get_coercers(method))
+
+    @property
+    def namespaces(self):
+        return sorted(set(ns for ns, obj, method in self.methods))
+
+    def _get_coercers(self, method):
+        params = getattr(method, 'specs', None) or {}
+        return dict((p['name'], coercers.get(p.get('type'), coercers['string']))
+                    for p in params.get('parameters', []))
+
+    @staticmethod
+    def _get_signature(method):
+        """
+        Names of the arguments of `method`, whether it takes **kwargs and the
+        names of the arguments it requires.
+        """
+        fn = method.load() if hasattr(method, 'load') else method
+        spec = inspect.getargspec(fn)
+        required = spec.args[:len(spec.args) - len(spec.defaults or ())]
+        return set(spec.args), spec.keywords is not None, set(required)
+
+    def register(self, app):
+        if not self.methods:
+            return
+        # Only the namespaces of the actors, the rest of the urls are left to other rules
+        rule = '/<any(%s):namespace>/<object>/<method>' % ', '.join(self.namespaces)
+        app.add_url_rule(rule, self.endpoint, self.dispatch)
+
+    def dispatch(self, namespace, object, method):
+        try:
+            fn, params = self.methods[(namespace, object, method)]
+        except KeyError:
+            if self.fallback is None:
+                abort(404)
+            return self.fallback('/'.join((namespace, object, method)))
+
+        key = (namespace, object, method)
+        signature = self.signatures.get(key)
+        if signature is None:
+            signature = self.signatures[key] = self._get_signature(fn)
+        args, any_kwargs, required = signature
+
+        kwargs = {}
+        if 'actors' in args:
+            kwargs['actors'] = self.actors
+        for name, coerce in params.items():
+            if name not in request.values or not (any_kwargs or name in args):
+                continue
+            try:
+                kwargs[name] = coerce(request.values[name])
+            except ValueError:
+                abort(400)
+        if not required.issubset(kwargs):
+            abort(400)
+        return fn(**kwargs)
@@ -1,34 +1,54 @@
 import os
-import codecs
-from markdown import Markdown
 from werkzeug.utils import cached_property
 from flask import Flask, current_app, request, abort, url_for, render_template, render_template_string, Markup, Blueprint, send_from_directory
 from .markdown_extensions import BootstrapTableExtension
+from .cache import page_cache
+from .markdown_pool import MarkdownPool
+from .frontmatter import parse_meta, read_meta
+from .snapshot import Snapshot, record_dependency
+
+page_markdown = MarkdownPool.for_extensions(BootstrapTableExtension, 'meta', 'fenced_code', 'codehilite', 'nl2br')
 
 class Page:
-    def __init__(self, path, content=None):
+    def __init__(self, path, content=None, meta=None):
         self.path = path
-        # UTF-8 here is intentional!
-        if content is None:
-            with codecs.open(self.path, encoding='utf-8') as f:
-                self.raw_content = f.read()
+        self._cached = None
+        if meta is not None:
+            self.meta = meta
+        elif content is None:
+            record_dependency(self.path)
+            self._cached = page_cache.get(self.path, parse_meta)
+            self.raw_content = self._cached.raw_content
+            self.meta = dict(self._cached.meta)
         else:
             self.raw_content = content
+            self.meta = parse_meta(self.raw_content)
 
-        self._load_meta()
-
-    # Because we need only the meta, we parse the document without executing jinja templates inside it
-    def _load_meta(self):
-        markdown = Markdown(extensions=['meta']) # No need for other extensions
-        markdown.convert(self.raw_content)
-        self.meta = markdown.Meta
         self.meta['page'] = self
         self.meta['template'] = self.meta.get('template', 'page.html')
 
+    # Because we need only the meta, we read the header of the document without parsing the rest of it
+    @classmethod
+    def from_header(cls, path):
+        """
+        Page with only its meta, enough for listings but it can't be loaded.
+        """
+        record_dependency(path)
+        return cls(path, meta=read_meta(path))
+
     def load(self):
-        content = render_template_string(self.raw_content, page=self)
-        markdown = Markdown(extensions=[BootstrapTableExtension(), 'meta', 'fenced_code', 'codehilite', 'nl2br'])
-        self.html_content = markdown.convert(content)
+        cached = self._cached
+        if cached is None:
+            content = render_template_string(self.raw_content, page=self)
+        elif cached.html_content is not None:
+            self.html_content = cached.html_content
+            return
+        else:
+            content = cached.render(page=self)
+
+        self.html_content = page_markdown.convert(content)
+        if cached is not None and cached.is_static:
+            page_cache.set_html(cached, self.html_content)
 
     @cached_property
     def url(self):
@@ -42,6 +62,13 @@ class Page:
         alt_title = os.path.splitext(path)[0]
         return self.meta.get('title', [alt_title])[0]
 
+    @property
+    def is_dynamic(self):
+        """
+        Pages with `dynamic: yes` in their meta are left out of static snapshots.
+        """
+        return self.meta.get('dynamic', ['no'])[0].lower() in ('yes', 'true', '1')
+
 # Stop autoescaping
 class Portal(Flask):
     def select_jinja_autoescape(self, filename):
@@ -57,9 +84,7 @@ def favicon():
                                'favicon.ico', mimetype='image/vnd.microsoft.icon')
 
 
-@blueprint.route('/', defaults={'path': 'index'})
-@blueprint.route('/<path:path>')
-def render_page(path):
+def render_live(path):
     try:
         page = Page(os.path.join(current_app.config['PAGES_DIR'], path + '.md'))
         page.load()
@@ -68,3 +93,14 @@ def render_page(path):
 
     return render_template(page.meta['template'], content=page.html_content, page=page)
 
+
+@blueprint.route('/', defaults={'path': 'index'})
+@blueprint.route('/<path:path>')
+def render_page(path):
+    snapshot = Snapshot.for_app(current_app)
+    if snapshot is not None:
+        response = snapshot.send(path)
+        if response is not None:
+            return response
+
+    return render_live(path)
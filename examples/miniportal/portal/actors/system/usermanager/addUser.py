@@ -1,7 +1,7 @@
 
-def addUser(actors):
+def addUser(actors, name, age):
     x = 10
     for i in range(100):
         z = x * i
 
-    return "{'name':'Hello add', 'z':'%s'}" % z
+    return "{'name':'%s', 'age':%d, 'z':'%s'}" % (name, age, z)
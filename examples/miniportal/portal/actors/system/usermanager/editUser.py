@@ -1,6 +1,6 @@
 
-def editUser(actors):
+def editUser(actors, name):
     for i in range(10):
         for j in range(20):
             z = i * j
-    return "Hello edit %s" % z
\ No newline at end of file
+    return "Hello edit %s %s" % (name, z)
@@ -1,3 +1,3 @@
 
-def getUser(name):
+def getUser(actors, name):
      raise NotImplementedError()
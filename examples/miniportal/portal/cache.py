@@ -0,0 +1,170 @@
+import os
+import sys
+import codecs
+import threading
+from collections import OrderedDict
+from jinja2 import meta as jinja_meta
+from flask import current_app
+from flask.templating import _render
+
+
+# Names a page body may reference and still render the same for every request
+STATIC_NAMES = frozenset(['page'])
+
+
+class CachedPage(object):
+    """
+    Everything we can keep about a page between requests: the raw source, the
+    parsed meta, the compiled jinja template of the body and, for pages that
+    don't call any macro, the final html of the body.
+    """
+    def __init__(self, path, mtime, size, raw_content, meta):
+        self.path = path
+        self.mtime = mtime
+        self.size = size
+        self.raw_content = raw_content
+        self.meta = meta
+        self.template = None
+        self.is_static = None
+        self.html_content = None
+
+    @property
+    def cost(self):
+        # Rough estimate, the compiled template is accounted as another copy of the source
+        cost = 2 * sys.getsizeof(self.raw_content)
+        if self.html_content is not None:
+            cost += sys.getsizeof(self.html_content)
+        return cost
+
+    def compile(self):
+        """
+        Compiles the page body with the jinja environment of the current app.
+        """
+        env = current_app.jinja_env
+        ast = env.parse(self.raw_content)
+        self.is_static = (jinja_meta.find_undeclared_variables(ast) <= STATIC_NAMES
+                          and not list(jinja_meta.find_referenced_templates(ast)))
+        self.template = env.from_string(ast)
+        return self.template
+
+    def render(self, **context):
+        """
+        Same as `render_template_string` but reuses the compiled template.
+        """
+        template = self.template or self.compile()
+        app = current_app._get_current_object()
+        app.update_template_context(context)
+        return _render(template, context, app)
+
+
+class PageCache(object):
+    """
+    LRU cache of `CachedPage` keyed by path, an entry is only valid as long as
+    the file keeps the same mtime and size. The cache is bounded by the
+    estimated memory used by its entries.
+
+    Every path has a generation that `invalidate` bumps. A page loaded while
+    its file was invalidated is not stored, otherwise it would be served
+    stale forever when `check_mtime` is off.
+    """
+    def __init__(self, max_size=32 * 1024 * 1024):
+        self.max_size = max_size
+        # Can be turned off when something else invalidates changed files (see `PageIndex`)
+        self.check_mtime = True
+        self.current_size = 0
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def get(self, path, load_meta):
+        """
+        Returns the cached page for `path`, (re)loading it from disk when the
+        file changed. `load_meta` is called with the raw content to parse the
+        meta of the page. Raises IOError when the file doesn't exist.
+        """
+        path = os.path.abspath(path)
+        if not self.check_mtime:
+            with self._lock:
+                entry = self._entries.get(path)
+                if entry is not None:
+                    self._entries[path] = self._entries.pop(path)
+                    return entry
+
+        try:
+            st = os.stat(path)
+        except OSError as e:
+            self.invalidate(path)
+            raise IOError(e.errno, e.strerror, path)
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None:
+                if entry.mtime == st.st_mtime and entry.size == st.st_size:
+                    self._entries[path] = self._entries.pop(path)
+                    return entry
+                self._remove(path)
+            generation = self._generations.get(path, 0)
+
+        # UTF-8 here is intentional!
+        with codecs.open(path, encoding='utf-8') as f:
+            raw_content = f.read()
+        entry = CachedPage(path, st.st_mtime, st.st_size, raw_content, load_meta(raw_content))
+        self.add(entry, generation)
+        return entry
+
+    def add(self, entry, generation=None):
+        """
+        Stores `entry`, unless `generation` is given and its path was
+        invalidated since (the entry may have been read before the change).
+        """
+        with self._lock:
+            if generation is not None and generation != self._generations.get(entry.path, 0):
+                return
+            self._remove(entry.path)
+            self._entries[entry.path] = entry
+            self.current_size += entry.cost
+            self._prune()
+
+    def set_html(self, entry, html_content):
+        """
+        Stores the final html of a static page.
+        """
+        with self._lock:
+            if self._entries.get(entry.path) is not entry:
+                # Already evicted or replaced by a newer version
+                return
+            self.current_size -= entry.cost
+            entry.html_content = html_content
+            self.current_size += entry.cost
+            self._prune()
+
+    def invalidate(self, path):
+        path = os.path.abspath(path)
+        with self._lock:
+            self._generations[path] = self._generations.get(path, 0) + 1
+            self._remove(path)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_size = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, path):
+        return os.path.abspath(path) in self._entries
+
+    def _remove(self, path):
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self.current_size -= entry.cost
+
+    def _prune(self):
+        # Always keep the most recent entry, even if it's bigger than the cap
+        while self.current_size > self.max_size and len(self._entries) > 1:
+            path, entry = self._entries.popitem(last=False)
+            self.current_size -= entry.cost
+
+
+page_cache = PageCache()
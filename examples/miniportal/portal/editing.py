@@ -7,6 +7,7 @@ from flask.ext.admin.babel import gettext, lazy_gettext
 from flask.ext.admin.contrib import fileadmin
 
 from . import Page
+from .cache import page_cache
 
 
 class MarkdownWidget(widgets.TextArea):
@@ -66,6 +67,7 @@ class PortalFileAdmin(fileadmin.FileAdmin):
                     flash(gettext("Error saving changes to %(name)s.", name=path), 'error')
                     error = True
                 else:
+                    page_cache.invalidate(full_path)
                     self.on_edit_file(full_path, path)
                     flash(gettext("Changes to %(name)s saved successfully.", name=path))
                     return redirect(next_url)
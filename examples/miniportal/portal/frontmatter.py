@@ -0,0 +1,90 @@
+"""
+Reads the meta data header of a page without running the markdown parser.
+
+The result is the same as `Markdown(extensions=['meta']).Meta` after a
+conversion, but only the header lines are looked at: parsing stops at the
+first blank line (or at the first line that isn't meta data), and `read_meta`
+stops reading the file there too.
+"""
+import codecs
+from markdown.util import STX, ETX
+from markdown.extensions.meta import META_RE, META_MORE_RE
+
+# Same as the default `Markdown.tab_length`
+TAB_LENGTH = 4
+CHUNK_SIZE = 4096
+
+
+def _normalize(line):
+    # What the normalize_whitespace preprocessor does before the meta preprocessor
+    return line.replace(STX, '').replace(ETX, '').expandtabs(TAB_LENGTH)
+
+
+def parse_meta_lines(lines):
+    """
+    Parses the meta data from an iterable of lines, lines must not contain
+    any line break.
+    """
+    meta = {}
+    key = None
+    for line in lines:
+        line = _normalize(line)
+        if line.strip() == '':
+            break  # blank line - done
+        m1 = META_RE.match(line)
+        if m1:
+            key = m1.group('key').lower().strip()
+            value = m1.group('value').strip()
+            meta.setdefault(key, []).append(value)
+        else:
+            m2 = META_MORE_RE.match(line)
+            if m2 and key:
+                # Add another line to existing key
+                meta[key].append(m2.group('value').strip())
+            else:
+                break  # no meta data - done
+    return meta
+
+
+def parse_meta(text):
+    """
+    Parses the meta data of a page source.
+    """
+    chunks = (text[i:i + CHUNK_SIZE] for i in range(0, len(text), CHUNK_SIZE))
+    return parse_meta_lines(iter_lines(chunks))
+
+
+def read_meta(path):
+    """
+    Reads the meta data of the page at `path`, the file is read in small
+    chunks until the end of the header.
+    """
+    # UTF-8 here is intentional!
+    with codecs.open(path, encoding='utf-8') as f:
+        chunks = iter(lambda: f.read(CHUNK_SIZE), '')
+        return parse_meta_lines(iter_lines(chunks))
+
+
+def iter_lines(chunks):
+    """
+    Yields the lines of a text given as consecutive chunks. Like markdown, only
+    '\\r\\n', '\\r' and '\\n' are line breaks.
+    """
+    pending = []
+    carry = ''
+    for chunk in chunks:
+        chunk = carry + chunk
+        carry = ''
+        if chunk.endswith('\r'):
+            # Might be the first half of '\r\n'
+            chunk, carry = chunk[:-1], '\r'
+        lines = chunk.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+        pending.append(lines[0])
+        if len(lines) > 1:
+            yield ''.join(pending)
+            for line in lines[1:-1]:
+                yield line
+            pending = [lines[-1]]
+    yield ''.join(pending)
+    if carry:
+        yield ''
@@ -1,5 +1,5 @@
 
 def add(actors, a, b):
-    return actors.system.usermanager.editUser(actors)
+    return actors.system.usermanager.editUser(actors, '%s + %s' % (a, b))
 
 
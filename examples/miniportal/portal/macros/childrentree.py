@@ -1,6 +1,8 @@
 import os
 from flask import current_app, render_template, Markup
 from portal import Page
+from portal.pageindex import page_index
+from portal.snapshot import record_dependency
 
 
 def is_page(f):
@@ -8,11 +10,17 @@ def is_page(f):
 
 
 def get_dir_tree(dir):
-    children = [Page(os.path.join(dir, f)) for f in os.listdir(dir) if is_page(f)]
+    # Pages added or removed later change the listing
+    record_dependency(dir)
+    if page_index.covers(dir):
+        return page_index.children(dir)
+    children = [Page.from_header(os.path.join(dir, f)) for f in os.listdir(dir) if is_page(f)]
     return children
 
 
 def childrentree(actors):
     pages = get_dir_tree(current_app.config['PAGES_DIR'])
+    for page in pages:
+        record_dependency(page.path)
 
-    return Markup(render_template('partials/_childrentree.html', pages=pages))
\ No newline at end of file
+    return Markup(render_template('partials/_childrentree.html', pages=pages))
@@ -1,11 +1,17 @@
 import os
 from flask import current_app, abort
 from portal import Page
+from portal.pageindex import page_index
+from portal.snapshot import record_dependency
 
 def include_doc(actors, path):
+    path = os.path.join(current_app.config['PAGES_DIR'], path + '.md')
+    record_dependency(path)
+    if page_index.covers(path) and page_index.get(path) is None:
+        return ''
     try:
-        page = Page(os.path.join(current_app.config['PAGES_DIR'], path + '.md'))
+        page = Page(path)
         page.load()
         return page.html_content
     except IOError:
-        return ''
\ No newline at end of file
+        return ''
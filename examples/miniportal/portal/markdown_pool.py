@@ -0,0 +1,67 @@
+import threading
+from contextlib import contextmanager
+from markdown import Markdown
+
+
+class MarkdownPool(object):
+    """
+    Pool of ready to use `Markdown` converters sharing the same extensions.
+
+    Building a `Markdown` instance registers every extension, pattern and
+    processor again, which costs more than converting a typical page. The pool
+    builds converters on demand and hands them back out after a `reset()`.
+
+    Each converter gets its own extension instances (`factory` is called for
+    every new converter) because some extensions keep per document state.
+    """
+    def __init__(self, factory, max_idle=16):
+        self.factory = factory
+        self.max_idle = max_idle
+        self._idle = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_extensions(cls, *extensions, **kwargs):
+        """
+        Pool of converters built with `Markdown(extensions=extensions)`, where
+        extensions can be extension names or extension classes.
+        """
+        def factory():
+            return Markdown(extensions=[e() if isinstance(e, type) else e for e in extensions])
+        return cls(factory, **kwargs)
+
+    def acquire(self):
+        with self._lock:
+            markdown = self._idle.pop() if self._idle else None
+
+        if markdown is None:
+            return self.factory()
+
+        markdown.reset()
+        # The meta extension doesn't clear the meta of the previous document, and
+        # doesn't set it at all for an empty document
+        if hasattr(markdown, 'Meta'):
+            markdown.Meta = {}
+        return markdown
+
+    def release(self, markdown):
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(markdown)
+
+    @contextmanager
+    def borrow(self):
+        """
+        Context manager lending a converter for a single document.
+        A converter that raised is dropped instead of going back in the pool.
+        """
+        markdown = self.acquire()
+        yield markdown
+        self.release(markdown)
+
+    def convert(self, source):
+        """
+        Same as `Markdown.convert` with a pooled converter.
+        """
+        with self.borrow() as markdown:
+            return markdown.convert(source)
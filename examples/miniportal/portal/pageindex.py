@@ -0,0 +1,141 @@
+import os
+import bisect
+import threading
+from watchdog.observers import Observer
+from watchdog.events import FileSystemEventHandler
+
+from . import Page
+from .cache import page_cache
+from .frontmatter import read_meta
+
+
+def is_page_file(path):
+    return path.endswith('.md')
+
+
+class PageIndex(FileSystemEventHandler):
+    """
+    In memory index of the pages under the pages directory: every page (with
+    its meta, title and url) by path and the pages of every directory.
+
+    It's built once by `start` and kept up to date by a watchdog observer,
+    which also invalidates the changed pages in the page cache. Pages of the
+    index only have their meta (see `Page.from_header`).
+    """
+    def __init__(self, cache=page_cache):
+        self.cache = cache
+        self.pages_dir = None
+        self._pages = {}
+        self._children = {}
+        self._lock = threading.Lock()
+        self._observer = None
+
+    @property
+    def watching(self):
+        return self._observer is not None
+
+    def start(self, pages_dir):
+        self.pages_dir = os.path.abspath(pages_dir)
+        self._observer = Observer()
+        self._observer.schedule(self, self.pages_dir, recursive=True)
+        self._observer.start()
+        # Built after the observer is started so that no change is missed
+        self.rebuild()
+        # Changed files are invalidated by the observer, no need to stat them on every hit
+        self.cache.check_mtime = False
+
+    def stop(self):
+        if self._observer is None:
+            return
+        self.cache.check_mtime = True
+        self._observer.stop()
+        self._observer.join()
+        self._observer = None
+
+    def rebuild(self):
+        with self._lock:
+            self._pages.clear()
+            self._children.clear()
+        self._add_dir(self.pages_dir)
+
+    def covers(self, path):
+        """
+        Whether `path` is inside the watched pages directory.
+        """
+        if not self.watching:
+            return False
+        path = os.path.abspath(path)
+        return path == self.pages_dir or path.startswith(self.pages_dir + os.sep)
+
+    def get(self, path):
+        """
+        Returns the page at `path` (path to the .md file) or None.
+        """
+        return self._pages.get(os.path.abspath(path))
+
+    def children(self, dir):
+        """
+        Returns the pages directly in `dir`, sorted by file name.
+        """
+        with self._lock:
+            return [self._pages[path] for path in self._children.get(os.path.abspath(dir), ())]
+
+    def _add_dir(self, dir):
+        for root, dirs, files in os.walk(dir):
+            for f in files:
+                if is_page_file(f):
+                    self._add(os.path.join(root, f))
+
+    def _add(self, path):
+        try:
+            page = Page(path, meta=read_meta(path))
+        except (IOError, OSError):
+            # Gone already, the observer will tell us
+            return
+        path = os.path.abspath(path)
+        with self._lock:
+            if path not in self._pages:
+                bisect.insort(self._children.setdefault(os.path.dirname(path), []), path)
+            self._pages[path] = page
+        self.cache.invalidate(path)
+
+    def _remove(self, path):
+        path = os.path.abspath(path)
+        with self._lock:
+            if self._pages.pop(path, None) is not None:
+                siblings = self._children[os.path.dirname(path)]
+                del siblings[bisect.bisect_left(siblings, path)]
+        self.cache.invalidate(path)
+
+    def _remove_dir(self, dir):
+        prefix = os.path.abspath(dir) + os.sep
+        with self._lock:
+            paths = [p for p in self._pages if p.startswith(prefix)]
+        for path in paths:
+            self._remove(path)
+
+    def on_created(self, event):
+        if event.is_directory:
+            self._add_dir(event.src_path)
+        elif is_page_file(event.src_path):
+            self._add(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory and is_page_file(event.src_path):
+            self._add(event.src_path)
+
+    def on_deleted(self, event):
+        if event.is_directory:
+            self._remove_dir(event.src_path)
+        elif is_page_file(event.src_path):
+            self._remove(event.src_path)
+
+    def on_moved(self, event):
+        self.on_deleted(event)
+        if event.is_directory:
+            self._add_dir(event.dest_path)
+        elif is_page_file(event.dest_path):
+            self._add(event.dest_path)
+
+
+page_index = PageIndex()
@@ -0,0 +1,178 @@
+"""
+Static snapshot of the portal pages.
+
+`build_snapshot` renders every page that isn't marked as dynamic in its meta
+(`dynamic: yes`) to an html file, plus gzip (and brotli, if the module is
+installed) variants of it. `Snapshot` serves those files with strong ETags,
+the portal falls back to live rendering for everything else.
+
+The snapshot has to be built again when templates change. Every page file
+read while rendering a page (its own source, the ones pulled in by macros such
+as `include_doc`) is recorded in the manifest, along with the directories
+listed by `childrentree`: pages with one of them changed since the build are
+rendered live.
+"""
+import os
+import gzip
+import json
+import hashlib
+from io import BytesIO
+from flask import g, has_app_context, request, send_from_directory
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MANIFEST = 'manifest.json'
+
+
+def _gzip(data):
+    buf = BytesIO()
+    # mtime=0 so that the same page always gives the same file
+    with gzip.GzipFile(fileobj=buf, mode='wb', compresslevel=9, mtime=0) as f:
+        f.write(data)
+    return buf.getvalue()
+
+
+# Content-Encoding -> (file suffix, compress function), by order of preference
+ENCODINGS = [('gzip', '.gz', _gzip)]
+if brotli is not None:
+    ENCODINGS.insert(0, ('br', '.br', brotli.compress))
+
+
+def record_dependency(filename):
+    """
+    Notes that the page being rendered for the snapshot depends on `filename`.
+    """
+    if has_app_context():
+        dependencies = getattr(g, 'snapshot_dependencies', None)
+        if dependencies is not None:
+            dependencies.add(filename)
+
+
+def _stat(filename):
+    try:
+        st = os.stat(filename)
+    except OSError:
+        return None
+    return [st.st_mtime, st.st_size]
+
+
+def iter_pages(pages_dir):
+    """
+    Yields (page path, file path) of all pages under `pages_dir`, page paths
+    are the ones used in urls.
+    """
+    for root, dirs, files in os.walk(pages_dir):
+        dirs.sort()
+        for f in sorted(files):
+            if not f.endswith('.md'):
+                continue
+            filename = os.path.join(root, f)
+            path = os.path.splitext(os.path.relpath(filename, pages_dir))[0]
+            yield path.replace(os.sep, '/'), filename
+
+
+def build_snapshot(app, output_dir):
+    """
+    Renders the static pages of `app` in `output_dir`, returns the manifest.
+    """
+    from . import Page, render_live
+
+    if not os.path.isdir(output_dir):
+        os.makedirs(output_dir)
+
+    pages_dir = app.config['PAGES_DIR']
+    pages = {}
+    for path, filename in iter_pages(pages_dir):
+        if Page.from_header(filename).is_dynamic:
+            continue
+
+        with app.test_request_context('/' + path):
+            g.snapshot_dependencies = set([filename])
+            html = render_live(path).encode('utf-8')
+            dependencies = g.snapshot_dependencies
+
+        target = os.path.join(output_dir, path + '.html')
+        if not os.path.isdir(os.path.dirname(target)):
+            os.makedirs(os.path.dirname(target))
+        with open(target, 'wb') as f:
+            f.write(html)
+        encodings = []
+        for encoding, suffix, compress in ENCODINGS:
+            with open(target + suffix, 'wb') as f:
+                f.write(compress(html))
+            encodings.append(encoding)
+
+        pages[path] = {
+            'etag': hashlib.sha1(html).hexdigest(),
+            'dependencies': dict((os.path.relpath(f, pages_dir), _stat(f)) for f in dependencies),
+            'encodings': encodings,
+        }
+
+    manifest = {'pages': pages}
+    # Written aside and renamed, running portals reload it as soon as it changes
+    filename = os.path.join(output_dir, MANIFEST)
+    with open(filename + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.rename(filename + '.tmp', filename)
+    return manifest
+
+
+class Snapshot(object):
+    def __init__(self, directory, pages_dir):
+        self.directory = directory
+        self.pages_dir = pages_dir
+        with open(os.path.join(directory, MANIFEST)) as f:
+            self.pages = json.load(f)['pages']
+
+    @classmethod
+    def for_app(cls, app):
+        """
+        The snapshot of `app`, if `SNAPSHOT_DIR` is configured and built.
+
+        The manifest is loaded again whenever it changes, so a snapshot built
+        while the portal is running is picked up without restarting it.
+        """
+        directory = app.config.get('SNAPSHOT_DIR')
+        if not directory:
+            return None
+        filename = os.path.join(directory, MANIFEST)
+        stat = _stat(filename)
+        cached = app.extensions.get('portal.snapshot')
+        if cached is None or cached[0] != stat:
+            snapshot = None
+            if stat is not None:
+                snapshot = cls(directory, app.config['PAGES_DIR'])
+            cached = app.extensions['portal.snapshot'] = (stat, snapshot)
+        return cached[1]
+
+    def is_fresh(self, entry):
+        for filename, stat in entry['dependencies'].items():
+            if _stat(os.path.join(self.pages_dir, filename)) != stat:
+                return False
+        return True
+
+    def send(self, path):
+        """
+        Response for the page at `path`, None if it has to be rendered live.
+        """
+        entry = self.pages.get(path)
+        if entry is None or not self.is_fresh(entry):
+            return None
+
+        filename, etag, encoding = path + '.html', entry['etag'], None
+        for name, suffix, compress in ENCODINGS:
+            if name in entry['encodings'] and request.accept_encodings[name]:
+                # Each representation needs its own strong ETag
+                filename, etag, encoding = filename + suffix, '%s-%s' % (etag, name), name
+                break
+
+        response = send_from_directory(self.directory, filename, mimetype='text/html',
+                                       add_etags=False, cache_timeout=0)
+        response.set_etag(etag)
+        response.vary.add('Accept-Encoding')
+        if encoding is not None:
+            response.headers['Content-Encoding'] = encoding
+        return response.make_conditional(request)
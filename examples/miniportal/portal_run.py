@@ -1,4 +1,5 @@
 import os
+import sys
 from flask_debugtoolbar import DebugToolbarExtension
 from flask.ext.admin import Admin
 from wtforms import form, fields
@@ -6,8 +7,10 @@ from flask.ext.admin.model.fields import InlineFormField
 from flask.ext.admin.form.fields import DateTimeField
 from flask.ext.admin.contrib.pymongo import ModelView
 import pymongo
-from portal import blueprint, Portal
+from portal import blueprint, Portal, render_page
 from portal.editing import PortalFileAdmin
+from portal.pageindex import page_index
+from portal.snapshot import build_snapshot
 from flask import Blueprint
 from portal.MacrosLoader import MacrosLoader
 class LocationForm(form.Form):
@@ -30,13 +33,26 @@ class PeopleView(ModelView):
     form = PeopleForm
 
 from portal.ActorsLoader import ActorsLoader
+from portal.ActorsRouter import ActorsRouter
 class App(object):
     def __init__(self, settings):
         self._actors_path = settings["actors_path"]
+        self._snapshot_dir = settings["snapshot_dir"]
         self.app = None
         self.actors = None
 
     def startapp(self):
+        self.createapp()
+        page_index.start(self.app.config['PAGES_DIR'])
+        self.app.run(host='0.0.0.0')
+
+    def build_snapshot(self, output_dir=None):
+        self.createapp()
+        output_dir = output_dir or self.app.config['SNAPSHOT_DIR']
+        manifest = build_snapshot(self.app, output_dir)
+        print("%d pages written to %s" % (len(manifest['pages']), output_dir))
+
+    def createapp(self):
         self.app = Portal(__name__)
         self.app.config['SECRET_KEY'] = '3294038'
         self.app.config['DEBUG_TB_INTERCEPT_REDIRECTS'] = False
@@ -46,6 +62,8 @@ class App(object):
 
         # Required by the portal
         self.app.config['PAGES_DIR'] = os.path.join(self.app.root_path, 'pages')
+        # Pages are served from there once built with `python portal_run.py snapshot`
+        self.app.config['SNAPSHOT_DIR'] = os.path.join(self.app.root_path, self._snapshot_dir)
         self.app.register_blueprint(blueprint)
         admin = Admin(self.app, 'Portal Admin', template_mode='bootstrap3')
         admin.add_view(PortalFileAdmin(self.app.root_path, '/', name='Files'))
@@ -57,40 +75,19 @@ class App(object):
         self.load_macros(mainbp)
         self.app.register_blueprint(blueprint)
         self.app.register_blueprint(mainbp)
-        self.app.run(host='0.0.0.0')
-
-    def getCallback(self, fn):
-        def wrapper(*args, **kwargs):
-            return fn(self.actors, *args, **kwargs)
-
-        return wrapper
 
     def generate_routes(self):
-        for ns_name in dir(self.actors):
-            if ns_name.startswith("__"):
-                continue
-            ns = getattr(self.actors, ns_name)
-            for obj_name in dir(ns):
-                if obj_name.startswith("__"):
-                    continue
-                obj = getattr(ns, obj_name)
-                for method_name in dir(obj):
-                    if method_name.startswith("_") or method_name.startswith("__"):
-                        continue
-                    method = getattr(obj, method_name)
-                    self.app.add_url_rule("/"+'{namespace}/{object}/{method}'.format(namespace=ns_name, object=obj_name, method=method_name),
-                                          method_name, self.getCallback(method))
-
-    def getCallback(self, fn):
-        def wrapper(*args, **kwargs):
-            return fn(self.actors, *args, **kwargs)
-
-        return wrapper
+        self.router = ActorsRouter(self.actors, fallback=render_page)
+        self.router.register(self.app)
 
     def load_macros(self, pb):
         MacrosLoader("portal/macros").load_macros(pb, self.actors)
 
 settings = {}
 settings["actors_path"] = "portal/actors"
+settings["snapshot_dir"] = "snapshot"
 application = App(settings)
-application.startapp()
+if sys.argv[1:2] == ['snapshot']:
+    application.build_snapshot(*sys.argv[2:3])
+else:
+    application.startapp()
@@ -0,0 +1,58 @@
+"""
+Benchmark of url matching with one rule per actor method vs the single rule
+of ActorsRouter, for 10, 1,000 and 10,000 actor methods.
+
+    python router_benchmark.py [number]
+"""
+import sys
+import timeit
+from werkzeug.routing import Map, Rule
+
+
+def actor_methods(count, namespaces=10, objects=10):
+    return [('ns%d' % (i % namespaces), 'obj%d' % (i // namespaces % objects), 'method%d' % i)
+            for i in range(count)]
+
+
+def rule_per_method(methods):
+    rules = [Rule('/%s/%s/%s' % method, endpoint='%s.%s.%s' % method) for method in methods]
+    rules.append(Rule('/<path:path>', endpoint='page'))
+    return Map(rules)
+
+
+def single_rule(methods):
+    namespaces = sorted(set(ns for ns, obj, method in methods))
+    return Map([
+        Rule('/<any(%s):namespace>/<object>/<method>' % ', '.join(namespaces), endpoint='actor'),
+        Rule('/<path:path>', endpoint='page'),
+    ])
+
+
+def main(number=2000):
+    for count in (10, 1000, 10000):
+        methods = actor_methods(count)
+        dispatch = dict((method, None) for method in methods)
+        # First, middle and last registered methods
+        paths = ['/%s/%s/%s' % methods[i] for i in (0, count // 2, count - 1)]
+
+        adapter = rule_per_method(methods).bind('localhost')
+
+        def match_rules():
+            for path in paths:
+                adapter.match(path)
+
+        single_adapter = single_rule(methods).bind('localhost')
+
+        def match_single():
+            for path in paths:
+                endpoint, values = single_adapter.match(path)
+                dispatch[(values['namespace'], values['object'], values['method'])]
+
+        for name, fn in (('rule per method', match_rules), ('single rule', match_single)):
+            fn()  # builds the map
+            total = timeit.timeit(fn, number=number)
+            print('%6d methods  %-16s %10.2f us/match' % (count, name, total * 1e6 / (number * len(paths))))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
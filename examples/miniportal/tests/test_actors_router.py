@@ -0,0 +1,51 @@
+import os
+import shutil
+import tempfile
+import unittest
+from flask import Flask
+from portal.ActorsLoader import ActorsLoader
+from portal.ActorsRouter import ActorsRouter
+
+ACTORS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'portal', 'actors')
+
+
+class ActorsRouterTestCase(unittest.TestCase):
+    def setUp(self):
+        # The loader writes its manifest next to the actors
+        self.tmp = tempfile.mkdtemp()
+        actors_path = os.path.join(self.tmp, 'actors')
+        shutil.copytree(ACTORS_DIR, actors_path, ignore=shutil.ignore_patterns('.manifest', '*.pyc'))
+        actors = ActorsLoader(actors_path).load_actors()
+        app = Flask(__name__)
+        ActorsRouter(actors).register(app)
+        self.client = app.test_client()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def get(self, path):
+        return self.client.get('/system/usermanager/' + path)
+
+    def test_query_args(self):
+        rv = self.get('addUser?name=x&age=3')
+        self.assertEqual(rv.status_code, 200)
+        self.assertIn(b"'name':'x', 'age':3", rv.data)
+
+    def test_unknown_args_are_ignored(self):
+        rv = self.get('editUser?name=x&age=3&other=y')
+        self.assertEqual(rv.status_code, 200)
+        self.assertIn(b'Hello edit x', rv.data)
+
+    def test_missing_required_arg(self):
+        self.assertEqual(self.get('addUser?name=x').status_code, 400)
+        self.assertEqual(self.get('editUser').status_code, 400)
+
+    def test_invalid_arg(self):
+        self.assertEqual(self.get('addUser?name=x&age=old').status_code, 400)
+
+    def test_unknown_method(self):
+        self.assertEqual(self.get('removeUser').status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
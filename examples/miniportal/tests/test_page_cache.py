@@ -0,0 +1,47 @@
+import os
+import shutil
+import tempfile
+import unittest
+from portal.cache import PageCache
+
+
+class PageCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, 'page.md')
+        self.write('old')
+        self.cache = PageCache()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def write(self, content):
+        with open(self.path, 'w') as f:
+            f.write(content)
+
+    def test_invalidate_during_load(self):
+        self.cache.check_mtime = False
+
+        def change_during_load(raw_content):
+            # The watchdog sees the change while the old content is loaded
+            self.write('new content')
+            self.cache.invalidate(self.path)
+            return {}
+
+        entry = self.cache.get(self.path, change_during_load)
+        self.assertEqual(entry.raw_content, 'old')
+        self.assertNotIn(self.path, self.cache)
+        self.assertEqual(self.cache.get(self.path, lambda raw_content: {}).raw_content, 'new content')
+        self.assertIn(self.path, self.cache)
+
+    def test_invalidate(self):
+        self.cache.check_mtime = False
+        self.cache.get(self.path, lambda raw_content: {})
+        self.write('new content')
+        self.assertEqual(self.cache.get(self.path, lambda raw_content: {}).raw_content, 'old')
+        self.cache.invalidate(self.path)
+        self.assertEqual(self.cache.get(self.path, lambda raw_content: {}).raw_content, 'new content')
+
+
+if __name__ == '__main__':
+    unittest.main()
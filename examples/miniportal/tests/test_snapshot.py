@@ -0,0 +1,70 @@
+import os
+import shutil
+import tempfile
+import unittest
+from portal import Portal, blueprint
+from portal.cache import page_cache
+from portal.snapshot import build_snapshot, Snapshot
+from portal.macros.include_doc import include_doc
+
+
+class SnapshotTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.pages_dir = os.path.join(self.tmp, 'pages')
+        self.snapshot_dir = os.path.join(self.tmp, 'snapshot')
+        templates_dir = os.path.join(self.tmp, 'templates')
+        os.makedirs(self.pages_dir)
+        os.makedirs(templates_dir)
+        with open(os.path.join(templates_dir, 'page.html'), 'w') as f:
+            f.write('{{ content }}')
+
+        self.app = Portal(__name__, template_folder=templates_dir)
+        self.app.config['PAGES_DIR'] = self.pages_dir
+        self.app.config['SNAPSHOT_DIR'] = self.snapshot_dir
+        self.app.jinja_env.globals['include_doc'] = lambda path: include_doc(None, path)
+        self.app.register_blueprint(blueprint)
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+        page_cache.clear()
+
+    def write(self, name, content):
+        filename = os.path.join(self.pages_dir, name)
+        with open(filename, 'w') as f:
+            f.write(content)
+        # A new mtime even on filesystems with a coarse one
+        st = os.stat(filename)
+        os.utime(filename, (st.st_atime, st.st_mtime + 10))
+
+    def served_from_snapshot(self, path):
+        rv = self.client.get(path)
+        return rv.status_code == 200 and rv.headers.get('ETag') is not None, rv.data
+
+    def test_empty_tree(self):
+        manifest = build_snapshot(self.app, self.snapshot_dir)
+        self.assertEqual(manifest['pages'], {})
+        self.assertIsNotNone(Snapshot.for_app(self.app))
+
+    def test_manifest_reloaded(self):
+        self.write('index.md', 'title: Index\n\nHello')
+        self.assertIsNone(Snapshot.for_app(self.app))
+        self.assertEqual(self.served_from_snapshot('/'), (False, b'<p>Hello</p>'))
+
+        build_snapshot(self.app, self.snapshot_dir)
+        self.assertEqual(self.served_from_snapshot('/'), (True, b'<p>Hello</p>'))
+
+    def test_included_page_changed(self):
+        self.write('index.md', 'title: Index\n\n{{ include_doc("part") }}')
+        self.write('part.md', 'Old part')
+        build_snapshot(self.app, self.snapshot_dir)
+        self.assertEqual(self.served_from_snapshot('/'), (True, b'<p>Old part</p>'))
+
+        self.write('part.md', 'New part')
+        page_cache.invalidate(os.path.join(self.pages_dir, 'part.md'))
+        self.assertEqual(self.served_from_snapshot('/'), (False, b'<p>New part</p>'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -36,6 +36,94 @@ class SchemaError(ValueError):
     pass
 
 
+# (validator class, transparent_schema_rules, id(definition)) ->
+# _CompiledDefinition, shared by all the validators of a class. Each entry
+# keeps its definition alive so that the id can't be reused while cached.
+_compiled_definitions = {}
+_COMPILED_DEFINITIONS_MAX = 1024
+
+_regexes = {}
+
+
+def _regex(match):
+    """ Returns `match` compiled, patterns are compiled once.
+    """
+    pattern = _regexes.get(match)
+    if pattern is None:
+        if len(_regexes) >= _COMPILED_DEFINITIONS_MAX:
+            _regexes.clear()
+        pattern = _regexes[match] = re.compile(match)
+    return pattern
+
+
+def _function(cls, name):
+    """ Returns the plain function behind the `name` method of `cls`, None if
+    there's no such method.
+    """
+    method = getattr(cls, name, None)
+    return getattr(method, '__func__', method)
+
+
+class _AllowedValues(list):
+    """ The values of an 'allowed' rule, with membership tests done against a
+    set instead of the list.
+    """
+    def __init__(self, values):
+        super(_AllowedValues, self).__init__(values)
+        self.values = frozenset(values)
+
+    def __contains__(self, value):
+        try:
+            return value in self.values
+        except TypeError:
+            return super(_AllowedValues, self).__contains__(value)
+
+
+class _CompiledDefinition(object):
+    """ The rules of a field definition, resolved once for a validator class:
+    the validator functions are looked up and the constraints that can be are
+    prepared (compiled regexes, sets of allowed values).
+    """
+    def __init__(self, cls, definition):
+        self.definition = definition
+        try:
+            self.snapshot = copy.deepcopy(definition)
+        except Exception:
+            # can't tell whether it changed, it will be compiled every time
+            self.snapshot = None
+        self.validated = False
+        self.required = definition.get('required') is True
+        self.nullable = definition.get('nullable', False) is True
+        self.type = definition.get('type')
+        self.type_validator = None
+        if 'type' in definition and _function(cls, '_validate_type') is \
+                _function(Validator, '_validate_type'):
+            self.type_validator = _function(
+                cls, '_validate_type_' + definition['type'])
+        self.has_dependencies = 'dependencies' in definition
+        self.dependencies = definition.get('dependencies')
+
+        self.rules = []
+        for rule, constraint in definition.items():
+            if rule in cls.special_rules:
+                continue
+            validator = _function(cls, '_validate_' + rule.replace(' ', '_'))
+            if validator is None:
+                continue
+            if rule == 'regex' and isinstance(constraint, _str_type):
+                _regex(constraint)
+            elif rule == 'allowed' and isinstance(constraint, (list, tuple)):
+                try:
+                    constraint = _AllowedValues(constraint)
+                except TypeError:
+                    pass
+            self.rules.append((validator, constraint))
+
+    def matches(self, definition):
+        return self.definition is definition and \
+            self.snapshot is not None and self.snapshot == definition
+
+
 class Validator(object):
     """ Validator class. Validates any Python dict against a validation schema,
 
@@ -109,8 +197,9 @@ class Validator(object):
         self.transparent_schema_rules = transparent_schema_rules
         self.ignore_none_values = ignore_none_values
         self.allow_unknown = allow_unknown
+        self._compiled = None
         if schema:
-            self.validate_schema(schema)
+            self._compile(schema)
         self.schema = schema
         self._errors = {}
 
@@ -165,10 +254,14 @@ class Validator(object):
         self.update = update
 
         if schema is not None:
-            self.validate_schema(schema)
+            self._compile(schema)
             self.schema = schema
         elif self.schema is None:
             raise SchemaError(errors.ERROR_SCHEMA_MISSING)
+        elif not self._is_compiled(self.schema):
+            # schema set directly (as for sub-documents) or changed in place
+            self._compile(self.schema, validate=False)
+        compiled = self._compiled[1]
 
         if document is None:
             raise ValidationError(errors.ERROR_DOCUMENT_MISSING)
@@ -185,35 +278,33 @@ class Validator(object):
             if self.ignore_none_values and value is None:
                 continue
 
-            definition = self.schema.get(field)
-            if definition:
+            definition = compiled.get(field)
+            if definition is not None:
                 if value is None:
-                    if definition.get("nullable", False) is True:
+                    if definition.nullable:
                         continue
                     else:
                         self._error(field, errors.ERROR_NOT_NULLABLE)
 
-                if 'type' in definition:
-                    self._validate_type(definition['type'], field, value)
-                    if self.errors.get(field):
+                if definition.type is not None:
+                    if definition.type_validator is not None:
+                        definition.type_validator(self, field, value)
+                    else:
+                        self._validate_type(definition.type, field, value)
+                    if self._errors.get(field):
                         continue
 
-                if "dependencies" in definition:
+                if definition.has_dependencies:
                     self._validate_dependencies(
                         document=document,
-                        dependencies=definition["dependencies"],
+                        dependencies=definition.dependencies,
                         field=field
                     )
-                    if self.errors.get(field):
+                    if self._errors.get(field):
                         continue
 
-                definition_rules = [rule for rule in definition.keys()
-                                    if rule not in self.special_rules]
-                for rule in definition_rules:
-                    validatorname = "_validate_" + rule.replace(" ", "_")
-                    validator = getattr(self, validatorname, None)
-                    if validator:
-                        validator(definition[rule], field, value)
+                for validator, constraint in definition.rules:
+                    validator(self, constraint, field, value)
             else:
                 if not self.allow_unknown:
                     self._error(field, errors.ERROR_UNKNOWN_FIELD)
@@ -239,6 +330,56 @@ class Validator(object):
 
         self._errors[field] = field_errors
 
+    def _compile(self, schema, validate=True):
+        """ Compiles `schema` for this validator, validating it first unless
+        `validate` is ``False``. The compiled definitions are taken from the
+        cache of the class when their definition didn't change since.
+        """
+        if validate and not isinstance(schema, Mapping):
+            raise SchemaError(errors.ERROR_SCHEMA_FORMAT % str(schema))
+
+        cls = self.__class__
+        compiled = {}
+        for field, definition in schema.items():
+            key = (cls, self.transparent_schema_rules, id(definition))
+            entry = _compiled_definitions.get(key)
+            if entry is None or not entry.matches(definition):
+                if validate:
+                    self._validate_definition(field, definition)
+                entry = _CompiledDefinition(cls, definition)
+                entry.validated = validate
+                if len(_compiled_definitions) >= _COMPILED_DEFINITIONS_MAX:
+                    _compiled_definitions.clear()
+                _compiled_definitions[key] = entry
+            elif validate and not entry.validated:
+                self._validate_definition(field, definition)
+                entry.validated = True
+            # empty definitions are unknown fields
+            if definition:
+                compiled[field] = entry
+
+        required = [field for field, entry in compiled.items()
+                    if entry.required]
+        self._compiled = schema, compiled, required, set(schema)
+
+    def _is_compiled(self, schema):
+        """ Tells whether `schema` is the schema compiled last and neither it
+        nor its field definitions changed since.
+        """
+        if self._compiled is None:
+            return False
+        compiled_schema, compiled, _, fields = self._compiled
+        if compiled_schema is not schema or set(schema) != fields:
+            return False
+        for field, definition in schema.items():
+            entry = compiled.get(field)
+            if entry is None:
+                if definition:
+                    return False
+            elif not entry.matches(definition):
+                return False
+        return True
+
     def validate_schema(self, schema):
         """ Validates a schema against supported rules.
 
@@ -252,35 +393,38 @@ class Validator(object):
             raise SchemaError(errors.ERROR_SCHEMA_FORMAT % str(schema))
 
         for field, constraints in schema.items():
-            if not isinstance(constraints, Mapping):
-                raise SchemaError(errors.ERROR_DEFINITION_FORMAT % field)
-            for constraint, value in constraints.items():
-                if constraint == 'type':
-                    if not hasattr(self, '_validate_type_' + value):
-                        raise SchemaError(
-                            errors.ERROR_UNKNOWN_TYPE % value)
-                elif constraint in self.special_rules:
-                    pass
-                elif constraint == 'schema':
-                    if constraints['type'] == 'list':
-                        self.validate_schema({'schema': value})
-                    else:
-                        self.validate_schema(value)
-                elif constraint == 'items':
-                    if isinstance(value, Mapping):
-                        # list of dicts, deprecated
-                        self.validate_schema(value)
-                    else:
-                        for item_schema in value:
-                            self.validate_schema({'schema': item_schema})
-                elif not hasattr(self, '_validate_' + constraint):
-                    if not self.transparent_schema_rules:
-                            raise SchemaError(errors.ERROR_UNKNOWN_RULE % (
-                                constraint, field))
+            self._validate_definition(field, constraints)
+
+    def _validate_definition(self, field, constraints):
+        """ Validates the definition of `field` against supported rules. """
+        if not isinstance(constraints, Mapping):
+            raise SchemaError(errors.ERROR_DEFINITION_FORMAT % field)
+        for constraint, value in constraints.items():
+            if constraint == 'type':
+                if not hasattr(self, '_validate_type_' + value):
+                    raise SchemaError(
+                        errors.ERROR_UNKNOWN_TYPE % value)
+            elif constraint in self.special_rules:
+                pass
+            elif constraint == 'schema':
+                if constraints['type'] == 'list':
+                    self.validate_schema({'schema': value})
+                else:
+                    self.validate_schema(value)
+            elif constraint == 'items':
+                if isinstance(value, Mapping):
+                    # list of dicts, deprecated
+                    self.validate_schema(value)
+                else:
+                    for item_schema in value:
+                        self.validate_schema({'schema': item_schema})
+            elif not hasattr(self, '_validate_' + constraint):
+                if not self.transparent_schema_rules:
+                        raise SchemaError(errors.ERROR_UNKNOWN_RULE % (
+                            constraint, field))
 
     def _validate_required_fields(self, document):
-        required = list(field for field, definition in self.schema.items()
-                        if definition.get('required') is True)
+        required = self._compiled[2]
         missing = set(required) - set(key for key in document.keys()
                                       if document.get(key) is not None
                                       or not self.ignore_none_values)
@@ -295,7 +439,7 @@ class Validator(object):
         """
         .. versionadded:: 0.7
         """
-        pattern = re.compile(match)
+        pattern = _regex(match)
         if not pattern.match(value):
             self._error(field, errors.ERROR_REGEX % match)
 
@@ -368,7 +512,8 @@ class Validator(object):
             if value not in allowed_values:
                 self._error(field, errors.ERROR_UNALLOWED_VALUE % value)
         elif isinstance(value, Sequence):
-            disallowed = set(value) - set(allowed_values)
+            disallowed = set(item for item in value
+                             if item not in allowed_values)
             if disallowed:
                 self._error(field,
                             errors.ERROR_UNALLOWED_VALUES % list(disallowed))
@@ -523,3 +523,45 @@ class TestValidator(TestBase):
 
         obj = {'sub': [{'foo': 'bar'}, {'foo': 'baz'}]}
         self.assertTrue(v.validate(obj))
+
+    def test_compiled_schema_reused(self):
+        class CountingValidator(Validator):
+            validated = 0
+
+            def _validate_definition(self, field, constraints):
+                CountingValidator.validated += 1
+                super(CountingValidator, self)._validate_definition(
+                    field, constraints)
+
+        schema = {'name': {'type': 'string', 'regex': '[a-z]+$'},
+                  'role': {'type': 'list', 'allowed': ['agent', 'client']}}
+        document = {'name': 'john', 'role': ['agent']}
+        for i in range(3):
+            v = CountingValidator(schema)
+            self.assertTrue(v.validate(document))
+            self.assertTrue(v.validate(document, schema))
+        self.assertEqual(CountingValidator.validated, 2)
+
+        # changes to the schema are picked up
+        schema['role']['allowed'] = ['client']
+        self.assertFalse(v.validate(document, schema))
+        self.assertError('role', errors.ERROR_UNALLOWED_VALUES % ['agent'],
+                         validator=v)
+        self.assertEqual(CountingValidator.validated, 3)
+
+    def test_schema_changed_in_place(self):
+        schema = {'a': {'type': 'integer'}}
+        v = Validator(schema)
+        self.assertTrue(v.validate({'a': 1}))
+
+        schema['b'] = {'type': 'string'}
+        self.assertFalse(v.validate({'a': 1, 'b': 2}))
+        self.assertError('b', errors.ERROR_BAD_TYPE % 'string', validator=v)
+
+        schema['a']['max'] = 0
+        self.assertFalse(v.validate({'a': 1}))
+        self.assertError('a', errors.ERROR_MAX_VALUE % 0, validator=v)
+
+        del schema['b']
+        self.assertFalse(v.validate({'b': 'x'}))
+        self.assertError('b', errors.ERROR_UNKNOWN_FIELD, validator=v)
@@ -39,6 +39,9 @@ SERVER_NAME = None
 PAGINATION = True
 PAGINATION_LIMIT = 50
 PAGINATION_DEFAULT = 25
+PAGINATION_STRATEGY = 'offset'
+PAGINATION_COUNT = 'exact'
+PAGINATION_COUNT_TTL = 60
 ID_FIELD = '_id'
 CACHE_CONTROL = 'max-age=10,must-revalidate'        # TODO confirm this value
 CACHE_EXPIRES = 10
@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+
+"""
+    eve.cache
+    ~~~~~~~~~
+
+    Server-side caches backed by a werkzeug cache (see
+    :mod:`werkzeug.contrib.cache`). When the API is served by several
+    processes, the werkzeug cache must be shared by all of them (RedisCache,
+    MemcachedCache).
+
+    :copyright: (c) 2014 by Nicola Iarocci.
+    :license: BSD, see LICENSE for more details.
+"""
+
+import random
+import hashlib
+import simplejson as json
+from bson.json_util import dumps
+from flask import request
+from eve.auth import auth_field_and_value
+from eve.utils import config
+
+
+class VersionedCache(object):
+    """ Base class of the caches whose entries depend on the content of
+    datasources.
+
+    Every write through the API changes the version of its datasource (see
+    :meth:`written`), and entries are only valid for the versions of the
+    datasources they were read with. Those versions are read before the
+    database, so that an entry can't outlive a write happening while it's
+    being read. Writes made outside of the API are not seen: entries expire
+    after `timeout` seconds.
+
+    :param cache: the :class:`werkzeug.contrib.cache.BaseCache` instance.
+    :param timeout: the timeout of the entries, in seconds.
+    :param prefix: the prefix of the cache keys.
+
+    .. versionadded:: 0.4
+    """
+    #: the attribute of the app set by :meth:`init_app`.
+    app_attribute = None
+
+    def __init__(self, cache, timeout=None, prefix='eve:'):
+        self.cache = cache
+        self.timeout = timeout
+        self.prefix = prefix
+
+    def init_app(self, app):
+        """ Makes this a cache of `app`, whose writes invalidate the entries.
+        """
+        setattr(app, self.app_attribute, self)
+        app.on_inserted += self.on_inserted
+        app.on_updated += self.on_updated
+        app.on_replaced += self.on_replaced
+        app.on_deleted_item += self.on_deleted_item
+        app.on_deleted_resource += self.on_deleted_resource
+
+    def _key(self, *parts):
+        # memcached keys can't contain spaces and are at most 250 bytes long.
+        h = hashlib.sha1(dumps(parts, sort_keys=True).encode('utf-8'))
+        return self.prefix + h.hexdigest()
+
+    def _version_key(self, resource):
+        return self._key('version', config.SOURCES[resource]['source'])
+
+    def version(self, resource):
+        """ Returns the current version of the datasource of `resource`,
+        creating it if needed.
+        """
+        key = self._version_key(resource)
+        version = self.cache.get(key)
+        if version is None:
+            # a random start, so that the entries tagged with a version the
+            # cache has lost don't become valid again.
+            self.cache.add(key, random.randint(1, 2 ** 62),
+                           timeout=self.timeout)
+            version = self.cache.get(key)
+        return version
+
+    def written(self, resource):
+        """ Records a write to the datasource of `resource`, which invalidates
+        the entries of all the resources sharing it.
+        """
+        # make sure there is a version to increment, an increment of a
+        # missing version would start it at 1.
+        self.version(resource)
+        self.cache.inc(self._version_key(resource))
+
+    def on_inserted(self, resource, documents):
+        self.written(resource)
+
+    def on_updated(self, resource, updates, original):
+        self.written(resource)
+
+    def on_replaced(self, resource, document, original):
+        self.written(resource)
+
+    def on_deleted_item(self, resource, original):
+        self.written(resource)
+
+    def on_deleted_resource(self, resource):
+        self.written(resource)
+
+
+class ETagCache(VersionedCache):
+    """ Keeps the ETag and Last-Modified values of the responses to GET
+    requests, so that conditional requests can be answered without querying
+    the database.
+
+    .. versionadded:: 0.4
+    """
+    app_attribute = 'etag_cache'
+
+    def __init__(self, cache, timeout=None, prefix='eve-etag:'):
+        super(ETagCache, self).__init__(cache, timeout, prefix)
+
+    def get(self, resource, request_key, version):
+        """ Returns the (etag, last_modified) pair of a response, None if not
+        cached or stale.
+
+        :param resource: the resource name.
+        :param request_key: what identifies the response within the
+                            resource (lookup, query arguments).
+        :param version: the current version of the datasource.
+        """
+        entry = self.cache.get(self._key(resource, request_key))
+        if entry is None or entry[0] != version:
+            return None
+        return entry[1], entry[2]
+
+    def set(self, resource, request_key, version, etag, last_modified):
+        """ Stores the etag and last_modified values of a response.
+
+        :param version: the version of the datasource read before the
+                        database.
+        """
+        self.cache.set(self._key(resource, request_key),
+                       (version, etag, last_modified), timeout=self.timeout)
+
+
+class ResponseCache(VersionedCache):
+    """ Keeps the rendered responses to the GET requests of the resources
+    with the `cache` setting enabled.
+
+    Responses are keyed by the normalized query of the request, the identity
+    of the client and the versions of the datasources they depend on: the
+    one of the resource and the ones of the resources it refers to through
+    `data_relation`, whose documents might be embedded.
+
+    Hits and misses are counted by each process.
+
+    .. versionadded:: 0.4
+    """
+    app_attribute = 'response_cache'
+
+    def __init__(self, cache, timeout=None, prefix='eve-response:'):
+        super(ResponseCache, self).__init__(cache, timeout, prefix)
+        self.hits = 0
+        self.misses = 0
+        self._related = {}
+
+    def related_resources(self, resource):
+        """ Returns `resource` and the resources it refers to through
+        `data_relation`, sorted.
+        """
+        related = self._related.get(resource)
+        if related is None:
+            related = set([resource])
+            _data_relations(config.DOMAIN[resource]['schema'], related)
+            related = self._related[resource] = sorted(related)
+        return related
+
+    def key(self, resource, req, lookup):
+        """ Returns the key of the response to the current request.
+
+        :param resource: the resource name.
+        :param req: the :class:`eve.utils.ParsedRequest` of the request.
+        :param lookup: the lookup of the request.
+        """
+        versions = [self.version(r) for r in self.related_resources(resource)]
+        query = [_normalize(value) for value in (req.where, req.projection,
+                                                 req.sort, req.embedded)]
+        return self._key(resource, lookup, query, req.page, req.max_results,
+                         req.cursor, request.args.get(config.VERSION_PARAM),
+                         request.url_root, request.headers.get('Accept'),
+                         auth_field_and_value(resource)[1], versions)
+
+    def get(self, key):
+        """ Returns the (mime, rendered, last_modified, etag, status) tuple
+        of a cached response, None if not cached.
+        """
+        entry = self.cache.get(key)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def set(self, key, mime, rendered, last_modified, etag, status):
+        """ Stores a rendered response.
+        """
+        self.cache.set(key, (mime, rendered, last_modified, etag, status),
+                       timeout=self.timeout)
+
+    def stats(self):
+        """ Returns the hit and miss counters of this process.
+        """
+        return {'hits': self.hits, 'misses': self.misses}
+
+
+def _normalize(value):
+    """ Returns a query argument in a canonical form when it is JSON (a
+    Python expression is returned as is).
+    """
+    if value is None:
+        return None
+    try:
+        return json.dumps(json.loads(value), sort_keys=True)
+    except ValueError:
+        return value
+
+
+def _data_relations(schema, resources):
+    """ Adds the resources `schema` refers to through `data_relation`,
+    nested schemas included, to the `resources` set.
+    """
+    for definition in schema.values():
+        _definition_relations(definition, resources)
+
+
+def _definition_relations(definition, resources):
+    if not isinstance(definition, dict):
+        return
+    relation = definition.get('data_relation')
+    if relation and 'resource' in relation:
+        resources.add(relation['resource'])
+    nested = definition.get('schema')
+    if isinstance(nested, dict):
+        if definition.get('type') == 'list':
+            _definition_relations(nested, resources)
+        else:
+            _data_relations(nested, resources)
+    items = definition.get('items')
+    if isinstance(items, (list, tuple)):
+        for item in items:
+            _definition_relations(item, resources)
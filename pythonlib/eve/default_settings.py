@@ -12,6 +12,14 @@
     :license: BSD, see LICENSE for more details.
 
     .. versionchanged:: 0.4
+       'PAGINATION_STRATEGY' added and set to 'offset'.
+       'PAGINATION_COUNT' added and set to 'exact'.
+       'PAGINATION_COUNT_TTL' added and set to 60.
+       'STREAMING' added and set to False.
+       'ETAG_CACHE' added and set to False.
+       'ETAG_CACHE_TIMEOUT' added and set to 3600.
+       'CACHE' added and set to False.
+       'RESPONSE_CACHE_TIMEOUT' added and set to 300.
        'META' added and set to '_meta'.
        'ERROR' added and set to '_error'.
        'URL_PROTOCOL' added and set to ''.
@@ -108,6 +116,14 @@ PROJECTION = True               # projection enabled by default
 PAGINATION = True               # pagination enabled by default.
 PAGINATION_LIMIT = 50
 PAGINATION_DEFAULT = 25
+PAGINATION_STRATEGY = 'offset'  # 'offset' (?page) or 'keyset' (?cursor)
+PAGINATION_COUNT = 'exact'      # 'exact', 'estimated' or 'none'
+PAGINATION_COUNT_TTL = 60       # seconds estimated counts are cached for
+STREAMING = False               # stream collection pages document by document
+ETAG_CACHE = False              # answer conditional GETs from the cache
+ETAG_CACHE_TIMEOUT = 3600       # seconds ETag cache entries are kept for
+CACHE = False                   # cache the rendered GET responses
+RESPONSE_CACHE_TIMEOUT = 300    # seconds cached responses are kept for
 VERSIONING = False              # turn document versioning on or off
 VERSIONS = '_versions'          # suffix for parallel collection w/old versions
 VERSION_PARAM = 'version'       # URL param for specific version of a document
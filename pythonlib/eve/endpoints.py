@@ -18,7 +18,7 @@ from eve.render import send_response
 from eve.auth import requires_auth
 from eve.utils import resource_uri, config, request_method, \
     debug_error_message
-from flask import abort, request
+from flask import abort, request, current_app as app
 
 
 def collections_endpoint(**lookup):
@@ -109,6 +109,7 @@ def home_endpoint():
 
     .. versionchanged:: 0.4
        Prevent versioning collections from being added in links.
+       Hit and miss counters of the response cache, if any, in the meta.
 
     .. versionchanged:: 0.2
        Use new 'resource_title' setting for link titles.
@@ -125,6 +126,8 @@ def home_endpoint():
                               'title': '%s' %
                               config.DOMAIN[resource]['resource_title']})
         response[config.LINKS] = {'child': links}
+        if app.response_cache is not None:
+            response[config.META] = {'cache': app.response_cache.stats()}
         return send_response(None, (response,))
     else:
         abort(404, debug_error_message("HATEOAS is disabled so we have no data"
@@ -24,6 +24,7 @@ from eve.endpoints import collections_endpoint, item_endpoint, home_endpoint, \
     error_endpoint
 from eve.defaults import build_defaults
 from eve.utils import api_prefix, extract_key_values
+from eve.cache import ETagCache, ResponseCache
 from events import Events
 
 
@@ -70,9 +71,14 @@ class Eve(Flask, Events):
                          as eve.io.base.BaseJSONEncoder subclass.
     :param media: the media storage class. Must be a
                   :class:`~eve.io.media.MediaStorage` subclass.
+    :param cache: the :class:`werkzeug.contrib.cache.BaseCache` instance used
+                  by the ETag cache, if enabled, and by the response cache of
+                  the resources with `cache` enabled. When the API is served
+                  by several processes it must be shared by all of them.
     :param kwargs: optional, standard, Flask parameters.
 
     .. versionchanged:: 0.4
+       'cache' argument added, used by the ETag and response caches.
        Ensure all errors returns a parseable body. Closes #365.
        'auth' argument can be either an instance or a callable. Closes #248.
        Made resource setup more DRY by calling register_resource.
@@ -112,7 +118,7 @@ class Eve(Flask, Events):
     def __init__(self, import_name=__package__, settings='settings.py',
                  validator=Validator, data=Mongo, auth=None, redis=None,
                  url_converters=None, json_encoder=None,
-                 media=GridFSMediaStorage, **kwargs):
+                 media=GridFSMediaStorage, cache=None, **kwargs):
         """ Eve main WSGI app is implemented as a Flask subclass. Since we want
         to be able to launch our API by simply invoking Flask's run() method,
         we need to enhance our super-class a little bit.
@@ -139,6 +145,18 @@ class Eve(Flask, Events):
 
         self.media = media(self) if media else None
         self.redis = redis
+        self.cache = cache
+
+        self.etag_cache = None
+        if self.config['ETAG_CACHE']:
+            if cache is None:
+                raise ConfigException('ETAG_CACHE requires a cache')
+            ETagCache(cache, self.config['ETAG_CACHE_TIMEOUT']).init_app(self)
+
+        self.response_cache = None
+        if cache is not None:
+            ResponseCache(cache,
+                          self.config['RESPONSE_CACHE_TIMEOUT']).init_app(self)
 
         if auth:
             self.auth = auth() if callable(auth) else auth
@@ -255,6 +273,8 @@ class Eve(Flask, Events):
 
         .. versionchanged:: 0.4
            validate that auth_field is not set to ID_FIELD. See #266.
+           validate 'pagination_strategy' and 'pagination_count'.
+           validate that a cache is provided when 'cache' is enabled.
 
         .. versionadded:: 0.2
         """
@@ -285,6 +305,18 @@ class Eve(Flask, Events):
             raise ConfigException('"%s": auth_field cannot be set to ID_FIELD '
                                   '(%s)' % (resource, self.config['ID_FIELD']))
 
+        if settings['pagination_strategy'] not in ('offset', 'keyset'):
+            raise ConfigException('"%s": pagination_strategy must be either '
+                                  '"offset" or "keyset"' % resource)
+
+        if settings['pagination_count'] not in ('exact', 'estimated', 'none'):
+            raise ConfigException('"%s": pagination_count must be either '
+                                  '"exact", "estimated" or "none"' % resource)
+
+        if settings['cache'] and self.cache is None:
+            raise ConfigException('"%s": cache requires the cache argument'
+                                  % resource)
+
         self.validate_schema(resource, settings['schema'])
 
     def validate_roles(self, directive, candidate, resource):
@@ -406,6 +438,10 @@ class Eve(Flask, Events):
 
         .. versionchanged:: 0.4
            `versioning`
+           `pagination_strategy`
+           `pagination_count`
+           `streaming`
+           `cache`
            `VERSION` added to automatic projection (when applicable)
 
         .. versionchanged:: 0.2
@@ -505,6 +541,12 @@ class Eve(Flask, Events):
         settings.setdefault('embedding', self.config['EMBEDDING'])
         settings.setdefault('embedded_fields', [])
         settings.setdefault('pagination', self.config['PAGINATION'])
+        settings.setdefault('pagination_strategy',
+                            self.config['PAGINATION_STRATEGY'])
+        settings.setdefault('pagination_count',
+                            self.config['PAGINATION_COUNT'])
+        settings.setdefault('streaming', self.config['STREAMING'])
+        settings.setdefault('cache', self.config['CACHE'])
         settings.setdefault('projection', self.config['PROJECTION'])
         settings.setdefault('versioning', self.config['VERSIONING'])
         # TODO make sure that this we really need the test below
@@ -721,6 +763,9 @@ class Eve(Flask, Events):
                 copy.deepcopy(self.config['DOMAIN'][resource])
             self.config['DOMAIN'][versioned_resource]['datasource']['source'] \
                 += self.config['VERSIONS']
+            # document history (?version=all) is always paged by ?page
+            self.config['DOMAIN'][versioned_resource]['pagination_strategy'] \
+                = 'offset'
             self.config['SOURCES'][versioned_resource] = \
                 copy.deepcopy(self.config['SOURCES'][resource])
             self.config['SOURCES'][versioned_resource]['source'] += \
@@ -131,6 +131,35 @@ class DataLayer(object):
         """
         raise NotImplementedError
 
+    def estimated_count(self, resource, req, sub_resource_lookup):
+        """ Returns an estimate of the number of documents matching the
+        current request, ignoring pagination. Consumed instead of the exact
+        count of the :meth:`find` cursor when the resource `pagination_count`
+        is 'estimated', so it should be (much) cheaper than that.
+
+        :param resource: resource being accessed.
+        :param req: an instance of ``eve.utils.ParsedRequest``.
+        :param sub_resource_lookup: sub-resource lookup from the endpoint url.
+
+        .. versionadded:: 0.4
+        """
+        raise NotImplementedError
+
+    def keyset_cursor(self, resource, req, document):
+        """ Returns the opaque cursor (the `?cursor` value) of the page
+        following `document`. Only needed by resources using keyset
+        pagination, in which case :meth:`find` is expected to return the
+        documents coming after ``req.cursor`` instead of skipping pages.
+
+        :param resource: resource being accessed.
+        :param req: an instance of ``eve.utils.ParsedRequest``.
+        :param document: the last document of the current page, as returned
+                         by :meth:`find`.
+
+        .. versionadded:: 0.4
+        """
+        raise NotImplementedError
+
     def find_one(self, resource, req, **lookup):
         """ Retrieves a single document/record. Consumed when a request hits an
         item endpoint (`/people/id/`).
@@ -10,18 +10,22 @@
 
 import sys
 import ast
+import time
 import itertools
+import threading
+from collections import OrderedDict
 from bson.errors import InvalidId
 import simplejson as json
 import pymongo
 from flask import abort
 from flask.ext.pymongo import PyMongo
 from bson import ObjectId
+from bson.json_util import dumps
 from datetime import datetime
 from eve.io.mongo.parser import parse, ParseError
 from eve.io.base import DataLayer, ConnectionException, BaseJSONEncoder
 from eve.utils import config, debug_error_message, validate_filters, \
-    str_to_date
+    str_to_date, encode_cursor, decode_cursor
 
 
 class MongoJSONEncoder(BaseJSONEncoder):
@@ -61,8 +65,15 @@ class Mongo(DataLayer):
     # with their own implementation.
     json_encoder_class = MongoJSONEncoder
 
+    # Number of query counts kept by :meth:`estimated_count`, the least
+    # recently used ones are dropped first.
+    max_cached_counts = 1024
+
     def init_app(self, app):
         """ Initialize PyMongo.
+        .. versionchanged:: 0.4
+           Cache of the estimated counts.
+
         .. versionchanged:: 0.0.9
            support for Python 3.3.
         """
@@ -71,6 +82,18 @@ class Mongo(DataLayer):
             self.driver = PyMongo(app)
         except Exception as e:
             raise ConnectionException(e)
+        self._init_counts()
+
+    def _init_counts(self):
+        """ Sets up the cache of :meth:`estimated_count`. Data layers which
+        don't call :meth:`init_app` have to call it themselves.
+
+        .. versionadded:: 0.4
+        """
+        # (collection, query) -> (expiration time, count), least recently
+        # used first
+        self._counts = OrderedDict()
+        self._counts_lock = threading.Lock()
 
     def find(self, resource, req, sub_resource_lookup):
         """ Retrieves a set of documents matching a given request. Queries can
@@ -90,6 +113,10 @@ class Mongo(DataLayer):
         :param sub_resource_lookup: sub-resource lookup from the endpoint url.
 
         .. versionchanged:: 0.4
+           The find arguments are built by _find_args().
+           Support for keyset pagination. Pages are ranges of the sort key
+           (plus ID_FIELD) starting after the request cursor, no documents are
+           skipped.
            'allowed_filters' is now checked before adding 'sub_resource_lookup'
            to the query, as it is considered safe.
            Refactored to use self._client_projection since projection is now
@@ -124,12 +151,56 @@ class Mongo(DataLayer):
         .. versionchanged:: 0.0.4
            retrieves the target collection via the new config.SOURCES helper.
         """
+        datasource, args = self._find_args(resource, req, sub_resource_lookup)
+        return self.driver.db[datasource].find(**args)
+
+    def estimated_count(self, resource, req, sub_resource_lookup):
+        """ Returns an estimate of the number of documents matching a given
+        request. Without a query that's the size of the collection, which the
+        server knows without scanning it, otherwise the exact count is cached
+        for `PAGINATION_COUNT_TTL` seconds.
+
+        :param resource: resource name.
+        :param req: a :class:`ParsedRequest`instance.
+        :param sub_resource_lookup: sub-resource lookup from the endpoint url.
+
+        .. versionadded:: 0.4
+        """
+        datasource, args = self._find_args(resource, req, sub_resource_lookup)
+        collection = self.driver.db[datasource]
+        spec = args.get('spec')
+        if not spec:
+            return collection.count()
+
+        key = (datasource, dumps(spec, sort_keys=True))
+        now = time.time()
+        with self._counts_lock:
+            expires, count = self._counts.pop(key, (0, None))
+            if expires > now:
+                self._counts[key] = (expires, count)
+                return count
+
+        count = collection.find(spec).count()
+        with self._counts_lock:
+            self._counts.pop(key, None)
+            while len(self._counts) >= self.max_cached_counts:
+                self._counts.popitem(last=False)
+            self._counts[key] = (now + config.PAGINATION_COUNT_TTL, count)
+        return count
+
+    def _find_args(self, resource, req, sub_resource_lookup):
+        """ Returns the collection and the arguments of the `find` call
+        matching a given request (see :meth:`find`).
+
+        .. versionadded:: 0.4
+        """
         args = dict()
+        keyset = self._keyset_pagination(resource)
 
         if req.max_results:
             args['limit'] = req.max_results
 
-        if req.page > 1:
+        if req.page > 1 and not keyset:
             args['skip'] = (req.page - 1) * req.max_results
 
         # TODO sort syntax should probably be coherent with 'where': either
@@ -177,6 +248,9 @@ class Mongo(DataLayer):
             spec[config.LAST_UPDATED] = \
                 {'$gt': req.if_modified_since}
 
+        if keyset:
+            spec, sort = self._keyset_find(resource, req, spec, projection)
+
         if len(spec) > 0:
             args['spec'] = spec
 
@@ -186,7 +260,27 @@ class Mongo(DataLayer):
         if projection is not None:
             args['fields'] = projection
 
-        return self.driver.db[datasource].find(**args)
+        return datasource, args
+
+    def keyset_cursor(self, resource, req, document):
+        """ Returns the cursor of the page following `document`, the last
+        document of the current page.
+
+        :param resource: resource name.
+        :param req: a :class:`ParsedRequest` instance.
+        :param document: the last document of the page, as returned by
+                         :meth:`find`.
+
+        .. versionadded:: 0.4
+        """
+        sort = self._keyset_sort(resource, req)
+        values = []
+        for field, _ in sort:
+            value = document
+            for key in field.split('.'):
+                value = value.get(key) if isinstance(value, dict) else None
+            values.append(value)
+        return encode_cursor(sort, values)
 
     def find_one(self, resource, req, **lookup):
         """ Retrieves a single document.
@@ -638,3 +732,80 @@ class Mongo(DataLayer):
                     'Unable to parse `projection` clause'
                 ))
         return client_projection
+
+    def _keyset_pagination(self, resource):
+        """ True if `resource` is paginated by keyset (?cursor) rather than
+        by offset (?page).
+
+        .. versionadded:: 0.4
+        """
+        settings = config.DOMAIN[resource]
+        return settings['pagination'] and \
+            settings['pagination_strategy'] == 'keyset'
+
+    def _keyset_find(self, resource, req, spec, projection):
+        """ Returns the query and the sort of a keyset paginated request: the
+        query only matches the documents after ``req.cursor``, if any. Sort
+        fields are added to `projection` as the next cursor is built from
+        them.
+
+        :param resource: resource name.
+        :param req: a :class:`ParsedRequest` instance.
+        :param spec: the query of the request.
+        :param projection: the projection of the request.
+
+        .. versionadded:: 0.4
+        """
+        sort = self._keyset_sort(resource, req)
+        if req.cursor:
+            values = decode_cursor(req.cursor, sort)
+            after = self._keyset_query(sort, values)
+            spec = self.combine_queries(spec, after) if spec else after
+        if projection is not None:
+            # only the fields the resource exposes
+            allowed = config.SOURCES[resource]['projection'] or {}
+            for field, _ in sort:
+                if field in allowed:
+                    projection[field] = 1
+        return spec, sort
+
+    def _keyset_sort(self, resource, req):
+        """ Returns the sort of a keyset paginated request: the client (or
+        default) sort, with ID_FIELD added as a tie-breaker so that the sort
+        key is unique.
+
+        :param resource: resource name.
+        :param req: a :class:`ParsedRequest` instance.
+
+        .. versionadded:: 0.4
+        """
+        sort = None
+        if req.sort:
+            sort = ast.literal_eval(req.sort)
+        elif config.DOMAIN[resource]['sorting']:
+            sort = config.SOURCES[resource]['default_sort']
+        sort = [tuple(s) for s in sort or []]
+        if config.ID_FIELD not in [field for field, _ in sort]:
+            sort.append((config.ID_FIELD, pymongo.ASCENDING))
+        return sort
+
+    def _keyset_query(self, sort, values):
+        """ Returns the query matching the documents that come after `values`
+        in `sort` order. With a sort on (a, b) that would be:
+
+            {'$or': [{'a': {'$gt': a}}, {'a': a, 'b': {'$gt': b}}]}
+
+        Sort fields are expected to be set in every document.
+
+        :param sort: the sort, as a list of (field, direction).
+        :param values: the sort field values of the last document of the
+                       previous page.
+
+        .. versionadded:: 0.4
+        """
+        clauses = []
+        for i, (field, direction) in enumerate(sort):
+            clause = dict((f, v) for (f, _), v in zip(sort[:i], values[:i]))
+            clause[field] = {'$gt' if direction > 0 else '$lt': values[i]}
+            clauses.append(clause)
+        return {'$or': clauses}
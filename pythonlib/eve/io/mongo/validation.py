@@ -12,7 +12,8 @@
     :license: BSD, see LICENSE for more details.
 """
 
-from eve.utils import config
+from datetime import datetime
+from eve.utils import config, ParsedRequest
 from bson import ObjectId
 from flask import current_app as app
 from cerberus import Validator
@@ -21,6 +22,25 @@ from eve.versioning import get_data_version_relation_document, \
     missing_version_field
 
 
+def _lookup_key(value):
+    """ Returns a hashable representation of a field value, equal for values
+    the database lookups consider the same (an ObjectId and its string, a
+    datetime and its RFC-1123 string). None if the value can't be looked up
+    in batch.
+    """
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.strftime(config.DATE_FORMAT)
+    if value is None or isinstance(value, (dict, list)):
+        return None
+    try:
+        hash(value)
+    except TypeError:
+        return None
+    return value
+
+
 class Validator(Validator):
     """ A cerberus.Validator subclass adding the `unique` contraint to
     Cerberus standard validation.
@@ -29,6 +49,10 @@ class Validator(Validator):
                    documentation.
     :param resource: the resource name.
 
+    .. versionchanged:: 0.4
+       Batch lookups of `unique` and `data_relation` values with
+       :meth:`prefetch`.
+
     .. versionchanged:: 0.0.6
        Support for 'allow_unknown' which allows to successfully validate
        unknown key/value pairs.
@@ -40,10 +64,76 @@ class Validator(Validator):
     def __init__(self, schema, resource=None):
         self.resource = resource
         self._id = None
+        # (resource, field) -> {lookup key: whether the value exists}, filled
+        # by prefetch()
+        self._existing = {}
+        # field -> lookup keys of the `unique` values validated so far, only
+        # tracked for batches
+        self._unique_values = None
         super(Validator, self).__init__(schema, transparent_schema_rules=True)
         if resource:
             self.allow_unknown = config.DOMAIN[resource]['allow_unknown']
 
+    def prefetch(self, documents):
+        """ Prepares the validation of a batch of documents: the `unique` and
+        `data_relation` values of all `documents` are looked up with one query
+        per resource and field, instead of one query per value while each
+        document is validated. Values which are duplicated among the
+        documents are also reported as not unique.
+
+        Versioned data relations, and values which can't be compared as such
+        (lists, dicts), are still looked up one at a time.
+
+        :param documents: the documents about to be validated.
+
+        .. versionadded:: 0.4
+        """
+        self._unique_values = {}
+        lookups = {}
+        for field, definition in self.schema.items():
+            targets = []
+            if definition.get('unique') and self.resource:
+                targets.append((self.resource, field))
+            data_relation = definition.get('data_relation')
+            if data_relation and data_relation.get('version') is not True:
+                targets.append((data_relation['resource'],
+                                data_relation['field']))
+            for document in documents:
+                if not isinstance(document, dict):
+                    continue
+                key = _lookup_key(document.get(field))
+                if key is None:
+                    continue
+                for target in targets:
+                    lookups.setdefault(target, {})[key] = document[field]
+
+        for (resource, field), values in lookups.items():
+            projection = config.SOURCES[resource]['projection']
+            if projection and field not in projection:
+                # values of the field wouldn't be returned by the lookup
+                continue
+            try:
+                cursor = app.data.find(resource, ParsedRequest(),
+                                       {field: {'$in': list(values.values())}})
+                found = set(_lookup_key(document.get(field))
+                            for document in cursor)
+            except Exception:
+                # the values will be looked up (and reported) one by one
+                continue
+            self._existing[(resource, field)] = \
+                dict((key, key in found) for key in values)
+
+    def _exists(self, resource, field, value):
+        """ Whether a document of `resource` has `value` for `field`, as found
+        by :meth:`prefetch`. None if the value hasn't been looked up.
+
+        .. versionadded:: 0.4
+        """
+        key = _lookup_key(value)
+        if key is None:
+            return None
+        return self._existing.get((resource, field), {}).get(key)
+
     def validate_update(self, document, _id):
         """ Validate method to be invoked when performing an update, not an
         insert.
@@ -75,6 +165,10 @@ class Validator(Validator):
         :param field: field name.
         :param value: field value.
 
+        .. versionchanged:: 0.4
+           Values looked up by :meth:`prefetch` are not queried again, and
+           values duplicated in a batch are not unique.
+
         .. versionchanged:: 0.3
            Support for new 'self._error' signature introduced with Cerberus
            v0.5.
@@ -83,14 +177,27 @@ class Validator(Validator):
            Handle the case in which ID_FIELD is not of ObjectId type.
         """
         if unique:
-            query = {field: value}
-            if self._id:
-                try:
-                    query[config.ID_FIELD] = {'$ne': ObjectId(self._id)}
-                except:
-                    query[config.ID_FIELD] = {'$ne': self._id}
-
-            if app.data.find_one(self.resource, None, **query):
+            key = _lookup_key(value)
+            if self._unique_values is not None and key is not None:
+                seen = self._unique_values.setdefault(field, set())
+                if key in seen:
+                    self._error(field, "value '%s' is not unique" % value)
+                    return
+                seen.add(key)
+
+            exists = None
+            if not self._id:
+                exists = self._exists(self.resource, field, value)
+            if exists is None:
+                query = {field: value}
+                if self._id:
+                    try:
+                        query[config.ID_FIELD] = {'$ne': ObjectId(self._id)}
+                    except:
+                        query[config.ID_FIELD] = {'$ne': self._id}
+                exists = app.data.find_one(self.resource, None, **query)
+
+            if exists:
                 self._error(field, "value '%s' is not unique" % value)
 
     def _validate_data_relation(self, data_relation, field, value):
@@ -107,6 +214,7 @@ class Validator(Validator):
         :param value: field value.
 
         .. versionchanged:: 0.4
+           Values looked up by :meth:`prefetch` are not queried again.
            Support for document versioning.
 
         .. versionchanged:: 0.3
@@ -156,8 +264,13 @@ class Validator(Validator):
                     " with fields '%s' and '%s'" %
                     (value_field, version_field))
         else:
-            query = {data_relation['field']: value}
-            if not app.data.find_one(data_relation['resource'], None, **query):
+            exists = self._exists(data_relation['resource'],
+                                  data_relation['field'], value)
+            if exists is None:
+                query = {data_relation['field']: value}
+                exists = app.data.find_one(data_relation['resource'], None,
+                                           **query)
+            if not exists:
                 self._error(
                     field,
                     "value '%s' must exist in resource '%s', field '%s'." %
@@ -17,7 +17,7 @@ from flask import current_app as app, request, abort, g, Response
 import simplejson as json
 from functools import wraps
 from eve.utils import parse_request, document_etag, config, request_method, \
-    debug_error_message, auto_fields
+    debug_error_message, auto_fields, identity_key
 from eve.versioning import resolve_document_version, \
     get_data_version_relation_document, missing_version_field
 
@@ -231,6 +231,47 @@ def ratelimit():
     return decorator
 
 
+def get_response_cache():
+    """ If the response to the current request is cacheable, returns its
+    (key, entry) pair, where entry is the cached response or None.
+
+    .. versionadded:: 0.4
+    """
+    return getattr(g, '_response_cache', None)
+
+
+def cache_response(f):
+    """ Enables the response cache on GET methods of the resources with the
+    `cache` setting enabled.
+
+    Conditional requests are left to the method. Otherwise the cache is
+    looked up and its key and entry stored on g as g._response_cache, for
+    further processing by send_response. On a hit the method, and the
+    `on_fetched` events with it, are skipped.
+
+    .. versionadded:: 0.4
+    """
+    @wraps(f)
+    def decorated(resource, **lookup):
+        g._response_cache = None
+        if app.response_cache is None or \
+                not config.DOMAIN[resource]['cache'] or \
+                request_method() not in ('GET', 'HEAD') or \
+                'If-None-Match' in request.headers or \
+                'If-Modified-Since' in request.headers:
+            return f(resource, **lookup)
+
+        key = app.response_cache.key(resource, parse_request(resource),
+                                     lookup)
+        entry = app.response_cache.get(key)
+        g._response_cache = (key, entry)
+        if entry is None:
+            return f(resource, **lookup)
+        mime, rendered, last_modified, etag, status = entry
+        return None, last_modified, etag, status
+    return decorated
+
+
 def last_updated(document):
     """ Fixes document's LAST_UPDATED field value. Flask-PyMongo returns
     timezone-aware values while stdlib datetime values are timezone-naive.
@@ -338,7 +379,8 @@ def serialize(document, resource=None, schema=None, fields=None):
 
 
 def build_response_document(
-        document, resource, embedded_fields, latest_doc=None):
+        document, resource, embedded_fields, latest_doc=None,
+        identity_map=None):
     """ Prepares a document for response including generation of ETag and
     metadata fields.
 
@@ -346,6 +388,8 @@ def build_response_document(
     :param resource: the resource name.
     :param embedded_fields: the list of fields we are allowed to embed.
     :param document: the latest version of document.
+    :param identity_map: the documents already read during the request, see
+                         :func:`prefetch_embedded_documents`.
 
     .. versionadded:: 0.4
     """
@@ -371,7 +415,8 @@ def build_response_document(
 
     # media and embedded documents
     resolve_media_files(document, resource)
-    resolve_embedded_documents(document, resource, embedded_fields)
+    resolve_embedded_documents(document, resource, embedded_fields,
+                               identity_map)
 
 
 def resolve_embedded_fields(resource, req):
@@ -423,7 +468,8 @@ def resolve_embedded_fields(resource, req):
     return enabled_embedded_fields
 
 
-def resolve_embedded_documents(document, resource, embedded_fields):
+def resolve_embedded_documents(document, resource, embedded_fields,
+                               identity_map=None):
     """ Loops through the documents, adding embedded representations
     of any fields that are (1) defined eligible for embedding in the
     DOMAIN and (2) requested to be embedded in the current `req`.
@@ -435,8 +481,12 @@ def resolve_embedded_documents(document, resource, embedded_fields):
     :param document: the document to embed other documents into.
     :param resource: the resource name.
     :param embedded_fields: the list of fields we are allowed to embed.
+    :param identity_map: the embedded documents already read during the
+                         request, as returned by
+                         :func:`prefetch_embedded_documents`.
 
     .. versionchagend:: 0.4
+        Embedded documents are looked up in `identity_map` first.
         Moved parsing of embedded fields to _resolve_embedded_fields.
         Support for document versioning.
 
@@ -458,7 +508,7 @@ def resolve_embedded_documents(document, resource, embedded_fields):
                 # there is a chance this document hasn't been saved
                 # since versioning was turned on
                 embedded_doc = missing_version_field(
-                    data_relation, document[field])
+                    data_relation, document[field], identity_map)
 
                 if embedded_doc is None:
                     # this document has been saved since the data_relation was
@@ -467,17 +517,20 @@ def resolve_embedded_documents(document, resource, embedded_fields):
                     # try the next best thing - the first version
                     document[field][config.VERSION] = 1
                     embedded_doc = get_data_version_relation_document(
-                        data_relation, document[field])
+                        data_relation, document[field],
+                        identity_map=identity_map)
 
                 latest_embedded_doc = embedded_doc
             else:
                 # grab the specific version
                 embedded_doc = get_data_version_relation_document(
-                    data_relation, document[field])
+                    data_relation, document[field],
+                    identity_map=identity_map)
 
                 # grab the latest version
                 latest_embedded_doc = get_data_version_relation_document(
-                    data_relation, document[field], latest=True)
+                    data_relation, document[field], latest=True,
+                    identity_map=identity_map)
 
             # make sure we got the documents
             if embedded_doc is None or latest_embedded_doc is None:
@@ -491,6 +544,13 @@ def resolve_embedded_documents(document, resource, embedded_fields):
             build_response_document(
                 embedded_doc, data_relation['resource'],
                 [], latest_embedded_doc)
+        elif identity_map is not None:
+            embedded_doc = identity_map.get(identity_key(
+                data_relation['resource'], {config.ID_FIELD: document[field]}
+            ))
+            if embedded_doc:
+                # documents embedding the same one get their own copy
+                embedded_doc = embedded_doc.copy()
         else:
             embedded_doc = app.data.find_one(
                 data_relation['resource'], None,
@@ -500,6 +560,51 @@ def resolve_embedded_documents(document, resource, embedded_fields):
             document[field] = embedded_doc
 
 
+def prefetch_embedded_documents(documents, resource, embedded_fields):
+    """ Reads the documents to be embedded into `documents` with a single
+    :meth:`~eve.io.DataLayer.find_list_of_ids` call per related resource,
+    instead of one query per embedded field of every document. Returns the
+    identity map to be passed to :func:`resolve_embedded_documents`.
+
+    Only the latest version of versioned relations is read here, specific
+    versions are read (once) while resolving the embedded documents.
+
+    :param documents: the documents to embed other documents into.
+    :param resource: the resource name.
+    :param embedded_fields: the list of fields we are allowed to embed.
+
+    .. versionadded:: 0.4
+    """
+    schema = config.DOMAIN[resource]['schema']
+    ids = {}
+    for field in embedded_fields:
+        data_relation = schema[field]['data_relation']
+        versioned = data_relation.get('version') is True
+        if versioned and data_relation['field'] != config.ID_FIELD:
+            continue
+        related = ids.setdefault(data_relation['resource'], set())
+        for document in documents:
+            value = document.get(field)
+            if versioned:
+                value = value.get(config.ID_FIELD) \
+                    if isinstance(value, dict) else None
+            if value is not None:
+                related.add(value)
+
+    identity_map = {}
+    for related, related_ids in ids.items():
+        for id_ in related_ids:
+            identity_map[identity_key(related, {config.ID_FIELD: id_})] = None
+        if not related_ids:
+            continue
+        for embedded_doc in app.data.find_list_of_ids(related,
+                                                      list(related_ids)):
+            id_ = embedded_doc[config.ID_FIELD]
+            identity_map[identity_key(related, {config.ID_FIELD: id_})] = \
+                embedded_doc
+    return identity_map
+
+
 def resolve_media_files(document, resource):
     """ Embed media files into the response document.
 
@@ -12,24 +12,37 @@
 """
 import copy
 import math
+import itertools
 from flask import current_app as app, abort, request
 from .common import ratelimit, epoch, pre_event, resolve_embedded_fields, \
-    build_response_document, resource_link
+    build_response_document, resource_link, prefetch_embedded_documents, \
+    cache_response
 from eve.auth import requires_auth
 from eve.utils import parse_request, home_link, querydef, config
 from eve.versioning import synthesize_versioned_document, versioned_id_field, \
     get_old_document, diff_document
 
+# number of documents read at once when streaming a collection
+STREAMING_CHUNK_SIZE = 100
+
 
 @ratelimit()
 @requires_auth('resource')
 @pre_event
+@cache_response
 def get(resource, **lookup):
     """ Retrieves the resource documents that match the current request.
 
     :param resource: the name of the resource.
 
     .. versionchanged:: 0.4
+       Responses served from the response cache ('cache').
+       If-Modified-Since requests answered by the ETag cache, when enabled.
+       Support for streamed responses ('streaming').
+       Embedded documents are read with one query per related resource.
+       Documents are counted once, and only if pagination is enabled.
+       Support for 'pagination_count'.
+       Support for keyset pagination.
        Add pagination info whatever the HATEOAS status.
        'on_fetched' events now return the whole response (HATEOAS metafields
        included.)
@@ -89,6 +102,15 @@ def get(resource, **lookup):
 
     # facilitate cached responses
     if req.if_modified_since:
+        # the preflight result might be known already
+        cache = _etag_cache(resource)
+        if cache is not None:
+            cache_version = cache.version(resource)
+            request_key = _request_key(lookup)
+            cached = cache.get(resource, request_key, cache_version)
+            if cached is not None and cached[1] <= req.if_modified_since:
+                return response, None, etag, 304
+
         # client has made this request before, has it changed?
         # this request does not account for deleted documents!!! (issue #243)
         preflight_req = copy.copy(req)
@@ -96,13 +118,17 @@ def get(resource, **lookup):
         preflight_req.page = 1
 
         cursor = app.data.find(resource, preflight_req, lookup)
-        if cursor.count() == 0:
+        if cursor.count(with_limit_and_skip=True) == 0:
             # make sure the datasource is not empty (#243).
             if not app.data.is_empty(resource):
                 # the if-modified-since conditional request returned no
                 # documents, we send back a 304 Not-Modified, which means that
                 # the client already has the up-to-date representation of the
                 # resultset.
+                if cache is not None:
+                    # nothing changed up to If-Modified-Since
+                    cache.set(resource, request_key, cache_version, None,
+                              req.if_modified_since)
                 status = 304
                 last_modified = None
                 return response, last_modified, etag, status
@@ -112,9 +138,40 @@ def get(resource, **lookup):
     req.if_modified_since = None
     cursor = app.data.find(resource, req, lookup)
 
-    for document in cursor:
-        build_response_document(document, resource, embedded_fields)
-        documents.append(document)
+    if config.DOMAIN[resource]['streaming']:
+        # documents are sent as they are read. The response has no
+        # Last-Modified header, as it depends on all of them, and pagination
+        # info is added once the documents have been sent.
+        response[config.ITEMS] = _stream_documents(
+            resource, req, lookup, cursor, embedded_fields, response)
+        if config.DOMAIN[resource]['hateoas']:
+            # only the parent and self links until then
+            response[config.LINKS] = _pagination_links(resource, req, None)
+        getattr(app, "on_fetched_resource")(resource, response)
+        getattr(app, "on_fetched_resource_%s" % resource)(response)
+        if hasattr(cursor, 'extra'):
+            getattr(cursor, 'extra')(response)
+        return response, None, etag, 200
+
+    documents = list(cursor)
+
+    keyset = config.DOMAIN[resource]['pagination'] and \
+        config.DOMAIN[resource]['pagination_strategy'] == 'keyset'
+    next_cursor = None
+    if keyset and documents:
+        # the next cursor is built from the raw last document, before
+        # embedded documents are resolved.
+        next_cursor = app.data.keyset_cursor(resource, req, documents[-1])
+
+    # embedded documents are read for the whole page at once
+    identity_map = None
+    if embedded_fields:
+        identity_map = prefetch_embedded_documents(documents, resource,
+                                                   embedded_fields)
+
+    for document in documents:
+        build_response_document(document, resource, embedded_fields,
+                                identity_map=identity_map)
 
         # build last update for entire response
         if document[config.LAST_UPDATED] > last_update:
@@ -123,18 +180,15 @@ def get(resource, **lookup):
     status = 200
     last_modified = last_update if last_update > epoch() else None
 
-    response[config.ITEMS] = documents
-    if config.DOMAIN[resource]['hateoas']:
-        response[config.LINKS] = _pagination_links(resource, req,
-                                                   cursor.count())
+    # the count is only needed by pagination, and it's done at most once as
+    # it's a query on its own.
+    documents_count = None
+    if config.DOMAIN[resource]['pagination']:
+        documents_count = _documents_count(resource, req, lookup, cursor)
 
-    # add pagination info
-    if cursor.count() and config.DOMAIN[resource]['pagination']:
-        response[config.META] = {
-            'page': req.page,
-            'max_results': req.max_results,
-            'total': cursor.count(),
-        }
+    response[config.ITEMS] = documents
+    _add_pagination_info(response, resource, req, documents_count,
+                         next_cursor, len(documents))
 
     # notify registered callback functions. Please note that, should the
     # functions modify the documents, the last_modified and etag won't be
@@ -155,12 +209,15 @@ def get(resource, **lookup):
 @ratelimit()
 @requires_auth('item')
 @pre_event
+@cache_response
 def getitem(resource, **lookup):
     """
     :param resource: the name of the resource to which the document belongs.
     :param **lookup: the lookup query.
 
     .. versionchanged:: 0.4
+       Responses served from the response cache ('cache').
+       Conditional requests answered by the ETag cache, when enabled.
        HATOEAS link for contains the business unit value even when
        regexes have been configured for the resource endpoint.
        'on_fetched' now returns the whole response (HATEOAS metafields
@@ -207,6 +264,21 @@ def getitem(resource, **lookup):
     resource_def = config.DOMAIN[resource]
     embedded_fields = resolve_embedded_fields(resource, req)
 
+    cache = _etag_cache(resource)
+    if cache is not None:
+        cache_version = cache.version(resource)
+        request_key = _request_key(lookup)
+        if req.if_none_match or req.if_modified_since:
+            cached = cache.get(resource, request_key, cache_version)
+            if cached is not None:
+                etag, last_modified = cached
+                if config.IF_MATCH and req.if_none_match and \
+                        etag == req.if_none_match:
+                    return {}, last_modified, etag, 304
+                if req.if_modified_since and \
+                        last_modified <= req.if_modified_since:
+                    return {}, last_modified, etag, 304
+
     document = app.data.find_one(resource, req, **lookup)
     if not document:
         abort(404)
@@ -228,6 +300,10 @@ def getitem(resource, **lookup):
     # last_modified for the response
     last_modified = document[config.LAST_UPDATED]
 
+    if cache is not None:
+        cache.set(resource, request_key, cache_version,
+                  document.get(config.ETAG), last_modified)
+
     # facilitate client caching by returning a 304 when appropriate
     if config.IF_MATCH:
         etag = document[config.ETAG]
@@ -314,15 +390,148 @@ def getitem(resource, **lookup):
     return response, last_modified, etag, 200
 
 
-def _pagination_links(resource, req, documents_count):
+def _etag_cache(resource):
+    """ Returns the ETag cache if enabled and if the responses of `resource`
+    are the same for all users.
+
+    :param resource: the resource name.
+
+    .. versionadded:: 0.4
+    """
+    if config.DOMAIN[resource]['auth_field']:
+        return None
+    return app.etag_cache
+
+
+def _request_key(lookup):
+    """ Returns what identifies the response to the current request in the
+    ETag cache: the lookup and the query arguments.
+
+    :param lookup: the lookup of the request.
+
+    .. versionadded:: 0.4
+    """
+    return lookup, sorted(request.args.lists())
+
+
+def _stream_documents(resource, req, lookup, cursor, embedded_fields,
+                      response):
+    """ Yields the documents of `cursor`, ready to be sent to the client.
+    Documents are read in chunks of STREAMING_CHUNK_SIZE, the embedded
+    documents of each chunk being read at once. Once all documents have been
+    yielded the links and pagination info are added to `response`.
+
+    :param resource: the resource name.
+    :param req: and instace of :class:`eve.utils.ParsedRequest`.
+    :param lookup: the sub-resource lookup.
+    :param cursor: the cursor returned by the data layer for the request.
+    :param embedded_fields: the embedded fields of the request.
+    :param response: the response the documents are sent in.
+
+    .. versionadded:: 0.4
+    """
+    settings = config.DOMAIN[resource]
+    keyset = settings['pagination'] and \
+        settings['pagination_strategy'] == 'keyset'
+    next_cursor = None
+    page_count = 0
+    documents_iter = iter(cursor)
+    while True:
+        documents = list(itertools.islice(documents_iter,
+                                          STREAMING_CHUNK_SIZE))
+        if not documents:
+            break
+        if keyset:
+            next_cursor = app.data.keyset_cursor(resource, req, documents[-1])
+        identity_map = None
+        if embedded_fields:
+            identity_map = prefetch_embedded_documents(documents, resource,
+                                                       embedded_fields)
+        page_count += len(documents)
+        for document in documents:
+            build_response_document(document, resource, embedded_fields,
+                                    identity_map=identity_map)
+            yield document
+
+    documents_count = None
+    if settings['pagination']:
+        documents_count = _documents_count(resource, req, lookup, cursor)
+    _add_pagination_info(response, resource, req, documents_count,
+                         next_cursor, page_count)
+
+
+def _add_pagination_info(response, resource, req, documents_count,
+                         next_cursor, page_count):
+    """ Adds the links and the pagination info (`_meta`) of a page of
+    documents to `response`.
+
+    :param response: the response dict.
+    :param resource: the resource name.
+    :param req: and instace of :class:`eve.utils.ParsedRequest`.
+    :param documents_count: the number of documents matching the request,
+                            None if they have not been counted.
+    :param next_cursor: the cursor of the next page, when the resource uses
+                        keyset pagination.
+    :param page_count: the number of documents in the page.
+
+    .. versionadded:: 0.4
+    """
+    settings = config.DOMAIN[resource]
+    if settings['hateoas']:
+        response[config.LINKS] = _pagination_links(resource, req,
+                                                   documents_count,
+                                                   next_cursor,
+                                                   page_count)
+
+    if settings['pagination'] and (documents_count or page_count):
+        response[config.META] = {'max_results': req.max_results}
+        # with keyset pagination the count only includes the documents
+        # from the current page on, and pages have no number.
+        if settings['pagination_strategy'] != 'keyset':
+            response[config.META]['page'] = req.page
+            if documents_count is not None:
+                response[config.META]['total'] = documents_count
+
+
+def _documents_count(resource, req, lookup, cursor):
+    """ Returns the number of documents matching the request, according to
+    the resource `pagination_count`: either the exact count, an estimate or
+    None when documents are not counted.
+
+    :param resource: the resource name.
+    :param req: and instace of :class:`eve.utils.ParsedRequest`.
+    :param lookup: the sub-resource lookup.
+    :param cursor: the cursor returned by the data layer for the request.
+
+    .. versionadded:: 0.4
+    """
+    mode = config.DOMAIN[resource]['pagination_count']
+    if mode == 'none':
+        return None
+    if mode == 'estimated':
+        return app.data.estimated_count(resource, req, lookup)
+    return cursor.count()
+
+
+def _pagination_links(resource, req, documents_count, next_cursor=None,
+                      page_count=None):
     """ Returns the appropriate set of resource links depending on the
     current page and the total number of documents returned by the query.
 
     :param resource: the resource name.
     :param req: and instace of :class:`eve.utils.ParsedRequest`.
-    :param document_count: the number of documents returned by the query.
+    :param document_count: the number of documents returned by the query,
+                           None if they have not been counted.
+    :param next_cursor: the cursor of the next page, when the resource uses
+                        keyset pagination.
+    :param page_count: the number of documents in the current page.
 
     .. versionchanged:: 0.4
+       Without a count (or with an estimated one), a full page always has a
+       'next' link, and there is no 'last' link if documents are not
+       counted.
+       With keyset pagination only the 'next' link is provided, as the
+       cursor of the next page.
        HATOEAS link for contains the business unit value even when
        regexes have been configured for the resource endpoint.
 
@@ -343,26 +552,50 @@ def _pagination_links(resource, req, documents_count):
               'self': {'title': config.DOMAIN[resource]['resource_title'],
                        'href': resource_link()}}
 
-    if documents_count and config.DOMAIN[resource]['pagination']:
-        if req.page * req.max_results < documents_count:
-            q = querydef(req.max_results, req.where, req.sort, req.page + 1)
-            _links['next'] = {'title': 'next page', 'href': '%s%s' %
-                              (resource_link(), q)}
+    settings = config.DOMAIN[resource]
+    if not settings['pagination'] or not (documents_count or page_count):
+        return _links
 
-            # in python 2.x dividing 2 ints produces an int and that's rounded
-            # before the ceil call. Have to cast one value to float to get
-            # a correct result. Wonder if 2 casts + ceil() call are actually
-            # faster than documents_count // req.max_results and then adding
-            # 1 if the modulo is non-zero...
-            last_page = int(math.ceil(documents_count
-                                      / float(req.max_results)))
-            q = querydef(req.max_results, req.where, req.sort, last_page)
-            _links['last'] = {'title': 'last page', 'href': '%s%s'
-                              % (resource_link(), q)}
-
-        if req.page > 1:
-            q = querydef(req.max_results, req.where, req.sort, req.page - 1)
-            _links['prev'] = {'title': 'previous page', 'href': '%s%s' %
+    keyset = settings['pagination_strategy'] == 'keyset'
+    if documents_count is None:
+        has_next = False
+    elif keyset:
+        # documents_count starts at the current page
+        has_next = req.max_results < documents_count
+    else:
+        has_next = req.page * req.max_results < documents_count
+    if settings['pagination_count'] != 'exact':
+        # estimates might be behind
+        has_next = has_next or page_count == req.max_results
+
+    if keyset:
+        if has_next and next_cursor:
+            q = querydef(req.max_results, req.where, req.sort,
+                         cursor=next_cursor)
+            _links['next'] = {'title': 'next page', 'href': '%s%s' %
                               (resource_link(), q)}
+        return _links
+
+    if has_next:
+        q = querydef(req.max_results, req.where, req.sort, req.page + 1)
+        _links['next'] = {'title': 'next page', 'href': '%s%s' %
+                          (resource_link(), q)}
+
+    if documents_count and req.page * req.max_results < documents_count:
+        # in python 2.x dividing 2 ints produces an int and that's rounded
+        # before the ceil call. Have to cast one value to float to get
+        # a correct result. Wonder if 2 casts + ceil() call are actually
+        # faster than documents_count // req.max_results and then adding
+        # 1 if the modulo is non-zero...
+        last_page = int(math.ceil(documents_count
+                                  / float(req.max_results)))
+        q = querydef(req.max_results, req.where, req.sort, last_page)
+        _links['last'] = {'title': 'last page', 'href': '%s%s'
+                          % (resource_link(), q)}
+
+    if req.page > 1:
+        q = querydef(req.max_results, req.where, req.sort, req.page - 1)
+        _links['prev'] = {'title': 'previous page', 'href': '%s%s' %
+                          (resource_link(), q)}
 
     return _links
@@ -49,6 +49,10 @@ def post(resource, payl=None):
                  discussion, and a typical use case.
 
     .. versionchanged:: 0.4
+       Documents are parsed before being validated, and the validator can
+       look up the values of the whole payload at once (see
+       :meth:`eve.io.mongo.Validator.prefetch`). Duplicate values of
+       'unique' fields are now detected within the payload too.
        Resolve default values before validation is performed. See #353.
        Support for document versioning.
 
@@ -136,12 +140,26 @@ def post(resource, payl=None):
     if isinstance(payl, dict):
         payl = [payl]
 
+    # documents are parsed first so that the validator can look up their
+    # references in batch
+    parsed = []
     for value in payl:
-        document = []
-        doc_issues = {}
         try:
             document = parse(value, resource)
             resolve_default_values(document, resource_def['defaults'])
+            parsed.append((document, None))
+        except Exception as e:
+            parsed.append(([], e))
+
+    if hasattr(validator, 'prefetch'):
+        validator.prefetch([document for document, error in parsed
+                            if error is None])
+
+    for document, error in parsed:
+        doc_issues = {}
+        try:
+            if error is not None:
+                raise error
             validation = validator.validate(document)
             if validation:
                 # validation is successful
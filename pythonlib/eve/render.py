@@ -11,13 +11,19 @@
 """
 
 import time
+import types
 import datetime
 import simplejson as json
+from collections import Iterator
 from werkzeug import utils
 from functools import wraps
-from eve.methods.common import get_rate_limit
+from eve.methods.common import get_rate_limit, get_response_cache
 from eve.utils import date_to_str, config, request_method, debug_error_message
-from flask import make_response, request, Response, current_app as app, abort
+from flask import make_response, request, Response, current_app as app, \
+    abort, stream_with_context
+
+# size (in characters) of the chunks of streamed responses
+STREAMING_BUFFER_SIZE = 16384
 
 # mapping between supported mime types and render functions.
 _MIME_TYPES = [
@@ -101,6 +107,8 @@ def _prepare_response(resource, dct, last_modified=None, etag=None,
     :param status: response status.
 
     .. versionchanged:: 0.4
+       Rendered responses are served from and stored to the response cache.
+       Streamed responses, when the renderer returns a generator.
        Support for optional extra headers.
        Fix #381. 500 instead of 404 if CORS is enabled.
 
@@ -127,15 +135,30 @@ def _prepare_response(resource, dct, last_modified=None, etag=None,
     if request.method == 'OPTIONS':
         resp = app.make_default_options_response()
     else:
-        # obtain the best match between client's request and available mime
-        # types, along with the corresponding render function.
-        mime, renderer = _best_mime()
+        cached = get_response_cache()
+        if cached and cached[1]:
+            mime, rendered = cached[1][:2]
+        else:
+            # obtain the best match between client's request and available
+            # mime types, along with the corresponding render function.
+            mime, renderer = _best_mime()
+
+            # invoke the render function and obtain the corresponding
+            # rendered item
+            rendered = globals()[renderer](dct)
 
-        # invoke the render function and obtain the corresponding rendered item
-        rendered = globals()[renderer](dct)
+            if cached and status == 200 and \
+                    not isinstance(rendered, types.GeneratorType):
+                app.response_cache.set(cached[0], mime, rendered,
+                                       last_modified, etag, status)
 
         # build the main wsgi rensponse object
-        resp = make_response(rendered, status)
+        if isinstance(rendered, types.GeneratorType):
+            # streamed, the request context is needed until it's all sent
+            resp = app.response_class(stream_with_context(rendered),
+                                      status=status)
+        else:
+            resp = make_response(rendered, status)
         resp.mimetype = mime
 
     # extra headers
@@ -223,6 +246,10 @@ def _best_mime():
 def render_json(data):
     """ JSON render function
 
+    .. versionchanged:: 0.4
+       When the items are an iterator (streamed collection), returns a
+       generator of the JSON output instead.
+
     .. versionchanged:: 0.2
        Json encoder class is now inferred by the active data layer, allowing
        for customized, data-aware JSON encoding.
@@ -230,15 +257,56 @@ def render_json(data):
     .. versionchanged:: 0.1.0
        Support for optional HATEOAS.
     """
+    if isinstance(data, dict) and \
+            isinstance(data.get(config.ITEMS), Iterator):
+        return _stream_json(data, app.data.json_encoder_class())
     return json.dumps(data, cls=app.data.json_encoder_class)
 
 
+def _stream_json(data, encoder):
+    """ Yields the JSON output of `data` in chunks, items being encoded one at
+    a time. The other fields are encoded after the items, as the pagination
+    info of a streamed collection is only known once all items are sent.
+
+    :param data: the data stream to be rendered as json.
+    :param encoder: the JSON encoder.
+
+    .. versionadded:: 0.4
+    """
+    chunk = ['{%s: [' % encoder.encode(config.ITEMS)]
+    size = 0
+    separator = ''
+    for item in data[config.ITEMS]:
+        encoded = encoder.encode(item)
+        chunk.append(separator)
+        chunk.append(encoded)
+        separator = ', '
+        size += len(encoded)
+        if size >= STREAMING_BUFFER_SIZE:
+            yield ''.join(chunk)
+            chunk = []
+            size = 0
+    chunk.append(']')
+
+    fields = dict((k, v) for k, v in data.items() if k != config.ITEMS)
+    if fields:
+        # '{"field": ...}' without its opening brace
+        chunk.append(', ')
+        chunk.append(encoder.encode(fields)[1:])
+    else:
+        chunk.append('}')
+    yield ''.join(chunk)
+
+
 def render_xml(data):
     """ XML render function.
 
     :param data: the data stream to be rendered as xml.
 
     .. versionchanged:: 0.4
+       When the items are an iterator (streamed collection), returns a
+       generator of the XML output instead.
+       Output is joined once instead of concatenated.
        Support for pagination info (_meta).
 
     .. versionchanged:: 0.2
@@ -252,17 +320,46 @@ def render_xml(data):
     """
     if isinstance(data, list):
         data = {config.ITEMS: data}
+    elif data and isinstance(data.get(config.ITEMS), Iterator):
+        return _stream_xml(data)
 
     xml = ''
     if data:
-        xml += xml_root_open(data)
-        xml += xml_add_links(data)
-        xml += xml_add_meta(data)
-        xml += xml_add_items(data)
-        xml += xml_root_close()
+        # the order matters, links are removed from data once rendered
+        xml = ''.join([xml_root_open(data), xml_add_links(data),
+                       xml_add_meta(data), xml_add_items(data),
+                       xml_root_close()])
     return xml
 
 
+def _stream_xml(data):
+    """ Yields the XML output of `data` in chunks, items being rendered one
+    at a time. Links (except the `self` one) and pagination info are
+    rendered after the items, as they're only known once all items are sent.
+
+    :param data: the data stream to be rendered as xml.
+
+    .. versionadded:: 0.4
+    """
+    chunk = [xml_root_open(data)]
+    size = 0
+    for item in data[config.ITEMS]:
+        rendered = xml_item(item)
+        chunk.append(rendered)
+        size += len(rendered)
+        if size >= STREAMING_BUFFER_SIZE:
+            yield ''.join(chunk)
+            chunk = []
+            size = 0
+
+    # the self link has been rendered in the root node already
+    data.get(config.LINKS, {}).pop('self', None)
+    chunk.append(xml_add_links(data))
+    chunk.append(xml_add_meta(data))
+    chunk.append(xml_root_close())
+    yield ''.join(chunk)
+
+
 def xml_root_open(data):
     """ Returns the opening tag for the XML root node. If the datastream
     includes informations about resource endpoints (href, title), they will
@@ -312,22 +409,25 @@ def xml_add_links(data):
 
     :param data: the data stream to be rendered as xml.
 
+    .. versionchanged:: 0.4
+       Output is joined once instead of concatenated.
+
     .. versionchanged:: 0.0.6
        Links are now properly escaped.
 
     .. versionadded:: 0.0.3
     """
-    xml = ''
+    xml = []
     chunk = '<link rel="%s" href="%s" title="%s" />'
     links = data.pop(config.LINKS, {})
     for rel, link in links.items():
         if isinstance(link, list):
-            xml += ''.join([chunk % (rel, utils.escape(d['href']), d['title'])
-                            for d in link])
+            xml.extend([chunk % (rel, utils.escape(d['href']), d['title'])
+                        for d in link])
         else:
-            xml += ''.join(chunk % (rel, utils.escape(link['href']),
-                                    link['title']))
-    return xml
+            xml.append(chunk % (rel, utils.escape(link['href']),
+                                link['title']))
+    return ''.join(xml)
 
 
 def xml_add_items(data):
@@ -351,13 +451,15 @@ def xml_item(item):
 
     :param data: the data stream to be rendered as xml.
 
+    .. versionchanged:: 0.4
+       Output is joined once instead of concatenated.
+
     .. versionadded:: 0.0.3
     """
-    xml = xml_root_open(item)
-    xml += xml_add_links(item)
-    xml += xml_dict(item)
-    xml += xml_root_close()
-    return xml
+    xml = [xml_root_open(item), xml_add_links(item)]
+    _write_xml_dict(item, xml)
+    xml.append(xml_root_close())
+    return ''.join(xml)
 
 
 def xml_root_close():
@@ -373,12 +475,28 @@ def xml_dict(data):
 
     :param data: the data stream to be rendered as xml.
 
+    .. versionchanged:: 0.4
+       Nested dicts are written to the same output list, which is joined
+       once.
+
     .. versionchanged:: 0.2
        Leaf values are now properly escaped.
 
     .. versionadded:: 0.0.3
     """
-    xml = ''
+    xml = []
+    _write_xml_dict(data, xml)
+    return ''.join(xml)
+
+
+def _write_xml_dict(data, xml):
+    """ Appends the XML chunks of a dict to the `xml` list.
+
+    :param data: the data stream to be rendered as xml.
+    :param xml: the list of output chunks.
+
+    .. versionadded:: 0.4
+    """
     for k, v in data.items():
         if isinstance(v, datetime.datetime):
             v = date_to_str(v)
@@ -389,10 +507,9 @@ def xml_dict(data):
         for value in v:
             if isinstance(value, dict):
                 links = xml_add_links(value)
-                xml += "<%s>" % k
-                xml += xml_dict(value)
-                xml += links
-                xml += "</%s>" % k
+                xml.append("<%s>" % k)
+                _write_xml_dict(value, xml)
+                xml.append(links)
+                xml.append("</%s>" % k)
             else:
-                xml += "<%s>%s</%s>" % (k, utils.escape(value), k)
-    return xml
+                xml.append("<%s>%s</%s>" % (k, utils.escape(value), k))
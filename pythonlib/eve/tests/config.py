@@ -194,6 +194,12 @@ class TestConfig(TestBase):
         self.assertEqual(settings['sorting'], self.app.config['SORTING'])
         self.assertEqual(settings['embedding'], self.app.config['EMBEDDING'])
         self.assertEqual(settings['pagination'], self.app.config['PAGINATION'])
+        self.assertEqual(settings['pagination_strategy'],
+                         self.app.config['PAGINATION_STRATEGY'])
+        self.assertEqual(settings['pagination_count'],
+                         self.app.config['PAGINATION_COUNT'])
+        self.assertEqual(settings['streaming'], self.app.config['STREAMING'])
+        self.assertEqual(settings['cache'], self.app.config['CACHE'])
         self.assertEqual(settings['auth_field'],
                          self.app.config['AUTH_FIELD'])
         self.assertEqual(settings['allow_unknown'],
@@ -5,6 +5,8 @@ from eve.tests import TestBase
 from eve.tests.utils import DummyEvent
 from eve.tests.test_settings import MONGO_DBNAME
 from eve.utils import date_to_str, str_to_date
+from eve.cache import ETagCache, ResponseCache
+from werkzeug.contrib.cache import SimpleCache
 
 
 class TestGet(TestBase):
@@ -100,6 +102,127 @@ class TestGet(TestBase):
         self.assertTrue('next' not in links)
         self.assertTrue('prev' not in links)
 
+    def test_get_paging_count_none(self):
+        self.app.config['DOMAIN'][self.known_resource]['pagination_count'] = \
+            'none'
+        response, status = self.get(self.known_resource)
+        self.assert200(status)
+        meta = response[self.app.config['META']]
+        self.assertTrue('total' not in meta)
+        self.assertEqual(meta['page'], 1)
+        links = response['_links']
+        self.assertNextLink(links, 2)
+        self.assertLastLink(links, None)
+
+        response, status = self.get(self.known_resource, '?page=5')
+        self.assert200(status)
+        self.assertEqual(len(response['_items']), 1)
+        links = response['_links']
+        self.assertTrue('next' not in links)
+        self.assertLastLink(links, None)
+        self.assertPrevLink(links, 4)
+
+    def test_get_paging_count_estimated(self):
+        self.app.config['DOMAIN'][self.known_resource]['pagination_count'] = \
+            'estimated'
+        response, status = self.get(self.known_resource)
+        self.assert200(status)
+        self.assertPagination(response, 1, 101, 25)
+
+        where = '?where={"prog": {"$lt": 60}}'
+        response, status = self.get(self.known_resource, where)
+        self.assert200(status)
+        self.assertPagination(response, 1, 60, 25)
+
+        # counts of filtered requests are cached
+        _db = self.connection[MONGO_DBNAME]
+        _db.contacts.insert(self.random_contacts(10))
+        response, status = self.get(self.known_resource, where)
+        self.assertPagination(response, 1, 60, 25)
+        response, status = self.get(self.known_resource)
+        self.assertPagination(response, 1, 111, 25)
+
+    def test_get_streaming(self):
+        query = '?max_results=50&page=2'
+        expected, status = self.get(self.known_resource, query)
+        self.assert200(status)
+
+        self.app.config['DOMAIN'][self.known_resource]['streaming'] = True
+        r = self.test_client.get(self.known_resource_url + query)
+        self.assertTrue('Content-Length' not in r.headers)
+        self.assertTrue('Last-Modified' not in r.headers)
+        response, status = self.parse_response(r)
+        self.assert200(status)
+        self.assertEqual(response, expected)
+
+        r = self.test_client.get(self.known_resource_url + '?page=10')
+        response, status = self.parse_response(r)
+        self.assert200(status)
+        self.assertEqual(response['_items'], [])
+        self.assertPrevLink(response['_links'], 9)
+
+    def test_get_keyset_paging(self):
+        self.app.config['DOMAIN'][self.known_resource]['pagination_strategy'] \
+            = 'keyset'
+        ids = []
+        query = '?max_results=30'
+        pages = 0
+        while query:
+            response, status = self.get(self.known_resource, query)
+            self.assert200(status)
+            ids.extend(item['_id'] for item in response['_items'])
+            pages += 1
+
+            links = response['_links']
+            self.assertTrue('prev' not in links)
+            self.assertTrue('last' not in links)
+            meta = response[self.app.config['META']]
+            self.assertTrue('page' not in meta)
+            self.assertEqual(meta['max_results'], 30)
+            query = None
+            if 'next' in links:
+                self.assertEqual('next page', links['next']['title'])
+                self.assertTrue('cursor=' in links['next']['href'])
+                query = '?' + links['next']['href'].split('?')[1]
+
+        self.assertEqual(pages, 4)
+        self.assertEqual(len(ids), self.known_resource_count)
+        self.assertEqual(ids, sorted(set(ids)))
+
+    def test_get_keyset_paging_sort(self):
+        self.app.config['DOMAIN'][self.known_resource]['pagination_strategy'] \
+            = 'keyset'
+        # 'role' has just a few distinct values, _id breaks the ties.
+        sort = '[("role", -1)]'
+        items = []
+        query = '?max_results=10&sort=%s' % sort
+        while query:
+            response, status = self.get(self.known_resource, query)
+            self.assert200(status)
+            items.extend((item['role'], item['_id'])
+                         for item in response['_items'])
+            links = response['_links']
+            query = '?' + links['next']['href'].split('?')[1] \
+                if 'next' in links else None
+
+        self.assertEqual(len(set(items)), self.known_resource_count)
+        expected = sorted(sorted(items, key=lambda item: item[1]),
+                          key=lambda item: item[0], reverse=True)
+        self.assertEqual(items, expected)
+
+    def test_get_keyset_paging_invalid_cursor(self):
+        self.app.config['DOMAIN'][self.known_resource]['pagination_strategy'] \
+            = 'keyset'
+        response, status = self.get(self.known_resource, '?cursor=invalid')
+        self.assert400(status)
+
+        # a cursor is only valid for the sort it has been built with
+        response, status = self.get(self.known_resource)
+        query = '?' + response['_links']['next']['href'].split('?')[1]
+        response, status = self.get(self.known_resource,
+                                    query + '&sort=[("prog", -1)]')
+        self.assert400(status)
+
     def test_get_where_mongo_syntax(self):
         where = '{"ref": "%s"}' % self.item_name
         response, status = self.get(self.known_resource,
@@ -259,6 +382,69 @@ class TestGet(TestBase):
     def test_get_if_modified_since(self):
         self.assertIfModifiedSince(self.known_resource_url)
 
+    def test_get_if_modified_since_etag_cache(self):
+        ETagCache(SimpleCache()).init_app(self.app)
+        r = self.test_client.get(self.known_resource_url)
+        headers = [('If-Modified-Since', r.headers.get('Last-Modified'))]
+        r = self.test_client.get(self.known_resource_url, headers=headers)
+        self.assert304(r.status_code)
+
+        # answered without querying the database
+        queries = []
+        find = self.app.data.find
+
+        def counting_find(*args):
+            queries.append(args)
+            return find(*args)
+        self.app.data.find = counting_find
+        r = self.test_client.get(self.known_resource_url, headers=headers)
+        self.assert304(r.status_code)
+        self.assertEqual(len(queries), 0)
+
+        # writes invalidate the cache
+        response, status = self.delete(self.item_id_url,
+                                       headers=[('If-Match', self.item_etag)])
+        self.assert200(status)
+        self.test_client.get(self.known_resource_url, headers=headers)
+        self.assertEqual(len(queries), 1)
+
+    def test_get_response_cache(self):
+        ResponseCache(SimpleCache()).init_app(self.app)
+        self.domain['invoices']['cache'] = True
+        queries = []
+        find = self.app.data.find
+
+        def counting_find(*args):
+            queries.append(args)
+            return find(*args)
+        self.app.data.find = counting_find
+
+        url = '/%s?where={"inv_number": "1", "person": {"$ne": null}}' % \
+            self.domain['invoices']['url']
+        r = self.test_client.get(url)
+        self.assert200(r.status_code)
+        self.assertEqual(len(queries), 1)
+
+        # same normalized query
+        url = '/%s?where={"person": {"$ne": null}, "inv_number": "1"}' % \
+            self.domain['invoices']['url']
+        cached = self.test_client.get(url)
+        self.assert200(cached.status_code)
+        self.assertEqual(cached.data, r.data)
+        self.assertEqual(len(queries), 1)
+
+        # writes to related resources invalidate the cache
+        changes = {'ref': '9999999999999999999999999'}
+        response, status = self.patch(self.item_id_url, data=changes,
+                                      headers=[('If-Match', self.item_etag)])
+        self.assert200(status)
+        self.test_client.get(url)
+        self.assertEqual(len(queries), 2)
+
+        response, status = self.parse_response(self.test_client.get('/'))
+        self.assertEqual(response[self.app.config['META']]['cache'],
+                         {'hits': 1, 'misses': 2})
+
     def test_cache_control(self):
         self.assertCacheControl(self.known_resource_url)
 
@@ -422,6 +608,44 @@ class TestGet(TestBase):
         content = json.loads(r.get_data())
         self.assertTrue('location' in content['person'])
 
+    def test_get_embedded_batch(self):
+        _db = self.connection[MONGO_DBNAME]
+        contact_ids = _db.contacts.insert(self.random_contacts(2))
+        missing_id = ObjectId()
+        _db.invoices.insert([
+            {'inv_number': 'batch', 'person': contact_ids[0]},
+            {'inv_number': 'batch', 'person': contact_ids[0]},
+            {'inv_number': 'batch', 'person': contact_ids[1]},
+            {'inv_number': 'batch', 'person': missing_id},
+        ])
+        invoices = self.domain['invoices']
+        invoices['schema']['person']['data_relation']['embeddable'] = True
+
+        # embedded documents are all read at once, not one by one
+        lookups = []
+        find_one = self.app.data.find_one
+
+        def counting_find_one(resource, req, **lookup):
+            lookups.append(lookup)
+            return find_one(resource, req, **lookup)
+        self.app.data.find_one = counting_find_one
+
+        where = '{"inv_number": "batch"}'
+        r = self.test_client.get('%s?where=%s&embedded={"person": 1}' %
+                                 (invoices['url'], where))
+        self.assert200(r.status_code)
+        self.assertEqual(lookups, [])
+
+        items = json.loads(r.get_data())['_items']
+        self.assertEqual(len(items), 4)
+        persons = [item['person'] for item in items]
+        for person in persons[:3]:
+            self.assertTrue('location' in person)
+        self.assertEqual(persons[0]['_id'], str(contact_ids[0]))
+        self.assertEqual(persons[1]['_id'], str(contact_ids[0]))
+        self.assertEqual(persons[2]['_id'], str(contact_ids[1]))
+        self.assertEqual(persons[3], str(missing_id))
+
     def test_get_default_embedding(self):
         # We need to assign a `person` to our test invoice
         _db = self.connection[MONGO_DBNAME]
@@ -662,6 +886,35 @@ class TestGetItem(TestBase):
         self.assert304(r.status_code)
         self.assertTrue(not r.get_data())
 
+    def test_getitem_etag_cache(self):
+        ETagCache(SimpleCache()).init_app(self.app)
+        r = self.test_client.get(self.item_id_url)
+        etag = r.headers.get('ETag')
+        last_modified = r.headers.get('Last-Modified')
+
+        # answered without reading the document
+        find_one = self.app.data.find_one
+        self.app.data.find_one = None
+        r = self.test_client.get(self.item_id_url,
+                                 headers=[('If-None-Match', etag)])
+        self.assert304(r.status_code)
+        self.assertEqual(r.headers.get('ETag'), etag)
+        r = self.test_client.get(self.item_id_url,
+                                 headers=[('If-Modified-Since',
+                                           last_modified)])
+        self.assert304(r.status_code)
+        self.app.data.find_one = find_one
+
+        # writes invalidate the cache
+        changes = {'ref': '9999999999999999999999999'}
+        response, status = self.patch(self.item_id_url, data=changes,
+                                      headers=[('If-Match', etag)])
+        self.assert200(status)
+        r = self.test_client.get(self.item_id_url,
+                                 headers=[('If-None-Match', etag)])
+        self.assert200(r.status_code)
+        self.assertNotEqual(r.headers.get('ETag'), etag)
+
     def test_cache_control(self):
         self.assertCacheControl(self.item_id_url)
 
@@ -188,6 +188,40 @@ class TestPost(TestBase):
         self.assert201(status)
         self.assertPostResponse(r)
 
+    def test_multi_post_referential_integrity(self):
+        # references are looked up once for the whole payload
+        lookups = []
+        find_one = self.app.data.find_one
+
+        def counting_find_one(resource, req, **lookup):
+            lookups.append(lookup)
+            return find_one(resource, req, **lookup)
+        self.app.data.find_one = counting_find_one
+
+        data = [{"person": self.item_id}, {"person": self.unknown_item_id},
+                {"person": self.item_id}]
+        r, status = self.post('/invoices/', data=data)
+        self.assert400(status)
+        self.assertEqual(lookups, [])
+        results = r['_items']
+        self.assertEqual(results[0]['_status'], 'OK')
+        self.assertEqual(results[2]['_status'], 'OK')
+        expected = ("value '%s' must exist in resource '%s', field '%s'" %
+                    (self.unknown_item_id, 'contacts',
+                     self.app.config['ID_FIELD']))
+        self.assertValidationError(results[1], {'person': expected})
+
+    def test_multi_post_unique_duplicates(self):
+        ref = "9234567890123456789054321"
+        data = [{"ref": ref}, {"ref": "5432112345678901234567890"},
+                {"ref": ref}]
+        r, status = self.post(self.known_resource_url, data=data)
+        self.assert400(status)
+        results = r['_items']
+        self.assertEqual(results[0]['_status'], 'OK')
+        self.assertEqual(results[1]['_status'], 'OK')
+        self.assertValidationError(results[2], {'ref': 'unique'})
+
     def test_post_allow_unknown(self):
         del(self.domain['contacts']['schema']['ref']['required'])
         data = {"unknown": "unknown"}
@@ -38,6 +38,23 @@ class TestRenders(TestBase):
                                  headers=[('Accept', 'application/xml')])
         self.assertTrue(b'12345 &amp; 6789' in r.get_data())
 
+    def test_xml_streaming(self):
+        url = '%s?max_results=50&page=2' % self.known_resource_url
+        headers = [('Accept', 'application/xml')]
+        expected = self.test_client.get(url, headers=headers).get_data()
+
+        self.domain[self.known_resource]['streaming'] = True
+        r = self.test_client.get(url, headers=headers)
+        self.assertTrue('application/xml' in r.content_type)
+        self.assertTrue('Content-Length' not in r.headers)
+        xml = r.get_data()
+        self.assertEqual(len(xml), len(expected))
+        self.assertEqual(xml.count(b'<resource '),
+                         expected.count(b'<resource '))
+        # links come after the items
+        self.assertTrue(xml.index(b'<link rel="prev"') >
+                        xml.rindex(b'</resource><'))
+
     def test_unknown_render(self):
         r = self.test_client.get('/', headers=[('Accept', 'application/html')])
         self.assertEqual(r.content_type, 'application/json')
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+"""
+    Benchmark of the validation of 100,000 documents against the schemas of
+    the test settings, with a new validator for every document (as for every
+    request) and with one validator for all of them.
+
+    The rules that need a database (`unique`, `data_relation`) or a resource
+    (`readonly`) are left out.
+
+        python -m eve.tests.validation_benchmark [number]
+"""
+
+import sys
+import copy
+import time
+from datetime import datetime
+from bson import ObjectId
+from eve.io.mongo.validation import Validator
+from eve.tests.test_settings import DOMAIN
+
+DATABASE_RULES = ('unique', 'data_relation', 'readonly')
+
+
+def strip_schema(schema):
+    schema = copy.deepcopy(schema)
+    for definition in schema.values():
+        for rule in DATABASE_RULES:
+            definition.pop(rule, None)
+    return schema
+
+
+def contact(i):
+    return {
+        'ref': '%025d' % i,
+        'prog': i,
+        'role': ['agent', 'client'],
+        'rows': [{'sku': 'AT1234', 'price': 99}, {'sku': 'XF9876'}],
+        'alist': ['a string', i],
+        'location': {'address': '14 Main St', 'city': 'Amsterdam'},
+        'born': datetime(1970, 1, 1),
+        'tid': ObjectId(),
+        'title': 'Mr.',
+        'id_list': [ObjectId(), ObjectId()],
+        'id_list_of_dict': [{'id': ObjectId()}],
+        'id_list_fixed_len': [ObjectId()],
+        'dependency_field1': 'value',
+        'dependency_field2': 'value',
+    }
+
+
+def invoice(i):
+    return {'inv_number': str(i), 'person': ObjectId()}
+
+
+def run(name, schema, documents):
+    start = time.time()
+    for document in documents:
+        assert Validator(schema).validate(document), name
+    per_request = time.time() - start
+
+    validator = Validator(schema)
+    start = time.time()
+    for document in documents:
+        assert validator.validate(document), name
+    reused = time.time() - start
+
+    print('%-10s %8d documents  %8.2f s new validator  %8.2f s reused'
+          % (name, len(documents), per_request, reused))
+
+
+def main(number=100000):
+    run('contacts', strip_schema(DOMAIN['contacts']['schema']),
+        [contact(i) for i in range(number)])
+    run('invoices', strip_schema(DOMAIN['invoices']['schema']),
+        [invoice(i) for i in range(number)])
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
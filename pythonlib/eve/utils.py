@@ -11,11 +11,12 @@
 """
 
 import eve
+import base64
 import hashlib
-from flask import request
+from flask import request, abort
 from flask import current_app as app
 from datetime import datetime, timedelta
-from bson.json_util import dumps
+from bson.json_util import dumps, loads
 import werkzeug.exceptions
 
 
@@ -43,6 +44,9 @@ config = Config()
 class ParsedRequest(object):
     """ This class, by means of its attributes, describes a client request.
 
+    .. versionchanged:: 0.4
+       'cursor' keyword.
+
     .. versonchanged:: 0.1.0
        'embedded' keyword.
 
@@ -77,6 +81,10 @@ class ParsedRequest(object):
     # `embedded` value of the query string (?embedded). Defaults to None.
     embedded = None
 
+    # `cursor` value of the query string (?cursor), only parsed when the
+    # resource uses keyset pagination. Defaults to None.
+    cursor = None
+
 
 def parse_request(resource):
     """ Parses a client request, returning instance of :class:`ParsedRequest`
@@ -84,6 +92,9 @@ def parse_request(resource):
 
     :param resource: the resource currently being accessed by the client.
 
+    .. versionchanged:: 0.4
+       Support for keyset pagination cursors.
+
     .. versionchagend:: 0.1.0
        Support for embedded documents.
 
@@ -124,6 +135,9 @@ def parse_request(resource):
             except ValueError:
                 pass
 
+        if config.DOMAIN[resource]['pagination_strategy'] == 'keyset':
+            r.cursor = args.get('cursor')
+
         # TODO should probably return a 400 if 'max_results' < 1 or
         # non-numeric
         if r.max_results > config.PAGINATION_LIMIT:
@@ -241,7 +255,7 @@ def api_prefix(url_prefix=None, api_version=None):
 
 
 def querydef(max_results=config.PAGINATION_DEFAULT, where=None, sort=None,
-             page=None):
+             page=None, cursor=None):
     """ Returns a valid query string.
 
     :param max_results: `max_result` part of the query string. Defaults to
@@ -249,15 +263,60 @@ def querydef(max_results=config.PAGINATION_DEFAULT, where=None, sort=None,
     :param where: `where` part of the query string. Defaults to None.
     :param sort: `sort` part of the query string. Defaults to None.
     :param page: `page` parte of the query string. Defaults to None.
+    :param cursor: `cursor` part of the query string. Defaults to None.
+
+    .. versionchanged:: 0.4
+       'cursor' keyword.
     """
     where_part = '&where=%s' % where if where else ''
     sort_part = '&sort=%s' % sort if sort else ''
     page_part = '&page=%s' % page if page and page > 1 else ''
+    cursor_part = '&cursor=%s' % cursor if cursor else ''
     max_results_part = 'max_results=%s' % max_results \
         if max_results != config.PAGINATION_DEFAULT else ''
 
     return ('?' + ''.join([max_results_part, where_part, sort_part,
-                           page_part]).lstrip('&')).rstrip('?')
+                           page_part, cursor_part]).lstrip('&')).rstrip('?')
+
+
+def encode_cursor(sort, values):
+    """ Returns the opaque, url-safe token of a keyset pagination cursor.
+
+    :param sort: the sort of the query, as a list of (field, direction).
+    :param values: the values of the sort fields for the last document of the
+                   page.
+
+    .. versionadded:: 0.4
+    """
+    token = dumps({'s': [list(s) for s in sort], 'v': list(values)})
+    return base64.urlsafe_b64encode(token.encode('utf-8')).decode('ascii') \
+        .rstrip('=')
+
+
+def decode_cursor(token, sort):
+    """ Returns the sort field values stored in a cursor token built by
+    :func:`encode_cursor`. Aborts with a 400 if the token is invalid or has
+    been built for a different sort.
+
+    :param token: the cursor token.
+    :param sort: the sort of the query, as a list of (field, direction).
+
+    .. versionadded:: 0.4
+    """
+    try:
+        token = str(token)
+        token = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        cursor = loads(token.decode('utf-8'))
+        values = cursor['v']
+        valid = cursor['s'] == [list(s) for s in sort] and \
+            len(values) == len(sort)
+    except Exception:
+        valid = False
+    if not valid:
+        abort(400, description=debug_error_message(
+            'Invalid pagination cursor'
+        ))
+    return values
 
 
 def document_etag(value):
@@ -274,6 +333,18 @@ def document_etag(value):
     return h.hexdigest()
 
 
+def identity_key(resource, lookup):
+    """ Returns the key of the document of `resource` matching `lookup` in a
+    per-request identity map of the documents already read.
+
+    :param resource: the resource name.
+    :param lookup: the lookup query.
+
+    .. versionadded:: 0.4
+    """
+    return resource, dumps(lookup, sort_keys=True)
+
+
 def extract_key_values(key, d):
     """ Extracts all values that match a key, even in nested dicts.
 
@@ -1,6 +1,6 @@
 import copy
 from flask import current_app as app, abort
-from eve.utils import config, debug_error_message
+from eve.utils import config, debug_error_message, identity_key
 from werkzeug.exceptions import BadRequestKeyError
 
 
@@ -266,13 +266,16 @@ def get_old_document(resource, req, lookup, document, version):
     return document
 
 
-def get_data_version_relation_document(data_relation, reference, latest=False):
+def get_data_version_relation_document(data_relation, reference, latest=False,
+                                       identity_map=None):
     """ Returns an old document if appropriate, otherwise passes the given
     document through.
 
     :param data_relation: the schema definition describing the data_relation.
     :param reference: a dictionary with a value_field and a version_field.
     :param latest: if we should obey the version param in reference or not.
+    :param identity_map: the documents already read during the request, see
+                         :func:`eve.utils.identity_key`.
 
     .. versionadded:: 0.4
     """
@@ -302,16 +305,18 @@ def get_data_version_relation_document(data_relation, reference, latest=False):
         if latest is False:
             query[version_field] = {'$gte': reference[version_field]}
 
-    return app.data.find_one(collection, None, **query)
+    return _find_one(collection, query, identity_map)
 
 
-def missing_version_field(data_relation, reference):
+def missing_version_field(data_relation, reference, identity_map=None):
     """ Returns a document if it matches the value_field but doesn't have a
     _version field. This is the scenario when there is data in the database
     before document versioning is turned on.
 
     :param data_relation: the schema definition describing the data_relation.
     :param reference: a dictionary with a value_field and a version_field.
+    :param identity_map: the documents already read during the request, see
+                         :func:`eve.utils.identity_key`.
 
     .. versionadded:: 0.4
     """
@@ -322,4 +327,20 @@ def missing_version_field(data_relation, reference):
     query[value_field] = reference[value_field]
     query[version_field] = {'$exists': False}
 
-    return app.data.find_one(collection, None, **query)
+    return _find_one(collection, query, identity_map)
+
+
+def _find_one(resource, query, identity_map=None):
+    """ Returns the document of `resource` matching `query`, reading it only
+    once per `identity_map`. The caller gets its own copy of the document.
+
+    .. versionadded:: 0.4
+    """
+    if identity_map is None:
+        return app.data.find_one(resource, None, **query)
+
+    key = identity_key(resource, query)
+    if key not in identity_map:
+        identity_map[key] = app.data.find_one(resource, None, **query)
+    document = identity_map[key]
+    return copy.copy(document) if document is not None else None
@@ -21,8 +21,8 @@ import traceback
 from werkzeug.exceptions import HTTPException
 from flask import abort
 import pymongo
-from mongoengine import (DoesNotExist, EmbeddedDocumentField, DictField,
-                         MapField, ListField, FileField)
+from mongoengine import (EmbeddedDocumentField, DictField, MapField,
+                         ListField, FileField)
 from mongoengine.connection import get_db, connect
 
 # eve
@@ -46,25 +46,38 @@ def _itemize(maybe_dict):
         raise TypeError("Wrong type to itemize. Allowed lists and dicts.")
 
 
+def _strip_empty(doc):
+    """
+    Returns the raw document `doc` without its empty lists and dicts.
+    """
+    return dict((attr, value) for attr, value in iteritems(doc)
+                if value or not isinstance(value, (list, dict)))
+
+
+def _raw_documents(qs):
+    """
+    Yields the raw documents matched by the queryset `qs`, read from its
+    pymongo cursor without instantiating the model.
+    """
+    # a clone, so that the queryset can be iterated more than once
+    for doc in qs.clone()._cursor:
+        yield _strip_empty(doc)
+
+
 class PymongoQuerySet(object):
     """
     Dummy mongoenigne-like QuerySet behaving just like queryset
     with as_pymongo() called, but returning ALL fields in subdocuments
     (which as_pymongo() somehow filters).
+
+    Documents are read as stored, model defaults of missing fields are not
+    filled in.
     """
     def __init__(self, qs):
         self._qs = qs
 
     def __iter__(self):
-        def iterate(obj):
-            qs = object.__getattribute__(obj, '_qs')
-            for doc in qs:
-                doc = dict(doc.to_mongo())
-                for attr, value in iteritems(dict(doc)):
-                    if isinstance(value, (list, dict)) and not value:
-                        del doc[attr]
-                yield doc
-        return iterate(self)
+        return _raw_documents(object.__getattribute__(self, '_qs'))
 
     def __getattribute__(self, name):
         return getattr(object.__getattribute__(self, '_qs'), name)
@@ -100,9 +113,9 @@ class MongoengineDataLayer(Mongo):
 
     #: Options for usage of mongoengine layer.
     #: use_atomic_update_for_patch - when set to True, Mongoengine layer will
-    #: use update_one() method (which is atomic) for updating. But then you
-    #: will loose your pre/post-save hooks. When you set this to False, for
-    #: updating will be used save() method.
+    #: update with a single find_and_modify command (which is atomic). But
+    #: then you will loose your pre/post-save hooks. When you set this to
+    #: False, for updating will be used save() method.
     mongoengine_options = {
         'use_atomic_update_for_patch': True
     }
@@ -126,6 +139,8 @@ class MongoengineDataLayer(Mongo):
                             port=ext.app.config['MONGO_PORT'])
         self.models = ext.models
         self.app = ext.app
+        # cache of Mongo.estimated_count()
+        self._init_counts()
         # create dummy driver instead of PyMongo, which causes errors
         # when instantiating after config was initialized
         self.driver = type('Driver', (), {})()
@@ -269,12 +284,20 @@ class MongoengineDataLayer(Mongo):
             spec,
             client_projection,
             client_sort)
+        keyset = self._keyset_pagination(resource)
+        if keyset:
+            spec, sort = self._keyset_find(resource, req, spec, projection)
         # apply ordering
         if sort:
+            ordering = []
             for field, direction in _itemize(sort):
+                if field == config.ID_FIELD:
+                    # mongoengine knows the primary key as 'pk'
+                    field = 'pk'
                 if direction < 0:
                     field = "-%s" % field
-                qry = qry.order_by(field)
+                ordering.append(field)
+            qry = qry.order_by(*ordering)
         # apply filters
         if req.if_modified_since:
             spec[config.LAST_UPDATED] = \
@@ -286,7 +309,7 @@ class MongoengineDataLayer(Mongo):
         # apply limits
         if req.max_results:
             qry = qry.limit(req.max_results)
-        if req.page > 1:
+        if req.page > 1 and not keyset:
             qry = qry.skip((req.page - 1) * req.max_results)
         return PymongoQuerySet(qry)
 
@@ -308,11 +331,9 @@ class MongoengineDataLayer(Mongo):
             qry = qry.filter(__raw__=filter_)
 
         qry = self._projection(resource, projection, qry)
-        try:
-            doc = dict(qry.get().to_mongo())
-            return self._clean_doc(doc)
-        except DoesNotExist:
-            return None
+        for doc in _raw_documents(qry.limit(1)):
+            return doc
+        return None
 
     def _doc_to_model(self, resource, doc):
         if '_id' in doc:
@@ -340,20 +361,33 @@ class MongoengineDataLayer(Mongo):
                 del doc[attr]
         return doc
 
+    def _bulk_insert(self, resource, docs):
+        """
+        Inserts a list of documents with a single write: every document is
+        validated by its model, then all of them are written by
+        QuerySet.insert(). Unlike save(), this sends mongoengine's
+        pre/post_bulk_insert signals instead of the save ones and doesn't
+        cascade.
+        """
+        models = []
+        for doc in docs:
+            model = self._doc_to_model(resource, doc)
+            model.validate()
+            models.append(model)
+        ids = self._objects(resource).insert(
+            models, load_bulk=False, write_concern=self._wc(resource))
+        for doc, model, id_ in zip(docs, models, ids):
+            doc.update(dict(model.to_mongo()))
+            doc[config.ID_FIELD] = id_
+            self._clean_doc(doc)
+        return ids
+
     def insert(self, resource, doc_or_docs):
         """Called when performing POST request"""
         datasource, filter_, _, _ = self._datasource_ex(resource)
         try:
             if isinstance(doc_or_docs, list):
-                ids = []
-                for doc in doc_or_docs:
-                    model = self._doc_to_model(resource, doc)
-                    model.save(write_concern=self._wc(resource))
-                    ids.append(model.id)
-                    doc.update(dict(model.to_mongo()))
-                    doc[config.ID_FIELD] = model.id
-                    self._clean_doc(doc)
-                return ids
+                return self._bulk_insert(resource, doc_or_docs)
             else:
                 model = self._doc_to_model(resource, doc_or_docs)
                 model.save(write_concern=self._wc(resource))
@@ -371,49 +405,50 @@ class MongoengineDataLayer(Mongo):
         except Exception as exc:
             self._handle_exception(exc)
 
-    def _transform_updates_to_mongoengine_kwargs(self, resource, updates):
-        """
-        Transforms update dict to special mongoengine syntax with set__,
-        unset__ etc.
+    def _transform_updates_to_mongo(self, resource, updates):
         """
-        field_cls = self._get_model_cls(resource)
-        nopfx = lambda x: field_cls._reverse_db_field_map[x]
-        return dict(("set__%s" % nopfx(k), v) for (k, v) in iteritems(updates))
-
-    def _has_empty_list_recurse(self, value):
-        if value == []:
-            return True
-        if isinstance(value, dict):
-            return self._has_empty_list(value)
-        elif isinstance(value, list):
-            for val in value:
-                if self._has_empty_list_recurse(val):
-                    return True
-        return False
-
-    def _has_empty_list(self, updates):
+        Transforms update dict to a $set/$unset update, converting every
+        value with the to_mongo() of its field. Like save(), None values
+        unset their field.
         """
-        Traverses updates and returns True if there is update to empty list.
+        model_cls = self._get_model_cls(resource)
+        rev_map = model_cls._reverse_db_field_map
+        set_, unset = {}, {}
+        for db_field, value in iteritems(updates):
+            field = model_cls._fields[rev_map[db_field]]
+            if value is None:
+                unset[db_field] = 1
+            elif isinstance(field, FileField):
+                # the GridFS id, stored as is (see _doc_to_model())
+                set_[db_field] = value
+            else:
+                set_[db_field] = field.to_mongo(field.to_python(value))
+        update = {}
+        if set_:
+            update['$set'] = set_
+        if unset:
+            update['$unset'] = unset
+        return update
+
+    def _update_using_find_and_modify(self, resource, id_, updates):
         """
-        for key, value in iteritems(updates):
-            if self._has_empty_list_recurse(value):
-                return True
-        return False
+        Updates one document atomically using a find_and_modify command,
+        which also returns the new document the ETag is computed with.
 
-    def _update_using_update_one(self, resource, id_, updates):
-        """
-        Updates one document atomically using QuerySet.update_one().
+        find_and_modify doesn't take a write concern, it's always
+        acknowledged. When the resource asks for more than that (a 'w' above
+        1, 'j', 'wtimeout'...), the document is updated with update() and
+        read back instead.
         """
-        kwargs = self._transform_updates_to_mongoengine_kwargs(resource,
-                                                               updates)
         qry = self._objects(resource)(id=id_)
-        qry.update_one(write_concern=self._wc(resource), **kwargs)
-        if self._has_empty_list(updates):
-            # Fix Etag when updating to empty list
-            model = self._objects(resource)(id=id_).get()
-            self._etag_doc = dict(model.to_mongo())
+        update = self._transform_updates_to_mongo(resource, updates)
+        wc = self._wc(resource)
+        if set(wc) - set(['w']) or wc.get('w', 1) not in (0, 1):
+            qry._collection.update(qry._query, update, **wc)
+            self._etag_doc = qry._collection.find_one(qry._query)
         else:
-            self._etag_doc = None
+            self._etag_doc = qry._collection.find_and_modify(
+                query=qry._query, update=update, new=True)
 
     def _update_document(self, doc, updates):
         """
@@ -440,7 +475,7 @@ class MongoengineDataLayer(Mongo):
         """Called when performing PATCH request."""
         try:
             if self.mongoengine_options.get('use_atomic_update_for_patch', 1):
-                self._update_using_update_one(resource, id_, updates)
+                self._update_using_find_and_modify(resource, id_, updates)
             else:
                 self._update_using_save(resource, id_, updates)
         except pymongo.errors.OperationFailure as e:
@@ -0,0 +1,51 @@
+import json
+import unittest
+
+import mongoengine
+from eve import Eve
+
+from eve_mongoengine import EveMongoengine
+
+SETTINGS = {
+    'MONGO_HOST': 'localhost',
+    'MONGO_PORT': 27017,
+    'MONGO_DBNAME': 'eve_mongoengine_test',
+    'DOMAIN': {'eve-mongoengine': {}}
+}
+
+
+class SimpleDoc(mongoengine.Document):
+    a = mongoengine.StringField()
+    b = mongoengine.IntField()
+
+
+class TestDataLayer(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        app = Eve(settings=SETTINGS)
+        app.debug = True
+        ext = EveMongoengine(app)
+        ext.add_model(SimpleDoc, pagination_count='estimated')
+        cls.app = app
+        cls.client = app.test_client()
+
+    def tearDown(self):
+        SimpleDoc.objects.delete()
+
+    def get_total(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.get_data(as_text=True))['_meta']['total']
+
+    def test_estimated_count(self):
+        for i in range(5):
+            SimpleDoc(a='x', b=i).save()
+        self.assertEqual(self.get_total('/simpledoc'), 5)
+
+        where = '/simpledoc?where={"b": {"$lt": 3}}'
+        self.assertEqual(self.get_total(where), 3)
+        # counts of filtered requests are cached
+        SimpleDoc(a='x', b=0).save()
+        self.assertEqual(self.get_total(where), 3)
+        self.assertEqual(self.get_total('/simpledoc'), 6)
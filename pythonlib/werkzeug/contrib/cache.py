@@ -61,6 +61,7 @@ import re
 import tempfile
 from hashlib import md5
 from time import time
+from threading import Lock
 try:
     import cPickle as pickle
 except ImportError:
@@ -270,6 +271,181 @@ class SimpleCache(BaseCache):
         self._cache.pop(key, None)
 
 
+# the fields of the nodes of the linked list of :class:`LRUCache`
+_PREV, _NEXT, _KEY, _EXPIRES, _VALUE, _SIZE = range(6)
+
+
+class LRUCache(BaseCache):
+    """Thread safe memory cache for single process environments that
+    evicts the least recently used keys once it holds more than
+    `threshold` items or, if `max_bytes` is given, more than `max_bytes`
+    bytes of pickled values.  Getting and setting keys takes constant time.
+
+    Like :class:`SimpleCache` the values are pickled so that changing a
+    value does not change the cached one.  If the cached values are
+    immutable `pickle_values` can be set to `False` to store the values
+    themselves, which saves unpickling them on every hit.  They are still
+    pickled to measure them if `max_bytes` is given.
+
+    :meth:`stats` returns the number of hits, misses and evictions.
+
+    :param threshold: the maximum number of items the cache stores.
+    :param default_timeout: the default timeout that is used if no timeout is
+                            specified on :meth:`~BaseCache.set`.
+    :param max_bytes: the maximum size of the pickled values the cache
+                      stores or `None` for no limit.
+    :param pickle_values: whether the values are pickled.
+    """
+
+    def __init__(self, threshold=500, default_timeout=300, max_bytes=None,
+                 pickle_values=True):
+        BaseCache.__init__(self, default_timeout)
+        self._threshold = threshold
+        self._max_bytes = max_bytes
+        self._pickle_values = pickle_values
+        self._lock = Lock()
+        self._cache = {}
+        # the root of the circular linked list of the nodes, the most
+        # recently used node comes after it, the least recently used
+        # one before it.
+        self._root = root = []
+        root[:] = [root, root, None, None, None, 0]
+        self._bytes = 0
+        self._hits = self._misses = self._evictions = 0
+
+    def _dump(self, value):
+        if self._pickle_values:
+            stored = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+            return stored, len(stored)
+        if self._max_bytes is None:
+            return value, 0
+        return value, len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+
+    def _load(self, stored):
+        if self._pickle_values:
+            return pickle.loads(stored)
+        return stored
+
+    def _unlink(self, node):
+        node[_PREV][_NEXT] = node[_NEXT]
+        node[_NEXT][_PREV] = node[_PREV]
+
+    def _link(self, node):
+        root = self._root
+        node[_PREV] = root
+        node[_NEXT] = root[_NEXT]
+        root[_NEXT][_PREV] = node
+        root[_NEXT] = node
+
+    def _remove(self, node):
+        self._unlink(node)
+        del self._cache[node[_KEY]]
+        self._bytes -= node[_SIZE]
+
+    def _lookup(self, key):
+        # the lock has to be held
+        node = self._cache.get(key)
+        if node is None:
+            self._misses += 1
+            return None
+        if node[_EXPIRES] <= time():
+            self._remove(node)
+            self._misses += 1
+            return None
+        # move the node to the front, inlined as this is the hot path
+        prev, next = node[_PREV], node[_NEXT]
+        prev[_NEXT] = next
+        next[_PREV] = prev
+        root = self._root
+        first = root[_NEXT]
+        node[_PREV] = root
+        node[_NEXT] = first
+        first[_PREV] = root[_NEXT] = node
+        self._hits += 1
+        return node
+
+    def _store(self, key, stored, size, timeout):
+        # the lock has to be held
+        if timeout is None:
+            timeout = self.default_timeout
+        node = self._cache.get(key)
+        if node is not None:
+            self._remove(node)
+        if self._max_bytes is not None and size > self._max_bytes:
+            return
+        node = [None, None, key, time() + timeout, stored, size]
+        self._link(node)
+        self._cache[key] = node
+        self._bytes += size
+        root = self._root
+        while len(self._cache) > self._threshold or \
+                (self._max_bytes is not None and
+                 self._bytes > self._max_bytes):
+            self._remove(root[_PREV])
+            self._evictions += 1
+
+    def get(self, key):
+        with self._lock:
+            node = self._lookup(key)
+            if node is None:
+                return None
+            stored = node[_VALUE]
+        if self._pickle_values:
+            return pickle.loads(stored)
+        return stored
+
+    def set(self, key, value, timeout=None):
+        stored, size = self._dump(value)
+        with self._lock:
+            self._store(key, stored, size, timeout)
+
+    def add(self, key, value, timeout=None):
+        stored, size = self._dump(value)
+        with self._lock:
+            node = self._cache.get(key)
+            if node is None or node[_EXPIRES] <= time():
+                self._store(key, stored, size, timeout)
+
+    def delete(self, key):
+        with self._lock:
+            node = self._cache.get(key)
+            if node is not None:
+                self._remove(node)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            root = self._root
+            root[:] = [root, root, None, None, None, 0]
+            self._bytes = 0
+
+    def inc(self, key, delta=1):
+        with self._lock:
+            node = self._lookup(key)
+            value = (node and self._load(node[_VALUE]) or 0) + delta
+            stored, size = self._dump(value)
+            self._store(key, stored, size, None)
+        return value
+
+    def dec(self, key, delta=1):
+        return self.inc(key, -delta)
+
+    def stats(self):
+        """Returns a dict with the number of items, the size of their
+        pickled values and the number of hits, misses and evictions.  The
+        size is only known if the values are pickled or `max_bytes` is
+        given.
+        """
+        with self._lock:
+            return {
+                'items':        len(self._cache),
+                'bytes':        self._bytes,
+                'hits':         self._hits,
+                'misses':       self._misses,
+                'evictions':    self._evictions
+            }
+
+
 _test_memcached_key = re.compile(br'[^\x00-\x21\xff]{1,250}$').match
 
 class MemcachedCache(BaseCache):
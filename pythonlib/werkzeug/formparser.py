@@ -18,7 +18,7 @@ from functools import update_wrapper
 
 from werkzeug._compat import to_native, text_type
 from werkzeug.urls import url_decode_stream
-from werkzeug.wsgi import make_line_iter, \
+from werkzeug.wsgi import make_line_iter, _make_chunk_iter, \
      get_input_stream, get_content_length
 from werkzeug.datastructures import Headers, FileStorage, MultiDict
 from werkzeug.http import parse_options_header
@@ -30,6 +30,13 @@ _empty_string_iter = repeat('')
 #: a regular expression for multipart boundaries
 _multipart_boundary_re = re.compile('^[ -~]{0,200}[!-~]$')
 
+#: a regular expression for line endings in multipart data
+_line_end_re = re.compile(br'\r\n|\r|\n')
+
+#: matches what may follow a boundary on its line: the closing dashes,
+#: trailing whitespace and the line ending (or the end of the data).
+_boundary_end_re = re.compile(br'(--)?[ \t\v\f]*(\r\n|\r|\n|$)')
+
 #: supported http encodings that are also available in python we support
 #: for multipart messages.
 _supported_multipart_encodings = frozenset(['base64', 'quoted-printable'])
@@ -137,6 +144,12 @@ class FormDataParser(object):
     :param silent: If set to False parsing errors will not be caught.
     """
 
+    #: the class used to parse multipart data.  If this is `None` the
+    #: line based :class:`MultiPartParser` is used.  Set it to
+    #: :class:`ChunkedMultiPartParser` to scan the data chunk by chunk for
+    #: the boundaries instead, which is faster for large uploads.
+    multipart_parser_class = None
+
     def __init__(self, stream_factory=None, charset='utf-8',
                  errors='replace', max_form_memory_size=None,
                  max_content_length=None, cls=None,
@@ -199,9 +212,10 @@ class FormDataParser(object):
 
     @exhaust_stream
     def _parse_multipart(self, stream, mimetype, content_length, options):
-        parser = MultiPartParser(self.stream_factory, self.charset, self.errors,
-                                 max_form_memory_size=self.max_form_memory_size,
-                                 cls=self.cls)
+        parser_class = self.multipart_parser_class or MultiPartParser
+        parser = parser_class(self.stream_factory, self.charset, self.errors,
+                              max_form_memory_size=self.max_form_memory_size,
+                              cls=self.cls)
         boundary = options.get('boundary')
         if boundary is None:
             raise ValueError('Missing boundary')
@@ -520,4 +534,167 @@ class MultiPartParser(object):
         return self.cls(form), self.cls(files)
 
 
+class _ChunkBuffer(object):
+    """Buffer over the chunks of a multipart stream, that can be read
+    line by line (for the preamble and the part headers) or consumed
+    directly (for the part contents).
+    """
+
+    def __init__(self, chunks):
+        self._chunks = chunks
+        self.data = b''
+        self.eof = False
+
+    def fill(self):
+        """Appends the next chunk to the data, returns `False` at the end
+        of the stream.
+        """
+        for chunk in self._chunks:
+            self.data += chunk
+            return True
+        self.eof = True
+        return False
+
+    def __iter__(self):
+        """Yields the lines of the data, including their line ending, and
+        empty strings once the stream is exhausted.
+        """
+        pos = 0
+        while 1:
+            match = _line_end_re.search(self.data, pos)
+            # a carriage return at the end might be followed by a newline
+            if match is not None and (match.end() < len(self.data) or
+                                      match.group() != b'\r' or self.eof):
+                line = self.data[:match.end()]
+                self.data = self.data[match.end():]
+                pos = 0
+                yield line
+            elif self.eof:
+                line = self.data
+                self.data = b''
+                yield line
+            else:
+                pos = max(len(self.data) - 1, 0)
+                self.fill()
+
+
+class ChunkedMultiPartParser(MultiPartParser):
+    """A :class:`MultiPartParser` that reads the data in chunks of
+    `buffer_size` bytes and searches them for the boundaries, instead of
+    splitting them into lines.  Large parts are written to their container
+    in chunks of about `buffer_size` bytes whatever their content, and only
+    lines starting with the boundary are ever looked at.
+
+    Parts with a content transfer encoding are decoded as a whole at their
+    end.
+    """
+
+    def _part_contents(self, buf, next_part):
+        """Yields the contents of the part starting at the beginning of the
+        buffer, up to the newline before the next boundary line.  The
+        boundary line is left in the buffer.
+        """
+        keep = len(next_part) + 1
+        # the first line of a part may be a boundary without a newline
+        # before it (empty part).
+        at_start = True
+        pos = 0
+        while 1:
+            data = buf.data
+            index = data.find(next_part, pos)
+            if index >= 0:
+                after = index + len(next_part)
+                if index > 0 and data[index - 1:index] not in b'\r\n':
+                    pos = index + 1
+                    continue
+                if index == 0 and not at_start:
+                    pos = 1
+                    continue
+                if len(data) - after < 4 and not buf.eof:
+                    match = None
+                    undecided = True
+                else:
+                    match = _boundary_end_re.match(data, after)
+                    undecided = match is not None and \
+                        match.end() == len(data) and not buf.eof
+                if not undecided:
+                    if match is None:
+                        pos = index + 1
+                        continue
+                    end = index
+                    if data[index - 2:index] == b'\r\n':
+                        end -= 2
+                    elif index > 0:
+                        end -= 1
+                    if end > 0:
+                        yield data[:end]
+                    buf.data = data[index:]
+                    return
+                safe = index - 2
+            else:
+                safe = len(data) - keep
+
+            if safe > 0:
+                yield data[:safe]
+                buf.data = data = data[safe:]
+                pos = max(pos - safe, 0)
+                at_start = False
+            # an undecided boundary is decided at the end of the stream
+            if not buf.fill() and index < 0:
+                self.fail('unexpected end of stream')
+
+    def parse_lines(self, file, boundary, content_length):
+        """Generates the same events as :meth:`MultiPartParser.parse_lines`,
+        but ``cont`` events hold chunks of about `buffer_size` bytes instead
+        of lines.
+        """
+        next_part = b'--' + boundary
+        last_part = next_part + b'--'
+
+        buf = _ChunkBuffer(_make_chunk_iter(file, content_length,
+                                            self.buffer_size))
+        lines = iter(buf)
+
+        terminator = self._find_terminator(lines)
+
+        if terminator == last_part:
+            return
+        elif terminator != next_part:
+            self.fail('Expected boundary at start of multipart data')
+
+        while terminator != last_part:
+            headers = parse_multipart_headers(lines)
+
+            disposition = headers.get('content-disposition')
+            if disposition is None:
+                self.fail('Missing Content-Disposition header')
+            disposition, extra = parse_options_header(disposition)
+            transfer_encoding = self.get_part_encoding(headers)
+            name = extra.get('name')
+            filename = extra.get('filename')
+
+            if filename is None:
+                yield _begin_form, (headers, name)
+            else:
+                yield _begin_file, (headers, name, filename)
+
+            if transfer_encoding is None:
+                for chunk in self._part_contents(buf, next_part):
+                    yield _cont, chunk
+            else:
+                if transfer_encoding == 'base64':
+                    transfer_encoding = 'base64_codec'
+                encoded = b''.join(self._part_contents(buf, next_part))
+                try:
+                    decoded = codecs.decode(encoded, transfer_encoding)
+                except Exception:
+                    self.fail('could not decode transfer encoded chunk')
+                yield _cont, decoded
+
+            # the boundary line left in the buffer by _part_contents
+            terminator = next(lines).rstrip()
+
+            yield _end, None
+
+
 from werkzeug import exceptions
@@ -559,6 +559,7 @@ class Rule(RuleFactory):
         else:
             self.arguments = set()
         self._trace = self._converters = self._regex = self._weights = None
+        self._build_format = self._build_arguments = None
 
     def empty(self):
         """Return an unbound copy of this rule.  This can be useful if you
@@ -580,6 +581,7 @@ class Rule(RuleFactory):
         :internal:
         """
         self.bind(self.map, rebind=True)
+        self.map._remap = True
 
     def bind(self, map, rebind=False):
         """Bind the url to a map and create a regular expression based on
@@ -649,6 +651,20 @@ class Rule(RuleFactory):
         if not self.is_leaf:
             self._trace.append((False, '/'))
 
+        # the static parts of the url are quoted once, the values of the
+        # converters are filled in by :meth:`build`.
+        format_parts = []
+        self._build_arguments = []
+        for is_dynamic, data in self._trace:
+            if is_dynamic:
+                format_parts.append(u'%s')
+                self._build_arguments.append(data)
+            else:
+                format_parts.append(to_unicode(url_quote(
+                    to_bytes(data, self.map.charset),
+                    safe='/:|+')).replace(u'%', u'%%'))
+        self._build_format = u''.join(format_parts)
+
         if self.build_only:
             return
         regex = r'^%s%s$' % (
@@ -706,23 +722,16 @@ class Rule(RuleFactory):
 
         :internal:
         """
-        tmp = []
-        add = tmp.append
-        processed = set(self.arguments)
-        for is_dynamic, data in self._trace:
-            if is_dynamic:
-                try:
-                    add(self._converters[data].to_url(values[data]))
-                except ValidationError:
-                    return
-                processed.add(data)
-            else:
-                add(url_quote(to_bytes(data, self.map.charset), safe='/:|+'))
-        domain_part, url = (u''.join(tmp)).split(u'|', 1)
+        try:
+            converted = tuple([self._converters[name].to_url(values[name])
+                               for name in self._build_arguments])
+        except ValidationError:
+            return
+        domain_part, url = (self._build_format % converted).split(u'|', 1)
 
-        if append_unknown:
+        if append_unknown and not self.arguments.issuperset(values):
             query_vars = MultiDict(values)
-            for key in processed:
+            for key in self.arguments:
                 if key in query_vars:
                     del query_vars[key]
 
@@ -745,6 +754,26 @@ class Rule(RuleFactory):
     def suitable_for(self, values, method=None):
         """Check if the dict of values has enough data for url generation.
 
+        :internal:
+        """
+        if not self.suitable_for_keys(values, method):
+            return False
+
+        defaults = self.defaults or ()
+
+        # in case defaults are given we ensure taht either the value was
+        # skipped or the value is the same as the default value.
+        if defaults:
+            for key, value in iteritems(defaults):
+                if key in values and value != values[key]:
+                    return False
+
+        return True
+
+    def suitable_for_keys(self, keys, method=None):
+        """Like :meth:`suitable_for` but only checks the method and the
+        names of the values, which does not depend on the values themselves.
+
         :internal:
         """
         # if a method was given explicitly and that method is not supported
@@ -758,16 +787,9 @@ class Rule(RuleFactory):
         # all arguments required must be either in the defaults dict or
         # the value dictionary otherwise it's not suitable
         for key in self.arguments:
-            if key not in defaults and key not in values:
+            if key not in defaults and key not in keys:
                 return False
 
-        # in case defaults are given we ensure taht either the value was
-        # skipped or the value is the same as the default value.
-        if defaults:
-            for key, value in iteritems(defaults):
-                if key in values and value != values[key]:
-                    return False
-
         return True
 
     def match_compare_key(self):
@@ -978,6 +1000,58 @@ DEFAULT_CONVERTERS = {
 }
 
 
+class RuleTrie(object):
+    """A prefix trie over the static leading segments of the rules of a
+    map, used by :meth:`MapAdapter.match` if trie matching is enabled on
+    the :class:`Map`.  Every rule is stored at the node of the path
+    segments that precede its first converter, so looking up a path only
+    yields the rules whose static prefix matches it.  The candidates are
+    returned in the order of the map so matching them one after another
+    behaves exactly like trying all the rules.
+    """
+
+    def __init__(self, rules):
+        self.root = ({}, [])
+        for index, rule in enumerate(rules):
+            if rule.build_only:
+                continue
+            node = self.root
+            for segment in self.static_segments(rule):
+                node = node[0].setdefault(segment, ({}, []))
+            node[1].append((index, rule))
+
+    @staticmethod
+    def static_segments(rule):
+        """Return the complete static segments of the string a rule
+        matches (``"subdomain|/path"``) that come before its first
+        converter.
+        """
+        literal = []
+        for is_dynamic, data in rule._trace:
+            if is_dynamic:
+                return u''.join(literal).split(u'/')[:-1]
+            literal.append(data)
+        literal = u''.join(literal)
+        # the trailing slash of a branch is optional in the regex
+        if not rule.is_leaf:
+            literal = literal[:-1]
+        return literal.split(u'/')
+
+    def candidates(self, path):
+        """Return the rules that could match the given path in the order
+        they have to be tried.
+        """
+        node = self.root
+        found = list(node[1])
+        for segment in path.split(u'/'):
+            node = node[0].get(segment)
+            if node is None:
+                break
+            found.extend(node[1])
+        found.sort()
+        return [rule for index, rule in found]
+
+
 class Map(object):
     """The map class stores all the URL rules and some configuration
     parameters.  Some of the configuration values are only stored on the
@@ -1004,6 +1078,10 @@ class Map(object):
                           feature and disables the subdomain one.  If
                           enabled the `host` parameter to rules is used
                           instead of the `subdomain` one.
+    :param trie_matching: if set to `True` the rules are indexed by their
+                          static prefix in a :class:`RuleTrie` so that
+                          matching only tries the rules that could match.
+                          Defaults to :attr:`trie_matching`.
 
     .. versionadded:: 0.5
         `sort_parameters` and `sort_key` was added.
@@ -1016,13 +1094,19 @@ class Map(object):
     #:    a dict of default converters to be used.
     default_converters = ImmutableDict(DEFAULT_CONVERTERS)
 
+    #: the default for the `trie_matching` parameter.
+    trie_matching = False
+
     def __init__(self, rules=None, default_subdomain='', charset='utf-8',
                  strict_slashes=True, redirect_defaults=True,
                  converters=None, sort_parameters=False, sort_key=None,
-                 encoding_errors='replace', host_matching=False):
+                 encoding_errors='replace', host_matching=False,
+                 trie_matching=None):
         self._rules = []
         self._rules_by_endpoint = {}
         self._remap = True
+        self._trie = None
+        self._build_cache = {}
 
         self.default_subdomain = default_subdomain
         self.charset = charset
@@ -1030,6 +1114,8 @@ class Map(object):
         self.strict_slashes = strict_slashes
         self.redirect_defaults = redirect_defaults
         self.host_matching = host_matching
+        if trie_matching is not None:
+            self.trie_matching = trie_matching
 
         self.converters = self.default_converters.copy()
         if converters:
@@ -1210,7 +1296,11 @@ class Map(object):
             self._rules.sort(key=lambda x: x.match_compare_key())
             for rules in itervalues(self._rules_by_endpoint):
                 rules.sort(key=lambda x: x.build_compare_key())
+            self._trie = None
+            self._build_cache = {}
             self._remap = False
+        if self.trie_matching and self._trie is None:
+            self._trie = RuleTrie(self._rules)
 
     def __repr__(self):
         rules = self.iter_rules()
@@ -1381,8 +1471,13 @@ class MapAdapter(object):
         path = u'%s|/%s' % (self.map.host_matching and self.server_name or
                             self.subdomain, path_info.lstrip('/'))
 
+        if self.map.trie_matching:
+            rules = self.map._trie.candidates(path)
+        else:
+            rules = self.map._rules
+
         have_match_for = set()
-        for rule in self.map._rules:
+        for rule in rules:
             try:
                 rv = rule.match(path)
             except RequestSlash:
@@ -1541,12 +1636,38 @@ class MapAdapter(object):
 
         # default method did not match or a specific method is passed,
         # check all and go with first result.
-        for rule in self.map._rules_by_endpoint.get(endpoint, ()):
-            if rule.suitable_for(values, method):
+        for rule in self._build_candidates(endpoint, values, method):
+            if not rule.defaults or rule.suitable_for(values, method):
                 rv = rule.build(values, append_unknown)
                 if rv is not None:
                     return rv
 
+    def _build_candidates(self, endpoint, values, method):
+        """Helper for :meth:`_partial_build`.  Returns the rules of the
+        endpoint that are suitable for the names of the values and the
+        method.  They are cached on the map by endpoint, method and the
+        names of the values that are arguments of the endpoint, so that
+        unknown query arguments do not grow the cache.
+
+        :internal:
+        """
+        rules = self.map._rules_by_endpoint.get(endpoint)
+        if rules is None:
+            return ()
+        cache = self.map._build_cache.get(endpoint)
+        if cache is None:
+            arguments = set()
+            for rule in rules:
+                arguments.update(rule.arguments)
+            cache = self.map._build_cache[endpoint] = (arguments, {})
+        arguments, candidates = cache
+        key = method, frozenset(arguments.intersection(values))
+        rv = candidates.get(key)
+        if rv is None:
+            rv = candidates[key] = [rule for rule in rules
+                                    if rule.suitable_for_keys(key[1], method)]
+        return rv
+
     def build(self, endpoint, values=None, method=None, force_external=False,
               append_unknown=True):
         """Building URLs works pretty much the other way round.  Instead of
@@ -1622,7 +1743,11 @@ class MapAdapter(object):
         if not force_external and (
             (self.map.host_matching and host == self.server_name) or
              (not self.map.host_matching and domain_part == self.subdomain)):
-            return str(url_join(self.script_name, './' + path.lstrip('/')))
+            url = self.script_name + path.lstrip('/')
+            # only dot segments and empty segments need url_join
+            if u'/.' in url or u'//' in url:
+                url = url_join(self.script_name, './' + path.lstrip('/'))
+            return str(url)
         return str('%s://%s%s/%s' % (
             self.url_scheme,
             host,
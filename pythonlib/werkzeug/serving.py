@@ -38,17 +38,26 @@
 from __future__ import with_statement
 
 import os
+import errno
+import select
 import socket
 import sys
 import time
 import signal
 import subprocess
+import threading
+import traceback
 
 try:
     import thread
 except ImportError:
     import _thread as thread
 
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
 try:
     from SocketServer import ThreadingMixIn, ForkingMixIn
     from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
@@ -61,16 +70,29 @@ from werkzeug._internal import _log
 from werkzeug._compat import iteritems, PY2, reraise, text_type, \
      wsgi_encoding_dance
 from werkzeug.urls import url_parse, url_unquote
+from werkzeug.wsgi import LimitedStream
 from werkzeug.exceptions import InternalServerError, BadRequest
 
 
 class WSGIRequestHandler(BaseHTTPRequestHandler, object):
     """A request handler that implements WSGI dispatching."""
 
+    #: the number of unread request body bytes that are skipped to keep a
+    #: connection alive.
+    max_skipped_input = 64 * 1024
+
     @property
     def server_version(self):
         return 'Werkzeug/' + werkzeug.__version__
 
+    def setup(self):
+        BaseHTTPRequestHandler.setup(self)
+        self.keep_alive = getattr(self.server, 'keep_alive', False)
+        self.idle = False
+        if self.keep_alive:
+            self.protocol_version = 'HTTP/1.1'
+            self.connection.settimeout(self.server.keep_alive_timeout)
+
     def make_environ(self):
         request_url = url_parse(self.path)
 
@@ -119,6 +141,9 @@ class WSGIRequestHandler(BaseHTTPRequestHandler, object):
             self.wfile.write(b'HTTP/1.1 100 Continue\r\n\r\n')
 
         environ = self.make_environ()
+        if self.keep_alive:
+            input_stream = self.make_input_stream()
+            environ['wsgi.input'] = input_stream
         headers_set = []
         headers_sent = []
 
@@ -139,6 +164,9 @@ class WSGIRequestHandler(BaseHTTPRequestHandler, object):
                 if 'content-length' not in header_keys:
                     self.close_connection = True
                     self.send_header('Connection', 'close')
+                elif self.keep_alive and 'connection' not in header_keys:
+                    self.send_header('Connection', self.close_connection
+                                     and 'close' or 'keep-alive')
                 if 'server' not in header_keys:
                     self.send_header('Server', self.version_string())
                 if 'date' not in header_keys:
@@ -176,8 +204,12 @@ class WSGIRequestHandler(BaseHTTPRequestHandler, object):
         try:
             execute(self.server.app)
         except (socket.error, socket.timeout) as e:
+            self.close_connection = True
             self.connection_dropped(e, environ)
         except Exception:
+            # the response may have been cut short, whatever follows on the
+            # connection would be taken for the rest of it
+            self.close_connection = True
             if self.server.passthrough_errors:
                 raise
             from werkzeug.debug.tbtools import get_current_traceback
@@ -193,6 +225,37 @@ class WSGIRequestHandler(BaseHTTPRequestHandler, object):
             self.server.log('error', 'Error on request:\n%s',
                             traceback.plaintext)
 
+        if self.keep_alive and not self.close_connection:
+            self.finish_input_stream(input_stream)
+
+    def make_input_stream(self):
+        """Returns the ``wsgi.input`` stream for a request on a connection
+        that is kept alive.  It is limited to the request body so that the
+        rest of the body can be skipped after the request to get to the next
+        request on the connection.
+        """
+        if self.headers.get('Transfer-Encoding'):
+            self.close_connection = True
+        try:
+            content_length = max(0, int(self.headers.get('Content-Length')
+                                        or 0))
+        except ValueError:
+            content_length = 0
+        return LimitedStream(self.rfile, content_length)
+
+    def finish_input_stream(self, stream):
+        """Skips what the application did not read of the request body.
+        If that is more than :attr:`max_skipped_input` bytes, the connection
+        is closed instead.
+        """
+        if stream.limit - stream.tell() > self.max_skipped_input:
+            self.close_connection = True
+            return
+        try:
+            stream.exhaust()
+        except Exception:
+            self.close_connection = True
+
     def handle(self):
         """Handles a request ignoring dropped connections."""
         rv = None
@@ -226,12 +289,33 @@ class WSGIRequestHandler(BaseHTTPRequestHandler, object):
         nothing happens.
         """
 
+    def has_buffered_input(self):
+        """Tells if the next request on a connection that is kept alive was
+        already read into the buffer of :attr:`rfile`.
+        """
+        rbuf = getattr(self.rfile, '_rbuf', None)
+        if rbuf is not None:
+            # socket._fileobject on Python 2
+            return len(rbuf.getvalue()) > 0
+        self.connection.setblocking(False)
+        try:
+            return len(self.rfile.peek(1)) > 0
+        except (socket.error, ValueError):
+            return False
+        finally:
+            self.connection.settimeout(self.server.keep_alive_timeout)
+
     def handle_one_request(self):
         """Handle a single HTTP request."""
+        if self.idle and not self.server.wait_for_request(self):
+            self.close_connection = 1
+            return
+        self.idle = True
         self.raw_requestline = self.rfile.readline()
         if not self.raw_requestline:
             self.close_connection = 1
         elif self.parse_request():
+            self.server.request_started(self)
             return self.run_wsgi()
 
     def send_response(self, code, message=None):
@@ -402,6 +486,11 @@ class BaseWSGIServer(HTTPServer, object):
     multiprocess = False
     request_queue_size = 128
 
+    #: if enabled HTTP/1.1 connections are kept alive between requests
+    #: until they are idle for `keep_alive_timeout` seconds.
+    keep_alive = False
+    keep_alive_timeout = 5
+
     def __init__(self, host, port, app, handler=None,
                  passthrough_errors=False, ssl_context=None):
         if handler is None:
@@ -443,6 +532,19 @@ class BaseWSGIServer(HTTPServer, object):
         else:
             return HTTPServer.handle_error(self, request, client_address)
 
+    def request_started(self, handler):
+        """Called by the request handler before it runs the application
+        for a request.  The handler's `close_connection` attribute can be
+        set to close the connection after the request.
+        """
+
+    def wait_for_request(self, handler):
+        """Called by the request handler of a connection that is kept alive
+        before it waits for the next request on it.  If this returns `False`
+        the connection is closed instead.
+        """
+        return True
+
     def get_request(self):
         con, info = self.socket.accept()
         if self.ssl_context is not None:
@@ -455,6 +557,135 @@ class ThreadedWSGIServer(ThreadingMixIn, BaseWSGIServer):
     multithread = True
 
 
+class PooledWSGIServer(BaseWSGIServer):
+    """A WSGI server that handles the connections in a fixed pool of
+    `pool_size` threads.  Accepted connections wait in a queue of at most
+    `queue_size` connections for a free thread, connections that do not
+    fit are answered with ``503 Service Unavailable`` by a separate thread.
+    `queue_size` must be at least 1.  Connections that are idle for
+    `connection_timeout` seconds (30 by default) are closed.
+    """
+    multithread = True
+    connection_timeout = 30
+    reject_timeout = 0.1
+
+    def __init__(self, host, port, app, pool_size=10, handler=None,
+                 passthrough_errors=False, ssl_context=None, queue_size=64,
+                 connection_timeout=None):
+        if queue_size < 1:
+            raise ValueError('queue_size must be at least 1')
+        BaseWSGIServer.__init__(self, host, port, app, handler,
+                                passthrough_errors, ssl_context)
+        if connection_timeout is not None:
+            self.connection_timeout = connection_timeout
+        self.pool_size = pool_size
+        self.queue_size = queue_size
+        self.requests = queue.Queue(queue_size)
+        self._stats_lock = threading.Lock()
+        self._busy = self._handled = self._rejected = self._max_queued = 0
+        self._threads = []
+        for x in range(pool_size):
+            t = threading.Thread(target=self.process_request_thread)
+            t.daemon = True
+            t.start()
+            self._threads.append(t)
+        # the connections that are answered with 503 by the reject thread,
+        # those that do not fit either are closed right away.
+        self.rejected = queue.Queue(queue_size)
+        self._reject_thread = threading.Thread(
+            target=self.reject_request_thread)
+        self._reject_thread.daemon = True
+        self._reject_thread.start()
+
+    def process_request(self, request, client_address):
+        try:
+            self.requests.put_nowait((request, client_address))
+        except queue.Full:
+            with self._stats_lock:
+                self._rejected += 1
+            try:
+                self.rejected.put_nowait((request, client_address))
+            except queue.Full:
+                self.shutdown_request(request)
+            return
+        # only updated by the thread that accepts the connections
+        self._max_queued = max(self._max_queued, self.requests.qsize())
+
+    def process_request_thread(self):
+        """Handles the queued connections until :meth:`server_close` is
+        called.
+        """
+        while 1:
+            item = self.requests.get()
+            if item is None:
+                return
+            request, client_address = item
+            with self._stats_lock:
+                self._busy += 1
+            try:
+                request.settimeout(self.connection_timeout)
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+                with self._stats_lock:
+                    self._busy -= 1
+                    self._handled += 1
+
+    def reject_request_thread(self):
+        """Answers the rejected connections until :meth:`server_close` is
+        called.
+        """
+        while 1:
+            item = self.rejected.get()
+            if item is None:
+                return
+            self.reject_request(*item)
+
+    def reject_request(self, request, client_address):
+        """Answers a connection that does not fit into the queue."""
+        try:
+            request.settimeout(self.reject_timeout)
+            request.sendall(b'HTTP/1.0 503 Service Unavailable\r\n'
+                            b'Content-Length: 0\r\n'
+                            b'Connection: close\r\n\r\n')
+            request.shutdown(socket.SHUT_WR)
+            # Closing a socket with unread data resets the connection and
+            # the client could lose the response, so the request is read
+            # until the client closes the connection, for at most
+            # `reject_timeout` seconds.
+            deadline = time.time() + self.reject_timeout
+            while time.time() < deadline and request.recv(4096):
+                pass
+        except socket.error:
+            pass
+        self.close_request(request)
+
+    def stats(self):
+        """Returns a dict with the size of the pool and the queue, the
+        number of busy threads, queued connections, the most connections
+        that were queued at once and the number of handled and rejected
+        connections.
+        """
+        with self._stats_lock:
+            return {
+                'pool_size':    self.pool_size,
+                'queue_size':   self.queue_size,
+                'busy':         self._busy,
+                'queued':       self.requests.qsize(),
+                'max_queued':   self._max_queued,
+                'handled':      self._handled,
+                'rejected':     self._rejected
+            }
+
+    def server_close(self):
+        BaseWSGIServer.server_close(self)
+        for t in self._threads:
+            self.requests.put(None)
+        self.rejected.put(None)
+
+
 class ForkingWSGIServer(ForkingMixIn, BaseWSGIServer):
     """A WSGI server that does forking."""
     multiprocess = True
@@ -466,15 +697,182 @@ class ForkingWSGIServer(ForkingMixIn, BaseWSGIServer):
         self.max_children = processes
 
 
+class PreforkWSGIServer(BaseWSGIServer):
+    """A WSGI server that forks `workers` processes up front.  The workers
+    accept connections on the shared listening socket and keep HTTP/1.1
+    connections alive.  A worker handles one connection at a time, so an
+    idle connection is closed as soon as another one waits to be accepted.
+    A worker is replaced by a new one after it handled `max_requests`
+    requests, unless that is zero.
+
+    On ``SIGTERM`` or ``SIGINT``, or if :meth:`shutdown` is called, the
+    workers finish the requests they are handling and exit, then
+    :meth:`serve_forever` returns.
+    """
+    multiprocess = True
+    keep_alive = True
+
+    #: seconds a worker waits for a connection before it checks whether
+    #: it has to exit.
+    poll_interval = 0.5
+
+    def __init__(self, host, port, app, workers=4, handler=None,
+                 passthrough_errors=False, ssl_context=None,
+                 max_requests=0):
+        BaseWSGIServer.__init__(self, host, port, app, handler,
+                                passthrough_errors, ssl_context)
+        self.worker_count = workers
+        self.max_requests = max_requests
+        self.workers = set()
+        self.running = False
+        self.requests_handled = 0
+        # the workers must not block in accept() if another worker
+        # accepted the connection they were woken up for.
+        self.socket.setblocking(False)
+
+    def serve_forever(self):
+        self.running = True
+        self._set_stop_handlers(self.shutdown)
+        try:
+            while self.running:
+                while len(self.workers) < self.worker_count:
+                    self.spawn_worker()
+                pid, status = self._wait()
+                self.workers.discard(pid)
+                if status and self.running:
+                    self.log('error', 'Worker %d exited unexpectedly', pid)
+                    # do not fork over and over if the workers fail
+                    time.sleep(1)
+        finally:
+            self.shutdown()
+            while self.workers:
+                self.workers.discard(self._wait()[0])
+
+    def shutdown(self):
+        self.running = False
+        for pid in self.workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except OSError:
+                pass
+
+    def spawn_worker(self):
+        """Forks a worker process."""
+        pid = os.fork()
+        if pid:
+            self.workers.add(pid)
+            return
+        status = 0
+        try:
+            self.serve_worker()
+        except BaseException:
+            status = 1
+            self.log('error', 'Error in worker %d:\n%s', os.getpid(),
+                     traceback.format_exc())
+        finally:
+            os._exit(status)
+
+    def serve_worker(self):
+        """Handles requests in a worker process until it is stopped or
+        handled `max_requests` requests.
+        """
+        self.workers = set()
+        self.running = True
+        self.requests_handled = 0
+
+        def stop():
+            self.running = False
+        self._set_stop_handlers(stop)
+
+        while self.running and (not self.max_requests or
+                                self.requests_handled < self.max_requests):
+            try:
+                ready = select.select([self], [], [], self.poll_interval)[0]
+            except (select.error, OSError) as e:
+                if e.args[0] != errno.EINTR:
+                    raise
+                continue
+            if ready:
+                self._handle_request_noblock()
+            if self.shutdown_signal:
+                # the application called ``werkzeug.server.shutdown``
+                os.kill(os.getppid(), signal.SIGTERM)
+                self.shutdown_signal = False
+
+    def wait_for_request(self, handler):
+        if self.ssl_context is not None or handler.has_buffered_input():
+            return True
+        deadline = time.time() + self.keep_alive_timeout
+        while self.running:
+            timeout = min(self.poll_interval, deadline - time.time())
+            if timeout <= 0:
+                return False
+            try:
+                ready = select.select([handler.connection, self], [], [],
+                                      timeout)[0]
+            except (select.error, OSError) as e:
+                if e.args[0] != errno.EINTR:
+                    raise
+                continue
+            if handler.connection in ready:
+                return True
+            if ready:
+                # a new connection waits for a worker, this one is idle
+                return False
+        return False
+
+    def request_started(self, handler):
+        self.requests_handled += 1
+        if not self.running or (self.max_requests and
+                                self.requests_handled >= self.max_requests):
+            handler.close_connection = True
+
+    def _set_stop_handlers(self, stop):
+        for sig in signal.SIGTERM, signal.SIGINT:
+            try:
+                signal.signal(sig, lambda signum, frame: stop())
+            except ValueError:
+                # not in the main thread, :meth:`shutdown` has to be used
+                pass
+
+    def _wait(self):
+        while 1:
+            try:
+                pid, status = os.wait()
+            except OSError as e:
+                if e.errno == errno.EINTR:
+                    continue
+                if e.errno != errno.ECHILD:
+                    raise
+                # the workers were reaped by someone else
+                self.workers.clear()
+                return 0, 0
+            return pid, status
+
+
 def make_server(host, port, app=None, threaded=False, processes=1,
                 request_handler=None, passthrough_errors=False,
-                ssl_context=None):
+                ssl_context=None, workers=0, max_requests=0, pool_size=10,
+                queue_size=64):
     """Create a new server instance that is either threaded, or forks
-    or just processes one request after another.
+    or just processes one request after another.  With `workers` it is a
+    :class:`PreforkWSGIServer`, if `threaded` is ``'pool'`` it is a
+    :class:`PooledWSGIServer` with `pool_size` threads and up to
+    `queue_size` connections waiting for one.
     """
     if threaded and processes > 1:
         raise ValueError("cannot have a multithreaded and "
                          "multi process server.")
+    elif workers and (threaded or processes > 1):
+        raise ValueError("cannot have pre-forked workers and a "
+                         "multithreaded or multi process server.")
+    elif workers:
+        return PreforkWSGIServer(host, port, app, workers, request_handler,
+                                 passthrough_errors, ssl_context,
+                                 max_requests)
+    elif threaded == 'pool':
+        return PooledWSGIServer(host, port, app, pool_size, request_handler,
+                                passthrough_errors, ssl_context, queue_size)
     elif threaded:
         return ThreadedWSGIServer(host, port, app, request_handler,
                                   passthrough_errors, ssl_context)
@@ -623,7 +1021,8 @@ def run_simple(hostname, port, application, use_reloader=False,
                use_debugger=False, use_evalex=True,
                extra_files=None, reloader_interval=1, threaded=False,
                processes=1, request_handler=None, static_files=None,
-               passthrough_errors=False, ssl_context=None):
+               passthrough_errors=False, ssl_context=None, workers=0,
+               max_requests=0, pool_size=10, queue_size=64):
     """Start an application using wsgiref and with an optional reloader.  This
     wraps `wsgiref` to fix the wrong default reporting of the multithreaded
     WSGI variable and adds optional multithreading and fork support.
@@ -658,7 +1057,9 @@ def run_simple(hostname, port, application, use_reloader=False,
                         files.
     :param reloader_interval: the interval for the reloader in seconds.
     :param threaded: should the process handle each request in a separate
-                     thread?
+                     thread?  If this is ``'pool'`` the requests are handled
+                     in a fixed pool of threads, see
+                     :class:`PooledWSGIServer`.
     :param processes: if greater than 1 then handle each request in a new process
                       up to this maximum number of concurrent processes.
     :param request_handler: optional parameter that can be used to replace
@@ -678,7 +1079,19 @@ def run_simple(hostname, port, application, use_reloader=False,
                         the string ``'adhoc'`` if the server should
                         automatically create one, or `None` to disable SSL
                         (which is the default).
+    :param workers: if greater than 0 then fork this number of worker
+                    processes up front which handle the requests and keep
+                    connections alive.  See :class:`PreforkWSGIServer`.
+    :param max_requests: the number of requests after which a worker is
+                         replaced by a new one.  `0` never replaces them.
+    :param pool_size: the number of threads if `threaded` is ``'pool'``.
+    :param queue_size: the number of connections waiting for a thread if
+                       `threaded` is ``'pool'``, the others are answered
+                       with ``503 Service Unavailable``.
     """
+    if workers and use_reloader:
+        raise ValueError('the reloader cannot be used with pre-forked '
+                         'workers.')
     if use_debugger:
         from werkzeug.debug import DebuggedApplication
         application = DebuggedApplication(application, use_evalex)
@@ -689,7 +1102,9 @@ def run_simple(hostname, port, application, use_reloader=False,
     def inner():
         make_server(hostname, port, application, threaded,
                     processes, request_handler,
-                    passthrough_errors, ssl_context).serve_forever()
+                    passthrough_errors, ssl_context,
+                    workers, max_requests, pool_size,
+                    queue_size).serve_forever()
 
     if os.environ.get('WERKZEUG_RUN_MAIN') != 'true':
         display_hostname = hostname != '*' and hostname or 'localhost'
@@ -58,6 +58,68 @@ class SimpleCacheTestCase(WerkzeugTestCase):
         assert c.get(2) == 4
 
 
+class LRUCacheTestCase(WerkzeugTestCase):
+
+    def test_get_set(self):
+        c = cache.LRUCache()
+        c.set('foo', ['bar'])
+        self.assert_equal(c.get('foo'), ['bar'])
+        # the cached value is a copy
+        c.get('foo').append('baz')
+        self.assert_equal(c.get('foo'), ['bar'])
+        self.assert_true(c.get('missing') is None)
+        c.add('foo', 'baz')
+        self.assert_equal(c.get('foo'), ['bar'])
+        c.delete('foo')
+        self.assert_true(c.get('foo') is None)
+        self.assert_equal(c.get_dict('foo', 'missing'),
+                          {'foo': None, 'missing': None})
+
+    def test_expire(self):
+        c = cache.LRUCache()
+        c.set('foo', 'bar', timeout=-1)
+        self.assert_true(c.get('foo') is None)
+        c.add('foo', 'baz')
+        self.assert_equal(c.get('foo'), 'baz')
+
+    def test_lru_eviction(self):
+        c = cache.LRUCache(threshold=3)
+        for key in 'abc':
+            c.set(key, key)
+        c.get('a')
+        c.set('d', 'd')
+        self.assert_true(c.get('b') is None)
+        self.assert_equal([c.get(key) for key in 'acd'], ['a', 'c', 'd'])
+        stats = c.stats()
+        self.assert_equal((stats['items'], stats['hits'], stats['misses'],
+                           stats['evictions']), (3, 4, 1, 1))
+
+    def test_max_bytes(self):
+        value = 'x' * 100
+        size = len(cache.pickle.dumps(value, cache.pickle.HIGHEST_PROTOCOL))
+        c = cache.LRUCache(max_bytes=size * 2, pickle_values=False)
+        c.set('a', value)
+        c.set('b', value)
+        self.assert_true(c.get('a') is value)
+        c.set('c', value)
+        self.assert_true(c.get('b') is None)
+        self.assert_equal(c.stats()['bytes'], size * 2)
+        # values bigger than the cache are not stored
+        c.set('d', value * 3)
+        self.assert_true(c.get('d') is None)
+        c.clear()
+        self.assert_equal(c.stats()['bytes'], 0)
+        self.assert_true(c.get('a') is None)
+
+    def test_inc_dec(self):
+        c = cache.LRUCache()
+        c.set_many({'foo': 1})
+        self.assert_equal(c.inc('foo'), 2)
+        self.assert_equal(c.dec('foo'), 1)
+        self.assert_equal(c.inc('bar', 5), 5)
+        self.assert_equal(c.get('bar'), 5)
+
+
 class FileSystemCacheTestCase(WerkzeugTestCase):
 
     def test_set_get(self):
@@ -249,6 +311,7 @@ class MemcachedCacheTestCase(WerkzeugTestCase):
 def suite():
     suite = unittest.TestSuite()
     suite.addTest(unittest.makeSuite(SimpleCacheTestCase))
+    suite.addTest(unittest.makeSuite(LRUCacheTestCase))
     suite.addTest(unittest.makeSuite(FileSystemCacheTestCase))
     if redis is not None:
         suite.addTest(unittest.makeSuite(RedisCacheTestCase))
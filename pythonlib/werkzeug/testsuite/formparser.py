@@ -385,6 +385,40 @@ class MultiPartTestCase(WerkzeugTestCase):
         self.assert_equal(files, MultiDict())
 
 
+class ChunkedMultiPartTestCase(MultiPartTestCase):
+
+    def setup(self):
+        formparser.FormDataParser.multipart_parser_class = \
+            formparser.ChunkedMultiPartParser
+
+    def teardown(self):
+        formparser.FormDataParser.multipart_parser_class = None
+
+    def test_boundary_across_chunks(self):
+        contents = b'x' * 2000 + b'\r\n--fo' + b'y' * 3000
+        data = (b'--foo\r\n'
+                b'Content-Disposition: form-data; name="test"; '
+                b'filename="test.txt"\r\n\r\n' + contents + b'\r\n'
+                b'--foo\r\n'
+                b'Content-Disposition: form-data; name="bar"\r\n\r\n'
+                b'bar\r\n'
+                b'--foo--')
+        parser = formparser.ChunkedMultiPartParser(
+            formparser.default_stream_factory, buffer_size=1024)
+        for i in range(7):
+            # chunks split every part of the boundaries at some point
+            chunks = [data[:i]] + [data[j:j + 7]
+                                   for j in range(i, len(data), 7)]
+            form, files = parser.parse(iter(chunks), b'foo', len(data))
+            self.assert_strict_equal(files['test'].read(), contents)
+            self.assert_strict_equal(form['bar'], u'bar')
+
+        # contents are written in chunks of about the buffer size
+        events = parser.parse_lines(BytesIO(data), b'foo', len(data))
+        sizes = [len(value) for event, value in events if event == 'cont']
+        self.assert_true(len(sizes) > 2)
+        self.assert_true(max(sizes) <= 1024)
+
 class InternalFunctionsTestCase(WerkzeugTestCase):
 
     def test_line_parser(self):
@@ -407,5 +441,6 @@ def suite():
     suite = unittest.TestSuite()
     suite.addTest(unittest.makeSuite(FormParserTestCase))
     suite.addTest(unittest.makeSuite(MultiPartTestCase))
+    suite.addTest(unittest.makeSuite(ChunkedMultiPartTestCase))
     suite.addTest(unittest.makeSuite(InternalFunctionsTestCase))
     return suite
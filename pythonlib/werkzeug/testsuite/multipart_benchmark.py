@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+    werkzeug.testsuite.multipart_benchmark
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Benchmark of the line based and chunked multipart parsers, with a binary
+    upload (1 GB by default) and a newline-heavy text upload (100 MB by
+    default).  The uploads are generated on the fly and the parsed files
+    discarded, so that neither is held in memory.
+
+        python -m werkzeug.testsuite.multipart_benchmark [binary MB] [text MB]
+
+    :copyright: (c) 2014 by Armin Ronacher.
+    :license: BSD, see LICENSE for more details.
+"""
+import os
+import sys
+import time
+
+from werkzeug import formparser
+
+MB = 1024 * 1024
+BOUNDARY = b'---------------------------186454651713519341951581030105'
+
+
+class UploadStream(object):
+    """A file-like object reading a multipart upload of one file made of
+    `size` bytes of `block` repeated.
+    """
+
+    def __init__(self, block, size):
+        head = (b'--' + BOUNDARY + b'\r\n'
+                b'Content-Disposition: form-data; name="file"; '
+                b'filename="upload.bin"\r\n'
+                b'Content-Type: application/octet-stream\r\n\r\n')
+        tail = b'\r\n--' + BOUNDARY + b'--\r\n'
+        self.length = len(head) + size + len(tail)
+        self.parts = self._parts(head, block, size, tail)
+        self.pending = b''
+        self.pos = 0
+
+    def _parts(self, head, block, size, tail):
+        yield head
+        while size > 0:
+            yield block[:size]
+            size -= len(block)
+        yield tail
+
+    def read(self, n):
+        data = self.pending[self.pos:self.pos + n]
+        self.pos += n
+        while len(data) < n:
+            self.pending = next(self.parts, b'')
+            if not self.pending:
+                break
+            self.pos = n - len(data)
+            data += self.pending[:self.pos]
+        return data
+
+    def readline(self, size=None):
+        # needed by LimitedStream, the parsers only read
+        raise NotImplementedError()
+
+
+class NullFile(object):
+    """Discards what is written to it."""
+
+    def write(self, data):
+        pass
+
+    def seek(self, pos):
+        pass
+
+
+def null_stream_factory(*args):
+    return NullFile()
+
+
+def binary_block():
+    block = os.urandom(MB)
+    # no lookalike boundary in the random data
+    return block.replace(b'\r\n--', b'\r\n-x')
+
+
+def text_block():
+    return b''.join(b'line %6d of the text upload\r\n' % i
+                    for i in range(MB // 32))
+
+
+def run(name, block, size):
+    for parser_class in (formparser.MultiPartParser,
+                         formparser.ChunkedMultiPartParser):
+        parser = parser_class(null_stream_factory)
+        stream = UploadStream(block, size)
+        start = time.time()
+        form, files = parser.parse(stream, BOUNDARY, stream.length)
+        elapsed = time.time() - start
+        assert 'file' in files, name
+        print('%-8s %6d MB  %-24s %8.2f s  %8.1f MB/s'
+              % (name, size // MB, parser_class.__name__, elapsed,
+                 size / MB / elapsed))
+
+
+def main(binary_size=1024, text_size=100):
+    run('binary', binary_block(), binary_size * MB)
+    run('text', text_block(), text_size * MB)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -432,6 +432,31 @@ class RoutingTestCase(WerkzeugTestCase):
         assert adapter.build('barf', {'bazf': 0.815, 'bif' : 1.0},
             append_unknown=False) == 'http://example.org/bar/0.815'
 
+    def test_build_cache(self):
+        map = r.Map([
+            r.Rule('/foo/<name>', endpoint='foo'),
+            r.Rule('/files/<path:name>', endpoint='files')
+        ])
+        adapter = map.bind('example.org', '/')
+        self.assert_strict_equal(adapter.build('foo', {'name': 'a b'}),
+                                 '/foo/a%20b')
+        self.assert_strict_equal(adapter.build('foo', {'name': 'x', 'q': 1}),
+                                 '/foo/x?q=1')
+        self.assert_strict_equal(adapter.build('foo', {'name': 'x', 'p': 2}),
+                                 '/foo/x?p=2')
+        # unknown arguments do not add cache entries
+        self.assert_equal(len(map._build_cache['foo'][1]), 1)
+        # dot segments are still resolved
+        self.assert_strict_equal(adapter.build('files', {'name': 'a/../b'}),
+                                 '/files/b')
+
+        map.add(r.Rule('/foo/<name>/<int:page>', endpoint='foo'))
+        self.assert_strict_equal(adapter.build('foo', {'name': 'x',
+                                                       'page': 2}),
+                                 '/foo/x/2')
+        self.assert_strict_equal(adapter.build('foo', {'name': 'x'}),
+                                 '/foo/x')
+
     def test_method_fallback(self):
         map = r.Map([
             r.Rule('/', endpoint='index', methods=['GET']),
@@ -683,7 +708,55 @@ class RoutingTestCase(WerkzeugTestCase):
             "Map([<Rule '/woop' -> foobar>, <Rule '/wat' -> enter>])")
 
 
+class TrieRoutingTestCase(RoutingTestCase):
+
+    def setup(self):
+        r.Map.trie_matching = True
+
+    def teardown(self):
+        r.Map.trie_matching = False
+
+    def test_trie_candidates(self):
+        map = r.Map([
+            r.Rule('/', endpoint='index'),
+            r.Rule('/foo/', endpoint='foo'),
+            r.Rule('/foo/<int:id>', endpoint='foo_id'),
+            r.Rule('/foo/bar', endpoint='foo_bar'),
+            r.Rule('/bar/<path:rest>', endpoint='bar'),
+            r.Rule('/<name>', endpoint='name'),
+            r.Rule('/foo/build', endpoint='build', build_only=True),
+        ])
+        map.update()
+        candidates = map._trie.candidates(u'|/foo/bar')
+        self.assert_equal([rule.endpoint for rule in candidates],
+                          [rule.endpoint for rule in map._rules
+                           if rule.endpoint in ('index', 'foo', 'foo_id',
+                                                'foo_bar', 'name')])
+        candidates = map._trie.candidates(u'|/bar/foo')
+        self.assert_equal(sorted(rule.endpoint for rule in candidates),
+                          ['bar', 'index', 'name'])
+
+        adapter = map.bind('example.org', '/')
+        self.assert_strict_equal(adapter.match('/foo/bar'), ('foo_bar', {}))
+        self.assert_strict_equal(adapter.match('/foo/42'),
+                                 ('foo_id', {'id': 42}))
+        self.assert_strict_equal(adapter.match('/bar/a/b'),
+                                 ('bar', {'rest': u'a/b'}))
+        self.assert_raises(r.RequestRedirect, adapter.match, '/foo')
+
+    def test_trie_matching_per_map(self):
+        map = r.Map([r.Rule('/', endpoint='index')], trie_matching=False)
+        map.update()
+        self.assert_true(map._trie is None)
+        map.trie_matching = True
+        map.add(r.Rule('/foo', endpoint='foo'))
+        adapter = map.bind('example.org', '/')
+        self.assert_strict_equal(adapter.match('/foo'), ('foo', {}))
+        self.assert_true(map._trie is not None)
+
+
 def suite():
     suite = unittest.TestSuite()
     suite.addTest(unittest.makeSuite(RoutingTestCase))
+    suite.addTest(unittest.makeSuite(TrieRoutingTestCase))
     return suite
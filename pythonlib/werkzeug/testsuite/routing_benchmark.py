@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+    werkzeug.testsuite.routing_benchmark
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Benchmark of URL matching with and without the rule trie, and of URL
+    building, on a map of 5000 rules by default laid out like a REST API:
+    every resource has a collection, an item, a versioned item and a nested
+    collection rule.
+
+        python -m werkzeug.testsuite.routing_benchmark [rules] [requests]
+
+    :copyright: (c) 2014 by Armin Ronacher.
+    :license: BSD, see LICENSE for more details.
+"""
+import random
+import sys
+import time
+
+from werkzeug.routing import Map, Rule, BaseConverter
+
+
+class RegexConverter(BaseConverter):
+
+    def __init__(self, map, regex):
+        BaseConverter.__init__(self, map)
+        self.regex = regex
+
+
+def make_rules(count):
+    rules = []
+    for i in range(count // 4):
+        resource = '/api/resource%d' % i
+        rules.extend([
+            Rule(resource + '/', endpoint='%d_list' % i,
+                 methods=['GET', 'POST']),
+            Rule(resource + '/<regex("[a-f0-9]{24}"):id>',
+                 endpoint='%d_item' % i, methods=['GET', 'PATCH']),
+            Rule(resource + '/<regex("[a-f0-9]{24}"):id>/<int:version>',
+                 endpoint='%d_version' % i),
+            Rule(resource + '/<regex("[a-f0-9]{24}"):id>/children/',
+                 endpoint='%d_children' % i),
+        ])
+    return rules
+
+
+def make_paths(count, requests):
+    rng = random.Random(0)
+    templates = ['/api/resource%d/', '/api/resource%d/' + 'a' * 24,
+                 '/api/resource%d/' + 'b' * 24 + '/3',
+                 '/api/resource%d/' + 'c' * 24 + '/children/']
+    return [rng.choice(templates) % rng.randrange(count // 4)
+            for i in range(requests)]
+
+
+def run(rules, paths):
+    results = []
+    for trie_matching in (False, True):
+        map = Map([rule.empty() for rule in rules],
+                  converters={'regex': RegexConverter},
+                  trie_matching=trie_matching)
+        adapter = map.bind('example.org', '/')
+        start = time.time()
+        matched = [adapter.match(path) for path in paths]
+        elapsed = time.time() - start
+        results.append(matched)
+        print('%5d rules  trie_matching=%-5s  %8.3f s  %10.1f matches/s'
+              % (len(rules), trie_matching, elapsed, len(paths) / elapsed))
+    assert results[0] == results[1]
+
+
+def run_build(rules, requests):
+    map = Map([rule.empty() for rule in rules],
+              converters={'regex': RegexConverter})
+    adapter = map.bind('example.org', '/')
+    builds = [(rule.endpoint, dict.fromkeys(rule.arguments, 'a' * 24))
+              for rule in map.iter_rules()
+              if 'version' not in rule.arguments]
+    builds = (builds * (requests // len(builds) + 1))[:requests]
+    start = time.time()
+    for endpoint, values in builds:
+        adapter.build(endpoint, values)
+    elapsed = time.time() - start
+    print('%5d rules  build                %8.3f s  %10.1f us/build'
+          % (len(rules), elapsed, elapsed / requests * 1e6))
+
+
+def main(rules=5000, requests=2000):
+    rules = make_rules(rules)
+    run(rules, make_paths(len(rules), requests))
+    run_build(rules, requests * 10)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
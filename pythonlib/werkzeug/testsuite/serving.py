@@ -8,8 +8,10 @@
     :copyright: (c) 2014 by Armin Ronacher.
     :license: BSD, see LICENSE for more details.
 """
+import os
 import sys
 import time
+import socket
 try:
     import httplib
 except ImportError:
@@ -28,7 +30,7 @@ from werkzeug.testsuite import WerkzeugTestCase
 from werkzeug import __version__ as version, serving
 from werkzeug.testapp import test_app
 from werkzeug._compat import StringIO
-from threading import Thread
+from threading import Thread, Event
 
 
 
@@ -46,7 +48,7 @@ def silencestderr(f):
     return update_wrapper(new_func, f)
 
 
-def run_dev_server(application):
+def run_dev_server(application, **kwargs):
     servers = []
 
     def tracking_make_server(*args, **kwargs):
@@ -56,7 +58,7 @@ def run_dev_server(application):
     serving.make_server = tracking_make_server
     try:
         t = Thread(target=serving.run_simple,
-                   args=('localhost', 0, application))
+                   args=('localhost', 0, application), kwargs=kwargs)
         t.setDaemon(True)
         t.start()
         time.sleep(0.25)
@@ -110,6 +112,185 @@ class ServingTestCase(WerkzeugTestCase):
         res = conn.getresponse()
         assert res.read() == b'YES'
 
+    @silencestderr
+    def test_prefork_workers(self):
+        def pid_app(environ, start_response):
+            rv = str(os.getpid()).encode('ascii')
+            start_response('200 OK', [('Content-Type', 'text/plain'),
+                                      ('Content-Length', str(len(rv)))])
+            return [rv]
+
+        server, addr = run_dev_server(pid_app, workers=2, max_requests=3)
+        try:
+            conn = httplib.HTTPConnection(addr)
+            pids = []
+            for method, body in ('GET', None), ('POST', b'x' * 1000), \
+                                ('GET', None):
+                conn.request(method, '/', body)
+                res = conn.getresponse()
+                pids.append(res.read())
+            self.assert_equal(len(set(pids)), 1)
+            self.assert_equal(res.getheader('Connection'), 'close')
+            self.assert_not_equal(pids[0], str(os.getpid()).encode('ascii'))
+
+            # the worker is replaced after it handled three requests
+            time.sleep(0.5)
+            self.assert_equal(len(server.workers), 2)
+            self.assert_not_in(int(pids[0]), server.workers)
+        finally:
+            server.shutdown()
+
+    @silencestderr
+    def test_prefork_idle_connections(self):
+        def app(environ, start_response):
+            start_response('200 OK', [('Content-Type', 'text/plain'),
+                                      ('Content-Length', '2')])
+            return [b'ok']
+
+        server, addr = run_dev_server(app, workers=2)
+        try:
+            # more connections kept alive than workers, the new ones must
+            # not wait for the idle ones to time out
+            start = time.time()
+            conns = []
+            for x in range(4):
+                conn = httplib.HTTPConnection(addr)
+                conn.request('GET', '/')
+                self.assert_equal(conn.getresponse().read(), b'ok')
+                conns.append(conn)
+            self.assert_true(time.time() - start < 2)
+        finally:
+            server.shutdown()
+
+    @silencestderr
+    def test_keep_alive_app_error(self):
+        def broken_app(environ, start_response):
+            if environ['PATH_INFO'] == '/early':
+                1 // 0
+            start_response('200 OK', [('Content-Type', 'text/plain'),
+                                      ('Content-Length', '10')])
+            yield b'abc'
+            1 // 0
+
+        server, addr = run_dev_server(broken_app, workers=1)
+        try:
+            host, port = addr.rsplit(':', 1)
+            for path in '/early', '/late':
+                conn = socket.create_connection((host, int(port)))
+                conn.settimeout(2)
+                conn.sendall(('GET %s HTTP/1.1\r\nHost: %s\r\n\r\n'
+                              % (path, addr)).encode('ascii'))
+                # the connection is closed after the response
+                rv = b''
+                data = conn.recv(4096)
+                while data:
+                    rv += data
+                    data = conn.recv(4096)
+                conn.close()
+                if path == '/early':
+                    self.assert_in(b' 500 ', rv.split(b'\r\n')[0])
+                    self.assert_in(b'Connection: close', rv)
+                else:
+                    self.assert_true(rv.endswith(b'\r\n\r\nabc'))
+        finally:
+            server.shutdown()
+
+    @silencestderr
+    def test_pooled_server(self):
+        release = Event()
+
+        def blocking_app(environ, start_response):
+            release.wait(5)
+            start_response('200 OK', [('Content-Type', 'text/plain')])
+            return [b'done']
+
+        server = serving.PooledWSGIServer('localhost', 0, blocking_app,
+                                          pool_size=1, queue_size=1)
+        t = Thread(target=server.serve_forever)
+        t.setDaemon(True)
+        t.start()
+        addr = '%s:%d' % server.socket.getsockname()[:2]
+        try:
+            conns = []
+            for x in range(3):
+                conn = httplib.HTTPConnection(addr)
+                conn.request('POST', '/', b'x' * 65536)
+                conns.append(conn)
+                time.sleep(0.2)
+            # the third connection does not fit into the queue, its request
+            # is read so that the response is not lost in a reset
+            self.assert_equal(conns[2].getresponse().status, 503)
+            stats = server.stats()
+            self.assert_equal((stats['busy'], stats['queued'],
+                               stats['rejected']), (1, 1, 1))
+            release.set()
+            for conn in conns[:2]:
+                self.assert_equal(conn.getresponse().read(), b'done')
+            time.sleep(0.1)
+            stats = server.stats()
+            self.assert_equal((stats['busy'], stats['queued'],
+                               stats['handled'], stats['max_queued']),
+                              (0, 0, 2, 1))
+        finally:
+            release.set()
+            server.shutdown()
+            server.server_close()
+
+    @silencestderr
+    def test_pooled_server_silent_clients(self):
+        release = Event()
+
+        def blocking_app(environ, start_response):
+            release.wait(5)
+            start_response('200 OK', [('Content-Length', '0')])
+            return []
+
+        server = serving.PooledWSGIServer('localhost', 0, blocking_app,
+                                          pool_size=1, queue_size=16)
+        t = Thread(target=server.serve_forever)
+        t.setDaemon(True)
+        t.start()
+        addr = server.socket.getsockname()[:2]
+        try:
+            # one connection is handled, the queue is full with the others
+            conns = []
+            for x in range(17):
+                conn = httplib.HTTPConnection('%s:%d' % addr)
+                conn.request('GET', '/')
+                conns.append(conn)
+                if not x:
+                    time.sleep(0.2)
+            time.sleep(0.2)
+            self.assert_equal(server.stats()['queued'], 16)
+            # clients that connect and send nothing do not hold up the
+            # thread that accepts the connections
+            silent = [socket.create_connection(addr) for x in range(10)]
+            time.sleep(0.2)
+            self.assert_equal(server.stats()['rejected'], 10)
+            for sock in silent:
+                sock.settimeout(5)
+                self.assert_true(sock.recv(4096).startswith(
+                    b'HTTP/1.0 503 Service Unavailable'))
+                sock.close()
+        finally:
+            release.set()
+            server.shutdown()
+            server.server_close()
+
+    def test_make_pooled_server(self):
+        server = serving.make_server('localhost', 0, test_app,
+                                     threaded='pool', pool_size=3,
+                                     queue_size=5)
+        try:
+            self.assert_true(isinstance(server, serving.PooledWSGIServer))
+            self.assert_equal(len(server._threads), 3)
+            self.assert_equal(server.stats()['queue_size'], 5)
+        finally:
+            server.server_close()
+        # an unbounded queue would never reject a connection
+        self.assert_raises(ValueError, serving.make_server, 'localhost', 0,
+                           test_app, threaded='pool', queue_size=0)
+
 
 def suite():
     suite = unittest.TestSuite()
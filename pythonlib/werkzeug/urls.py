@@ -25,6 +25,10 @@ _scheme_re = re.compile(r'^[a-zA-Z0-9+-.]+$')
 _always_safe = (b'abcdefghijklmnopqrstuvwxyz'
                 b'ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_.-+')
 
+# The safe characters of :func:`url_quote` as set and as bytes, by the
+# `safe` and `unsafe` arguments.
+_quote_safe_cache = {}
+
 _hexdigits = '0123456789ABCDEFabcdef'
 _hextobyte = dict(
     ((a + b).encode(), int(a + b, 16))
@@ -390,7 +394,17 @@ def url_quote(string, charset='utf-8', errors='strict', safe='/:', unsafe=''):
         safe = safe.encode(charset, errors)
     if isinstance(unsafe, text_type):
         unsafe = unsafe.encode(charset, errors)
-    safe = frozenset(bytearray(safe) + _always_safe) - frozenset(bytearray(unsafe))
+    try:
+        safe, safe_bytes = _quote_safe_cache[safe, unsafe]
+    except KeyError:
+        key = safe, unsafe
+        safe = frozenset(bytearray(safe) + _always_safe) - \
+            frozenset(bytearray(unsafe))
+        safe_bytes = bytes(bytearray(sorted(safe)))
+        _quote_safe_cache[key] = safe, safe_bytes
+    # nothing to quote
+    if not string.translate(None, safe_bytes):
+        return to_native(bytes(string))
     rv = bytearray()
     for char in bytearray(string):
         if char in safe: